@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+无界面批处理入口，对大量模型文件应用密度和美学对齐并保存结果
+
+复用ModelManager的编辑操作和GeometryIO的读写代码，不创建任何窗口。
+文件在进程池中并行处理，每个文件完成后打印耗时，最后打印吞吐量汇总。
+输出目录中的 .batch_manifest.json 记录每个输出对应的输入文件状态和参数，
+输入和参数都未变化且输出仍存在时跳过该文件。
+
+用法:
+    python batch.py scans/ -o out/ --density 中 --align 选项1 -j 8
+    python batch.py "scans/**/*.pcd" extra.ply -o out/ --format pcd --force
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from renderer.geometry_io import SUPPORTED_EXTENSIONS
+
+
+MANIFEST_NAME = ".batch_manifest.json"
+
+# 工作进程内的全局对象，由_init_worker创建
+_worker = {}
+
+
+def collect_inputs(patterns):
+    """展开输入参数
+
+    Args:
+        patterns (list): 目录、文件或glob模式
+
+    Returns:
+        list: [(输入文件, 相对输出路径)]，目录输入保留子目录结构
+    """
+    inputs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        inputs.append((path, os.path.relpath(path, pattern)))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+            for path in matches:
+                if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                    inputs.append((path, os.path.basename(path)))
+                elif not os.path.exists(path):
+                    print(f"找不到输入: {path}", file=sys.stderr)
+    return inputs
+
+
+def _init_worker(use_cache):
+    """工作进程初始化，每个进程只创建一次配置、读写器和模型管理器"""
+    from utils.config_manager import ConfigManager
+    from utils.model_manager import ModelManager
+    from renderer.geometry_io import GeometryIO
+
+    config = ConfigManager()
+    config.load_config()
+    manager = ModelManager(config)
+    errors = []
+    manager.operation_error.connect(errors.append)
+    _worker.update(io=GeometryIO(config, use_cache=use_cache), manager=manager, errors=errors)
+
+
+def process_file(input_path, output_path, density, align):
+    """处理单个文件，在工作进程中执行
+
+    Args:
+        input_path (str): 输入文件
+        output_path (str): 输出文件
+        density (str): 密度级别，None表示不调整
+        align (str): 美学对齐选项，None表示不对齐
+
+    Returns:
+        dict: 处理结果
+    """
+    start = time.perf_counter()
+    result = {"input": input_path, "output": output_path, "ok": False, "points": 0, "message": ""}
+    geometry_io = _worker["io"]
+    manager = _worker["manager"]
+    errors = _worker["errors"]
+    errors.clear()
+
+    try:
+        # 读取时的逐文件日志由批处理汇总代替
+        with contextlib.redirect_stdout(io.StringIO()):
+            geometry, model_type, message = geometry_io.load(input_path)
+        if geometry is None:
+            result["message"] = message
+            return result
+
+        manager.set_model(geometry, model_type)
+        if density and model_type == 'pcd':
+            manager.apply_density(density)
+        if align:
+            manager.apply_aesthetic_alignment(align)
+        if errors:
+            result["message"] = errors[-1]
+            return result
+
+        model = manager.current_model
+        result["points"] = len(model.points) if model_type == 'pcd' else len(model.vertices)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        ok, message = geometry_io.save(model, output_path)
+        result["ok"] = ok
+        result["message"] = message
+        return result
+    except Exception as e:
+        result["message"] = str(e)
+        return result
+    finally:
+        # 释放模型，避免工作进程长期持有上一个文件的数据
+        manager.current_model = None
+        manager.stats.reset(None, None)
+        manager.clear_history()
+        result["seconds"] = time.perf_counter() - start
+
+
+def _input_stamp(path):
+    """输入文件的修改时间和大小"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hair Ezclick 批处理")
+    parser.add_argument("inputs", nargs="+", help="输入目录、文件或glob模式")
+    parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    parser.add_argument("--density", choices=["低", "中", "高"], help="应用密度（仅点云）")
+    parser.add_argument("--align", help="美学对齐选项")
+    parser.add_argument("--format", choices=["pcd", "ply", "obj"], help="输出格式，默认与输入相同")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument("--force", action="store_true", help="忽略已是最新的输出，全部重新处理")
+    parser.add_argument("--use-cache", action="store_true", help="读取时使用几何缓存")
+    args = parser.parse_args(argv)
+
+    params = {"density": args.density, "align": args.align, "format": args.format}
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = _load_manifest(args.output_dir)
+
+    tasks = []
+    skipped = 0
+    for input_path, relative in collect_inputs(args.inputs):
+        if args.format:
+            relative = os.path.splitext(relative)[0] + "." + args.format
+        output_path = os.path.join(args.output_dir, relative)
+        entry = manifest.get(relative)
+        if (not args.force and entry is not None and os.path.exists(output_path)
+                and entry["input_stamp"] == _input_stamp(input_path) and entry["params"] == params):
+            skipped += 1
+            continue
+        tasks.append((input_path, output_path, relative))
+
+    print(f"共 {len(tasks) + skipped} 个文件，{skipped} 个已是最新，待处理 {len(tasks)} 个，进程数 {args.jobs}")
+    if not tasks:
+        return 0
+
+    start = time.perf_counter()
+    done = failed = total_points = total_bytes = 0
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                             initargs=(args.use_cache,)) as executor:
+        futures = {
+            executor.submit(process_file, input_path, output_path, args.density, args.align):
+                (input_path, relative)
+            for input_path, output_path, relative in tasks
+        }
+        for future in as_completed(futures):
+            input_path, relative = futures[future]
+            result = future.result()
+            if result["ok"]:
+                done += 1
+                total_points += result["points"]
+                total_bytes += os.path.getsize(input_path)
+                manifest[relative] = {"input": os.path.abspath(input_path),
+                                      "input_stamp": _input_stamp(input_path), "params": params}
+                _save_manifest(args.output_dir, manifest)
+                print(f"[完成] {input_path} -> {result['output']}  "
+                      f"{result['points']:,} 点  {result['seconds']:.2f} s")
+            else:
+                failed += 1
+                print(f"[失败] {input_path}  {result['message']}  {result['seconds']:.2f} s")
+
+    elapsed = time.perf_counter() - start
+    print(f"完成 {done} 个，失败 {failed} 个，跳过 {skipped} 个，总耗时 {elapsed:.2f} s")
+    if done:
+        print(f"吞吐量: {done / elapsed:.2f} 文件/秒  {total_points / elapsed:,.0f} 点/秒  "
+              f"{total_bytes / elapsed / 1024 / 1024:.1f} MB/秒")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
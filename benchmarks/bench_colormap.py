@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+高度颜色映射基准测试：对比原逐点循环与批量NumPy实现的吞吐量
+
+用法:
+    python -m benchmarks.bench_colormap [--points 1000000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from renderer.colormap import height_colors
+
+
+def legacy_height_colors(points):
+    """原 _load_point_cloud 中的逐点着色实现，仅用于对比"""
+    min_z = np.min(points[:, 2])
+    max_z = np.max(points[:, 2])
+    colors = np.zeros((len(points), 3))
+    for i in range(len(points)):
+        normalized = (points[i, 2] - min_z) / (max_z - min_z)
+        if normalized < 0.2:
+            colors[i] = [0, 0, 0.8 + normalized]
+        elif normalized < 0.4:
+            colors[i] = [0, 2 * (normalized - 0.2), 1]
+        elif normalized < 0.6:
+            colors[i] = [0, 1, 1 - 2 * (normalized - 0.4)]
+        elif normalized < 0.8:
+            colors[i] = [2 * (normalized - 0.6), 1, 0]
+        else:
+            colors[i] = [1, 1 - 5 * (normalized - 0.8), 0]
+    return colors
+
+
+def _best_time(func, repeat):
+    """多次运行取最短耗时"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="高度颜色映射基准测试")
+    parser.add_argument("--points", type=int, default=1_000_000, help="批量实现的点数")
+    parser.add_argument("--legacy-points", type=int, default=100_000, help="逐点实现的点数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.random((args.points, 3))
+    legacy_points = points[:args.legacy_points]
+
+    # 正确性检查: 两种实现结果必须完全一致
+    expected = legacy_height_colors(legacy_points)
+    actual = height_colors(legacy_points)
+    assert np.array_equal(expected, actual), "批量实现与逐点实现结果不一致"
+
+    legacy_time, _ = _best_time(lambda: legacy_height_colors(legacy_points), 1)
+    print(f"逐点循环:      {len(legacy_points):>10d} 点  {legacy_time:8.3f} s  "
+          f"{len(legacy_points) / legacy_time:14,.0f} 点/秒")
+
+    for name in ("rainbow", "hot", "gray"):
+        elapsed, _ = _best_time(lambda: height_colors(points, 2, name), args.repeat)
+        print(f"批量 {name:<9s} {len(points):>10d} 点  {elapsed:8.3f} s  "
+              f"{len(points) / elapsed:14,.0f} 点/秒")
+
+
+if __name__ == "__main__":
+    main()
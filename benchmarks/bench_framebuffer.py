@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+帧显示路径基准测试：对比每次重绘都转换浮点帧的旧路径与ImageViewWidget的uint8帧+缩放缓存
+
+新路径直接使用 Open3DRenderer.update_render 的帧转换（to_uint8_frame）和 ImageViewWidget 的绘制；
+旧路径是同一控件改为每次重绘都转换、缩放的paintEvent，作为对比基线。
+模拟每个渲染帧之后发生若干次重绘（叠加层更新、窗口调整等），每次重绘通过grab()执行一次完整绘制。
+
+用法:
+    python -m benchmarks.bench_framebuffer [--frames 50] [--paints 5]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QApplication
+
+from benchmarks.synthetic import FrameSource, render_frame
+from gui.image_view_widget import ImageViewWidget
+from renderer.framebuffer import to_uint8_frame
+
+
+class LegacyImageView(ImageViewWidget):
+    """旧的显示路径: 保存浮点帧，每次绘制都转换为uint8、构造QImage并缩放"""
+
+    def set_image(self, img_array):
+        self.image = img_array
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        height, width, channels = self.image.shape
+        img_8bit = (self.image * 255).astype(np.uint8)
+        qimg = QImage(img_8bit.data, width, height, channels * width, QImage.Format_RGB888)
+        scaled_pixmap = QPixmap.fromImage(qimg).scaled(
+            self.size(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        x = (self.width() - scaled_pixmap.width()) // 2
+        y = (self.height() - scaled_pixmap.height()) // 2
+        painter.drawPixmap(x, y, scaled_pixmap)
+        painter.end()
+
+
+def _run(view, frames, count, paints, convert):
+    """显示count帧，每帧重绘paints次，返回总耗时（秒）"""
+    start = time.perf_counter()
+    for i in range(count):
+        frame = frames[i % len(frames)]
+        view.set_image(convert(frame))
+        for _ in range(paints):
+            view.grab()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="帧显示路径基准测试")
+    parser.add_argument("--width", type=int, default=800, help="渲染宽度")
+    parser.add_argument("--height", type=int, default=600, help="渲染高度")
+    parser.add_argument("--frames", type=int, default=50, help="渲染帧数")
+    parser.add_argument("--paints", type=int, default=5, help="每帧重绘次数")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841  控件需要应用实例
+    source = FrameSource(args.width, args.height)
+    frames = [render_frame(args.width, args.height, seed) for seed in range(4)]
+
+    legacy = LegacyImageView(source)
+    legacy.resize(1024, 768)
+    legacy_time = _run(legacy, frames, args.frames, args.paints, lambda frame: frame)
+
+    # 渲染器在发出render_ready之前把捕获的浮点帧转换为uint8
+    view = ImageViewWidget(source)
+    view.resize(1024, 768)
+    cached_time = _run(view, frames, args.frames, args.paints, to_uint8_frame)
+
+    for name, elapsed in (("旧路径", legacy_time), ("新路径", cached_time)):
+        print(f"{name}: {args.frames} 帧 x {args.paints} 次重绘  "
+              f"{elapsed * 1000 / args.frames:8.2f} ms/帧  "
+              f"{elapsed * 1000 / (args.frames * args.paints):8.2f} ms/次重绘")
+    print(f"加速比: {legacy_time / cached_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
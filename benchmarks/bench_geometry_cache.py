@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何缓存基准测试：通过 GeometryIO.load 对比不使用缓存、首次打开和缓存命中的加载耗时
+
+    不使用缓存  GeometryIO(use_cache=False).load，读取文件并着色/计算法线
+    首次打开    缓存为空时的 GeometryIO.load，在解析之外写入缓存
+    缓存命中    再次打开同一文件的 GeometryIO.load，读取.npy数组并构建几何体
+
+用法:
+    python -m benchmarks.bench_geometry_cache [--points 2000000] [--mesh-resolution 400] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import open3d as o3d
+
+from renderer.geometry_cache import GeometryCache, geometry_to_arrays
+from renderer.geometry_io import GeometryIO
+
+
+def _measure(func, repeat, setup=None):
+    """多次运行取最短耗时，setup在每次运行前执行且不计入耗时"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _run(name, file_path, cache_dir, repeat):
+    """测量一个模型文件的三种加载耗时"""
+    plain = GeometryIO(use_cache=False)
+    io = GeometryIO(use_cache=False)
+    io.geometry_cache = GeometryCache(cache_dir)
+
+    plain_time, (expected, model_type, _) = _measure(lambda: plain.load(file_path), repeat)
+    cold_time, _ = _measure(lambda: io.load(file_path), repeat, setup=io.geometry_cache.clear)
+    stores = io.get_cache_stats()["stores"]
+    warm_time, (cached, cached_type, message) = _measure(lambda: io.load(file_path), repeat)
+
+    # 缓存无法读取时GeometryIO会重新解析并再次写入，这里必须每次都真正命中
+    assert "缓存" in message and io.get_cache_stats()["stores"] == stores, f"未命中几何缓存: {message}"
+    expected_arrays = geometry_to_arrays(expected, model_type)
+    actual_arrays = geometry_to_arrays(cached, cached_type)
+    assert expected_arrays.keys() == actual_arrays.keys(), "缓存数组与解析结果不一致"
+    assert all(np.array_equal(expected_arrays[k], actual_arrays[k]) for k in expected_arrays), \
+        "缓存数组与解析结果不一致"
+
+    size_mb = os.path.getsize(file_path) / 1024 / 1024
+    print(f"{name:<6s} 文件 {size_mb:8.1f} MB  不使用缓存 {plain_time:8.3f} s  首次打开 {cold_time:8.3f} s  "
+          f"缓存命中 {warm_time:8.3f} s  加速 {plain_time / warm_time:6.1f}x")
+    return io.get_cache_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="几何缓存基准测试")
+    parser.add_argument("--points", type=int, default=2_000_000, help="点云点数")
+    parser.add_argument("--mesh-resolution", type=int, default=400, help="测试球面网格的分辨率")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 无颜色点云，加载时按高度着色
+        rng = np.random.default_rng(0)
+        pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(rng.random((args.points, 3))))
+        pcd_path = os.path.join(work_dir, "bench.pcd")
+        o3d.io.write_point_cloud(pcd_path, pcd)
+        _run("点云", pcd_path, os.path.join(work_dir, "pcd_cache"), args.repeat)
+
+        mesh = o3d.geometry.TriangleMesh.create_sphere(resolution=args.mesh_resolution)
+        mesh_path = os.path.join(work_dir, "bench.ply")
+        o3d.io.write_triangle_mesh(mesh_path, mesh)
+        stats = _run("网格", mesh_path, os.path.join(work_dir, "mesh_cache"), args.repeat)
+        print(f"缓存统计（网格）: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何更新基准测试：测量一次编辑到画面更新（render_ready发出）的耗时
+
+对比三种路径:
+    重新添加   clear_geometries + add_geometry（原set_geometry的做法）
+    完整更新   update_geometry(None)，未知变化，重建空间索引
+    增量更新   update_geometry(GeometryChange)，只有颜色或少量点变化
+
+需要能创建OpenGL上下文的环境（Open3D隐藏窗口）。
+
+用法:
+    python -m benchmarks.bench_geometry_update [--points 1000000] [--edit-rows 1000] [--repeat 5]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import open3d as o3d
+from PySide6.QtWidgets import QApplication
+
+from renderer.open3d_renderer import Open3DRenderer
+from utils.geometry_change import GeometryChange
+
+
+def _measure(renderer, edit, repeat):
+    """执行编辑并同步渲染，返回编辑开始到render_ready发出的最短耗时"""
+    frame_times = []
+    renderer.render_ready.connect(lambda img: frame_times.append(time.perf_counter()))
+    best = float("inf")
+    for _ in range(repeat):
+        frame_times.clear()
+        start = time.perf_counter()
+        edit()
+        renderer.update_render()
+        if frame_times:
+            best = min(best, frame_times[-1] - start)
+    renderer.render_ready.disconnect()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="几何更新基准测试")
+    parser.add_argument("--points", type=int, default=1_000_000, help="点云点数")
+    parser.add_argument("--edit-rows", type=int, default=1000, help="每次编辑修改的点数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    renderer = Open3DRenderer()
+    renderer.lod_enabled = False  # 排除LOD后台构建的干扰
+
+    rng = np.random.default_rng(0)
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(rng.random((args.points, 3))))
+    pcd.colors = o3d.utility.Vector3dVector(rng.random((args.points, 3)))
+    renderer.show_geometry("bench.pcd", pcd, 'pcd', "")
+    renderer._ensure_pick_index()
+    colors = np.asarray(pcd.colors)
+    points = np.asarray(pcd.points)
+
+    def reload():
+        colors[rng.integers(0, args.points, args.edit_rows)] = rng.random(3)
+        renderer.vis.clear_geometries()
+        renderer.vis.add_geometry(pcd, reset_bounding_box=False)
+
+    def full_update():
+        colors[rng.integers(0, args.points, args.edit_rows)] = rng.random(3)
+        renderer.update_geometry()
+        renderer.flush_geometry_update()
+
+    def color_update():
+        rows = rng.integers(0, args.points, args.edit_rows)
+        colors[rows] = rng.random(3)
+        renderer.update_geometry(GeometryChange(("colors",), rows))
+        renderer.flush_geometry_update()
+
+    def point_update():
+        rows = rng.integers(0, args.points, args.edit_rows)
+        points[rows] += 1e-6
+        renderer.update_geometry(GeometryChange(("points",), rows))
+        renderer.flush_geometry_update()
+
+    print(f"点数 {args.points:,}，每次编辑 {args.edit_rows:,} 点")
+    for name, edit in (("重新添加", reload), ("完整更新", full_update),
+                       ("增量更新(颜色)", color_update), ("增量更新(坐标)", point_update)):
+        elapsed = _measure(renderer, edit, args.repeat)
+        print(f"{name:<12s} {elapsed * 1000:10.2f} ms")
+
+    print(f"渲染统计: {renderer.get_render_stats()}")
+    renderer.cleanup()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基准测试套件：用合成数据测量主要代码路径的耗时，结果保存为JSON并可与基线对比
+
+测量的代码路径（每种规模分别测量）:
+    load_point_cloud   GeometryIO._load_point_cloud（读取无颜色PCD并按高度着色）
+    load_mesh          GeometryIO._load_mesh（读取PLY网格、上色并计算法线）
+    apply_density      ModelManager.apply_density("中")
+    history_push       ModelManager.add_to_history（修改1%颜色后记录）
+    history_undo       ModelManager.undo
+    model_info_cold    ModelManager.get_model_info（统计缓存刚失效）
+    model_info_cached  ModelManager.get_model_info（统计已缓存）
+    save_point_cloud   GeometryIO.save（PCD）
+    save_mesh          GeometryIO.save（PLY）
+与规模无关、按帧尺寸测量:
+    paint              ImageViewWidget.set_image + 一次完整绘制（转换、缩放、绘制）
+
+每项重复运行并记录每次耗时，对比时使用最短耗时（受系统噪声影响最小）。
+
+用法:
+    python -m benchmarks.suite run [--scales 10k,1m,10m] [--repeat 5] [-o benchmarks/results/latest.json]
+    python -m benchmarks.suite compare 基线.json 结果.json [--threshold 0.15] [--min-delta-ms 1]
+
+compare发现回归时以状态码1退出，可用于持续集成。
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import open3d as o3d
+from PySide6 import __version__ as pyside_version
+from PySide6.QtWidgets import QApplication
+
+from benchmarks.synthetic import FrameSource, parse_scales, hair_point_cloud, grid_mesh, render_frame
+from gui.image_view_widget import ImageViewWidget
+from renderer.geometry_io import GeometryIO
+from utils.model_manager import ModelManager
+
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "latest.json")
+
+
+def _no_progress(percent, message):
+    pass
+
+
+def _measure(func, repeat, setup=None):
+    """运行repeat次并记录每次耗时，setup在每次运行前执行且不计入耗时
+
+    Returns:
+        list: 每次的耗时（秒）
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def bench_scale(count, repeat, work_dir):
+    """测量一种规模下的各代码路径
+
+    Args:
+        count (int): 点数/顶点数
+        repeat (int): 重复次数
+        work_dir (str): 临时文件目录
+
+    Returns:
+        dict: 名称 -> 每次的耗时（秒）
+    """
+    results = {}
+    io = GeometryIO(use_cache=False)
+
+    # 加载：读取文件并着色
+    pcd_path = os.path.join(work_dir, f"bench_{count}.pcd")
+    o3d.io.write_point_cloud(pcd_path, hair_point_cloud(count))
+    results["load_point_cloud"] = _measure(lambda: io._load_point_cloud(pcd_path, _no_progress), repeat)
+
+    mesh_path = os.path.join(work_dir, f"bench_{count}.ply")
+    o3d.io.write_triangle_mesh(mesh_path, grid_mesh(count))
+    results["load_mesh"] = _measure(lambda: io._load_mesh(mesh_path, _no_progress), repeat)
+    mesh, _, _ = io._load_mesh(mesh_path, _no_progress)
+    os.remove(mesh_path)
+
+    source = hair_point_cloud(count, colors=True)
+    manager = ModelManager()
+
+    # 密度调整，每次从原始点云开始
+    results["apply_density"] = _measure(
+        lambda: manager.apply_density("中"), repeat,
+        setup=lambda: manager.set_model(o3d.geometry.PointCloud(source), 'pcd'))
+
+    # 历史记录：每次修改1%的颜色后记录，再撤销
+    manager.set_model(o3d.geometry.PointCloud(source), 'pcd')
+    colors = np.asarray(manager.current_model.colors)
+    rng = np.random.default_rng(0)
+    edit_rows = max(1, count // 100)
+
+    def edit_colors():
+        colors[rng.integers(0, count, edit_rows)] = rng.random(3)
+
+    results["history_push"] = _measure(lambda: manager.add_to_history("基准测试"), repeat, setup=edit_colors)
+    undo_runs = []
+    for _ in range(repeat):
+        edit_colors()
+        manager.add_to_history("基准测试")
+        undo_runs.extend(_measure(manager.undo, 1))
+    results["history_undo"] = undo_runs
+
+    # 模型信息
+    results["model_info_cold"] = _measure(
+        manager.get_model_info, repeat,
+        setup=lambda: manager.stats.reset(manager.current_model, 'pcd'))
+    results["model_info_cached"] = _measure(manager.get_model_info, repeat)
+
+    # 保存
+    out_pcd = os.path.join(work_dir, "saved.pcd")
+    results["save_point_cloud"] = _measure(lambda: io.save(manager.current_model, out_pcd), repeat)
+    os.remove(out_pcd)
+    out_mesh = os.path.join(work_dir, "saved.ply")
+    results["save_mesh"] = _measure(lambda: io.save(mesh, out_mesh), repeat)
+    os.remove(out_mesh)
+    os.remove(pcd_path)
+    return results
+
+
+def bench_paint(width, height, view_size, repeat):
+    """测量一帧从set_image到绘制完成的耗时
+
+    Args:
+        width (int): 渲染帧宽度
+        height (int): 渲染帧高度
+        view_size (tuple): 视图控件尺寸 (宽, 高)
+        repeat (int): 重复次数
+
+    Returns:
+        list: 每次的耗时（秒）
+    """
+    source = FrameSource(width, height)
+    view = ImageViewWidget(source)
+    view.resize(*view_size)
+    frames = [render_frame(width, height, seed) for seed in range(2)]
+    index = [0]
+
+    def paint():
+        # 交替使用两帧，每次都是新帧，不命中缩放缓存
+        index[0] += 1
+        view.set_image(frames[index[0] % 2])
+        view.grab()
+
+    return _measure(paint, repeat)
+
+
+def _git_revision():
+    """当前代码的提交号，工作区有修改时加后缀"-dirty"，不在git仓库中时为None"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ("-dirty" if dirty else "")
+
+
+def _cpu_model():
+    """CPU型号，无法获取时退回platform.processor()"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _total_memory():
+    """物理内存字节数，无法获取时为None"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def machine_metadata():
+    """收集机器和软件环境信息，写入结果以便判断两次结果是否可比
+
+    Returns:
+        dict: 元数据
+    """
+    return {
+        "timestamp": datetime.datetime.now().astimezone().isoformat(timespec="seconds"),
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": _total_memory(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "open3d": o3d.__version__,
+        "pyside6": pyside_version,
+        "git_revision": _git_revision()
+    }
+
+
+def _summarize(name, scale, count, runs):
+    """一项测量的结果记录"""
+    return {
+        "name": name,
+        "scale": scale,
+        "count": count,
+        "best_s": min(runs),
+        "median_s": statistics.median(runs),
+        "runs": runs
+    }
+
+
+def run(args):
+    """运行基准测试并保存结果"""
+    app = QApplication.instance() or QApplication([])  # noqa: F841  绘制需要应用实例
+    scales = parse_scales(args.scales)
+    width, height = (int(v) for v in args.frame_size.lower().split("x"))
+    results = []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale, count in scales:
+            print(f"规模 {scale}（{count:,} 点）")
+            for name, runs in bench_scale(count, args.repeat, work_dir).items():
+                results.append(_summarize(name, scale, count, runs))
+                print(f"  {name:<18s} 最短 {min(runs) * 1000:10.2f} ms  中位 {statistics.median(runs) * 1000:10.2f} ms")
+
+    frame = f"{width}x{height}"
+    runs = bench_paint(width, height, (int(width * 1.25), int(height * 1.25)), max(args.repeat, 20))
+    results.append(_summarize("paint", frame, width * height, runs))
+    print(f"帧 {frame}")
+    print(f"  {'paint':<18s} 最短 {min(runs) * 1000:10.2f} ms  中位 {statistics.median(runs) * 1000:10.2f} ms")
+
+    report = {
+        "metadata": machine_metadata(),
+        "settings": {"scales": [scale for scale, _ in scales], "repeat": args.repeat, "frame_size": frame},
+        "results": results
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {args.output}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold=0.15, min_delta=0.001):
+    """对比两次结果
+
+    某项的最短耗时比基线慢threshold以上、且绝对差值超过min_delta时判为回归，
+    快threshold以上时判为改进。只在一方出现的项单独列出。
+
+    Args:
+        baseline (dict): 基线结果
+        current (dict): 本次结果
+        threshold (float): 相对变化阈值
+        min_delta (float): 绝对变化阈值（秒），避免极短的测量因噪声被误判
+
+    Returns:
+        list: [(名称, 规模, 基线秒数或None, 本次秒数或None, 状态)]，状态为
+            "回归"、"改进"、"持平"、"新增"或"缺失"
+    """
+    base = {(r["name"], r["scale"]): r["best_s"] for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = (result["name"], result["scale"])
+        now = result["best_s"]
+        before = base.pop(key, None)
+        if before is None:
+            status = "新增"
+        elif now > before * (1 + threshold) and now - before > min_delta:
+            status = "回归"
+        elif now < before / (1 + threshold) and before - now > min_delta:
+            status = "改进"
+        else:
+            status = "持平"
+        rows.append((key[0], key[1], before, now, status))
+    for (name, scale), before in base.items():
+        rows.append((name, scale, before, None, "缺失"))
+    return rows
+
+
+def compare(args):
+    """对比两个结果文件并打印，有回归时返回1"""
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+
+    # 不同机器或软件版本的结果不可直接比较，仅提示
+    for key in ("cpu", "cpu_count", "platform", "python", "numpy", "open3d"):
+        before = baseline["metadata"].get(key)
+        now = current["metadata"].get(key)
+        if before != now:
+            print(f"注意: 环境不同 {key}: {before} -> {now}")
+    print(f"基线 {baseline['metadata'].get('git_revision')} ({baseline['metadata'].get('timestamp')})")
+    print(f"本次 {current['metadata'].get('git_revision')} ({current['metadata'].get('timestamp')})")
+
+    rows = compare_reports(baseline, current, args.threshold, args.min_delta_ms / 1000)
+    print(f"{'名称':<18s} {'规模':<10s} {'基线(ms)':>12s} {'本次(ms)':>12s} {'变化':>8s}  状态")
+    for name, scale, before, now, status in rows:
+        before_text = f"{before * 1000:12.2f}" if before is not None else f"{'-':>12s}"
+        now_text = f"{now * 1000:12.2f}" if now is not None else f"{'-':>12s}"
+        change = f"{(now / before - 1) * 100:+7.1f}%" if before and now is not None else f"{'-':>8s}"
+        print(f"{name:<18s} {scale:<10s} {before_text} {now_text} {change}  {status}")
+
+    regressions = sum(1 for row in rows if row[4] == "回归")
+    print(f"回归 {regressions} 项，改进 {sum(1 for row in rows if row[4] == '改进')} 项")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="基准测试套件")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="运行基准测试")
+    run_parser.add_argument("--scales", default="10k,1m,10m", help="逗号分隔的规模，可选 10k、1m、10m")
+    run_parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    run_parser.add_argument("--frame-size", default="800x600", help="绘制测试的渲染帧尺寸")
+    run_parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="结果JSON路径")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="与基线结果对比")
+    compare_parser.add_argument("baseline", help="基线结果JSON")
+    compare_parser.add_argument("current", help="本次结果JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="判为回归的相对变化")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0, help="判为回归的最小绝对变化（毫秒）")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成测试数据，供基准测试使用，不依赖外部模型文件
+
+同一规模和随机种子总是生成相同的数据，不同机器上的结果可以直接对比。
+"""
+
+import numpy as np
+import open3d as o3d
+from PySide6.QtCore import QObject, Signal
+
+
+# 规模名称 -> 点数/顶点数
+SCALES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000
+}
+
+
+def parse_scales(text):
+    """解析逗号分隔的规模列表
+
+    Args:
+        text (str): 例如 "10k,1m"
+
+    Returns:
+        list: [(规模名称, 点数)]
+    """
+    scales = []
+    for name in text.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in SCALES:
+            raise ValueError(f"未知的规模: {name}，可选 {', '.join(SCALES)}")
+        scales.append((name, SCALES[name]))
+    return scales
+
+
+def hair_points(count, seed=0, points_per_strand=100):
+    """生成类似头发的点云坐标
+
+    发根均匀分布在单位球的上半球面，每根发丝沿法线方向长出后受重力下垂，
+    并叠加少量噪声，点的空间分布与扫描得到的头发模型相近（细长、局部稠密）。
+
+    Args:
+        count (int): 点数
+        seed (int): 随机种子
+        points_per_strand (int): 每根发丝的点数
+
+    Returns:
+        numpy.ndarray: (count, 3) float64坐标
+    """
+    rng = np.random.default_rng(seed)
+    strands = -(-count // points_per_strand)
+
+    # 上半球面上的发根
+    roots = rng.normal(size=(strands, 3))
+    roots[:, 2] = np.abs(roots[:, 2])
+    roots /= np.linalg.norm(roots, axis=1, keepdims=True)
+
+    # 沿发丝的参数 t ∈ [0, 1]，长度随发丝变化
+    t = np.linspace(0.0, 1.0, points_per_strand)
+    lengths = rng.uniform(0.3, 1.2, size=(strands, 1))
+    s = t[None, :] * lengths
+    points = roots[:, None, :] * (1.0 + s[..., None] * 0.3)
+    points[..., 2] -= (s ** 2)  # 下垂
+    points += rng.normal(scale=0.002, size=points.shape)
+    return points.reshape(-1, 3)[:count]
+
+
+def hair_point_cloud(count, seed=0, colors=False):
+    """生成合成点云
+
+    Args:
+        count (int): 点数
+        seed (int): 随机种子
+        colors (bool): 是否生成颜色，无颜色的点云加载时会按高度着色
+
+    Returns:
+        open3d.geometry.PointCloud: 点云
+    """
+    points = hair_points(count, seed)
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+    if colors:
+        rng = np.random.default_rng(seed + 1)
+        pcd.colors = o3d.utility.Vector3dVector(rng.random((len(points), 3)))
+    return pcd
+
+
+def grid_mesh(vertex_count, seed=0):
+    """生成起伏的规则网格，不带颜色和法线
+
+    Args:
+        vertex_count (int): 目标顶点数，实际为不小于它的最小平方数
+        seed (int): 随机种子
+
+    Returns:
+        open3d.geometry.TriangleMesh: 网格
+    """
+    side = max(2, int(np.ceil(np.sqrt(vertex_count))))
+    rng = np.random.default_rng(seed)
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, side), np.linspace(0.0, 1.0, side), indexing="ij")
+    height = 0.05 * np.sin(8 * np.pi * u) * np.cos(6 * np.pi * v)
+    vertices = np.stack([u, v, height], axis=-1).reshape(-1, 3)
+    vertices[:, 2] += rng.normal(scale=0.001, size=len(vertices))
+
+    index = np.arange(side * side, dtype=np.int32).reshape(side, side)
+    a = index[:-1, :-1].ravel()
+    b = index[1:, :-1].ravel()
+    c = index[:-1, 1:].ravel()
+    d = index[1:, 1:].ravel()
+    triangles = np.concatenate([np.stack([a, b, d], axis=1), np.stack([a, d, c], axis=1)])
+    return o3d.geometry.TriangleMesh(o3d.utility.Vector3dVector(vertices),
+                                     o3d.utility.Vector3iVector(triangles))
+
+
+def render_frame(width, height, seed=0):
+    """生成与capture_screen_float_buffer格式相同的浮点帧
+
+    Args:
+        width (int): 宽度
+        height (int): 高度
+        seed (int): 随机种子
+
+    Returns:
+        numpy.ndarray: (height, width, 3) float32，取值范围[0, 1]
+    """
+    rng = np.random.default_rng(seed)
+    return rng.random((height, width, 3), dtype=np.float32)
+
+
+class FrameSource(QObject):
+    """只提供ImageViewWidget绘制所需属性的帧来源，替代需要OpenGL上下文的渲染器"""
+
+    point_added = Signal(np.ndarray)
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.interacting = False
+        self.follow_widget_size = False
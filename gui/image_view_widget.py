@@ -5,10 +5,15 @@
 图像视图组件，用于显示3D渲染结果并处理交互事件
 """
 
+import time
+
 import numpy as np
 from PySide6.QtWidgets import QWidget
 from PySide6.QtGui import QPainter, QImage, QPixmap, QColor, QPalette
-from PySide6.QtCore import Qt, QPoint
+from PySide6.QtCore import Qt, QPoint, QTimer
+
+from renderer.framebuffer import to_uint8_frame
+from utils import tracing
 
 
 class ImageViewWidget(QWidget):
@@ -26,6 +31,17 @@ class ImageViewWidget(QWidget):
         self.image = None
         self.renderer = renderer  # 存储渲染器引用
         
+        # 帧编号和缩放后图像缓存，键为(帧编号, 宽, 高)
+        self.frame_id = 0
+        self._pixmap_cache_key = None
+        self._pixmap_cache = None
+        self.last_paint_ms = 0.0  # 最近一次绘制的耗时，供性能面板显示
+        
+        # 控件尺寸稳定后再调整渲染分辨率，避免拖动窗口边缘时反复重建渲染窗口
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self._sync_render_size)
+        
         # 鼠标跟踪变量
         self.last_pos = None
         self.setMouseTracking(True)
@@ -48,42 +64,77 @@ class ImageViewWidget(QWidget):
         """设置要显示的图像
         
         Args:
-            img_array (numpy.ndarray): 图像数组
+            img_array (numpy.ndarray): (H, W, 3) uint8图像数组，浮点图像会被转换一次
         """
-        self.image = img_array
+        self.image = to_uint8_frame(img_array)
+        self.frame_id += 1
         self.update()
     
-    def paintEvent(self, event):
-        """绘制事件处理器
+    def resizeEvent(self, event):
+        """尺寸变化事件处理器，尺寸稳定后同步渲染分辨率
         
         Args:
-            event: 绘制事件对象
+            event: 尺寸变化事件对象
         """
-        painter = QPainter(self)
+        super().resizeEvent(event)
+        if self.renderer.follow_widget_size:
+            self.resize_timer.start(150)
+    
+    def _sync_render_size(self):
+        """把渲染分辨率设置为控件的物理像素尺寸"""
+        ratio = self.devicePixelRatioF()
+        if self.renderer.resize(round(self.width() * ratio), round(self.height() * ratio)):
+            self.renderer.mark_dirty()
+    
+    def _get_scaled_pixmap(self):
+        """获取缩放到窗口大小的图像，同一帧同一尺寸只生成一次
         
-        if self.image is not None:
-            # 将numpy数组转换为QImage
+        按物理像素缩放，高DPI屏幕上不会模糊。拖动视图时使用快速缩放，
+        静止时使用平滑缩放；图像已是目标尺寸时不缩放。
+        
+        Returns:
+            QPixmap: 缩放后的图像
+        """
+        ratio = self.devicePixelRatioF()
+        fast = self.renderer.interacting
+        key = (self.frame_id, self.width(), self.height(), ratio, fast)
+        if key != self._pixmap_cache_key:
             height, width, channels = self.image.shape
             bytes_per_line = channels * width
             
-            # 从float [0,1]转换为uint8 [0,255]
-            img_8bit = (self.image * 255).astype(np.uint8)
-            
-            # 创建QImage - RGB格式
-            qimg = QImage(img_8bit.data, width, height, 
+            # 创建QImage - RGB格式，数据直接引用uint8数组
+            qimg = QImage(self.image.data, width, height, 
                           bytes_per_line, QImage.Format_RGB888)
             
             # 缩放图像以适应窗口
             pixmap = QPixmap.fromImage(qimg)
-            scaled_pixmap = pixmap.scaled(
-                self.size(), 
-                Qt.AspectRatioMode.KeepAspectRatio, 
-                Qt.TransformationMode.SmoothTransformation
-            )
+            target = self.size() * ratio
+            if pixmap.size() != target:
+                mode = Qt.TransformationMode.FastTransformation if fast else Qt.TransformationMode.SmoothTransformation
+                pixmap = pixmap.scaled(target, Qt.AspectRatioMode.KeepAspectRatio, mode)
+            pixmap.setDevicePixelRatio(ratio)
+            self._pixmap_cache = pixmap
+            self._pixmap_cache_key = key
+        return self._pixmap_cache
+    
+    @tracing.traced("view.paint", "render")
+    def paintEvent(self, event):
+        """绘制事件处理器
+        
+        Args:
+            event: 绘制事件对象
+        """
+        start = time.perf_counter()
+        painter = QPainter(self)
+        
+        if self.image is not None:
+            # 获取缓存的缩放图像
+            scaled_pixmap = self._get_scaled_pixmap()
             
-            # 计算居中位置
-            x = (self.width() - scaled_pixmap.width()) // 2
-            y = (self.height() - scaled_pixmap.height()) // 2
+            # 计算居中位置（按逻辑像素）
+            ratio = scaled_pixmap.devicePixelRatio()
+            x = int((self.width() - scaled_pixmap.width() / ratio) // 2)
+            y = int((self.height() - scaled_pixmap.height() / ratio) // 2)
             
             # 绘制图像
             painter.drawPixmap(x, y, scaled_pixmap)
@@ -109,6 +160,8 @@ class ImageViewWidget(QWidget):
                 Qt.AlignmentFlag.AlignCenter, 
                 "请加载3D模型"
             )
+        painter.end()
+        self.last_paint_ms = (time.perf_counter() - start) * 1000
     
     def mousePressEvent(self, event):
         """鼠标按下事件处理器
@@ -125,9 +178,10 @@ class ImageViewWidget(QWidget):
             if event.button() == Qt.MouseButton.LeftButton:
                 # 获取点击位置相对于图像的位置
                 if self.image is not None:
-                    # 计算图像在窗口中的实际位置和大小
-                    scaled_width = self.width() * 0.8  # 假设图像宽度为窗口宽度的80%
-                    scaled_height = scaled_width * (self.image.shape[0] / self.image.shape[1])
+                    # 计算图像在窗口中的实际位置和大小（与paintEvent中保持宽高比的缩放一致）
+                    scale = min(self.width() / self.renderer.width, self.height() / self.renderer.height)
+                    scaled_width = self.renderer.width * scale
+                    scaled_height = self.renderer.height * scale
                     x_offset = (self.width() - scaled_width) / 2
                     y_offset = (self.height() - scaled_height) / 2
                     
@@ -135,12 +189,12 @@ class ImageViewWidget(QWidget):
                     x = event.position().x() - x_offset
                     y = event.position().y() - y_offset
                     
-                    # 将坐标映射到图像尺寸
-                    x = int(x * (self.image.shape[1] / scaled_width))
-                    y = int(y * (self.image.shape[0] / scaled_height))
+                    # 将坐标映射到渲染分辨率（显示的帧可能是拖动时降低分辨率的帧）
+                    x = int(x * (self.renderer.width / scaled_width))
+                    y = int(y * (self.renderer.height / scaled_height))
                     
                     # 确保坐标在有效范围内
-                    if 0 <= x < self.image.shape[1] and 0 <= y < self.image.shape[0]:
+                    if 0 <= x < self.renderer.width and 0 <= y < self.renderer.height:
                         # 调用渲染器处理点击
                         self.renderer.handle_click(x, y)
             else:
@@ -165,10 +219,12 @@ class ImageViewWidget(QWidget):
             
             # 根据不同按钮进行不同操作
             if event.buttons() & Qt.MouseButton.LeftButton:
-                # 左键旋转
+                # 左键旋转，拖动期间显示粗糙的LOD层
+                self.renderer.begin_interaction()
                 self.renderer.rotate_view(dx, dy)
             elif event.buttons() & Qt.MouseButton.RightButton:
                 # 右键平移
+                self.renderer.begin_interaction()
                 self.renderer.pan_view(dx, dy)
             
             self.last_pos = curr_pos
@@ -183,7 +239,9 @@ class ImageViewWidget(QWidget):
             # 在编辑模式下，完成编辑操作
             self.finalize_edit()
         else:
-            # 在默认模式下，清除位置跟踪
+            # 在默认模式下，清除位置跟踪，松开后立即恢复全分辨率
+            if self.last_pos is not None:
+                self.renderer.end_interaction()
             self.last_pos = None
     
     def wheelEvent(self, event):
@@ -193,9 +251,10 @@ class ImageViewWidget(QWidget):
             event: 鼠标滚轮事件对象
         """
         if not self.edit_mode:
+            # 缩放量与angleDelta成正比，同一帧内的多个滚轮事件由渲染器合并
             delta = event.angleDelta().y()
-            # 确保正确的缩放方向
-            self.renderer.zoom_view(delta)
+            if delta:
+                self.renderer.zoom_view(delta)
     
     def set_edit_mode(self, enabled, tool=None):
         """设置编辑模式
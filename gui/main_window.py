@@ -7,16 +7,17 @@
 
 import os
 from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QDockWidget, 
-                              QFileDialog, QMessageBox, QStatusBar)
+                              QFileDialog, QMessageBox, QStatusBar, QInputDialog)
 from PySide6.QtGui import QAction
 from PySide6.QtCore import Qt, Slot, QSize
 
 from gui.viewport import Viewport3D
 from gui.toolbars import MainToolBar
-from gui.sidebar import PropertiesPanel, ControlPanel
+from gui.sidebar import PropertiesPanel, ControlPanel, PerformanceGroup
 from gui.styled_frame import StyledFrame
 from utils.model_manager import ModelManager
 from utils.data_interface import DataInterface
+from utils import tracing
 
 
 class MainWindow(QMainWindow):
@@ -34,6 +35,12 @@ class MainWindow(QMainWindow):
         self.model_manager = ModelManager(config)
         self.data_interface = DataInterface(config)
         
+        # 性能跟踪，环境变量HAIR_EZCLICK_TRACE已在导入时启用跟踪
+        trace_buffer = config.get_value("tracing", "buffer_size", 100000) if config else 100000
+        if tracing.is_enabled() or (config.get_value("tracing", "enabled", False) if config else False):
+            tracing.enable(trace_buffer)
+        self.trace_buffer_size = trace_buffer
+        
         # 设置窗口属性
         self.setWindowTitle(config.get_value("window", "title", "Hair Ezclick") if config else "Hair Ezclick")
         self.resize(
@@ -136,6 +143,16 @@ class MainWindow(QMainWindow):
         self.properties_panel = PropertiesPanel(self.model_manager)
         self.right_layout.addWidget(self.properties_panel)
         
+        # 性能面板，默认隐藏，可通过"视图 > 性能面板"显示
+        self.performance_group = PerformanceGroup(
+            self.model_manager, self.viewport.renderer, self.viewport.image_view, self.data_interface,
+            refresh_ms=self.config.get_value("performance_panel", "refresh_ms", 1000) if self.config else 1000
+        )
+        self.properties_panel.set_performance_group(self.performance_group)
+        self.performance_group.setVisible(
+            self.config.get_value("performance_panel", "enabled", False) if self.config else False
+        )
+        
         # 将所有面板添加到主布局
         main_layout.addWidget(self.left_panel, 1)
         main_layout.addWidget(self.center_panel, 4)
@@ -155,6 +172,12 @@ class MainWindow(QMainWindow):
         self.export_action = QAction("导出模型", self)
         self.export_action.triggered.connect(self.export_file)
         
+        self.save_annotations_action = QAction("保存标注", self)
+        self.save_annotations_action.triggered.connect(self.save_annotations)
+        
+        self.load_annotations_action = QAction("加载标注", self)
+        self.load_annotations_action.triggered.connect(self.load_annotations)
+        
         self.exit_action = QAction("退出", self)
         self.exit_action.setShortcut("Ctrl+Q")
         self.exit_action.triggered.connect(self.close)
@@ -172,6 +195,26 @@ class MainWindow(QMainWindow):
         self.reset_view_action = QAction("重置视图", self)
         self.reset_view_action.triggered.connect(self.reset_view)
         
+        self.fit_view_action = QAction("适配模型", self)
+        self.fit_view_action.triggered.connect(self.fit_view)
+        
+        self.performance_action = QAction("性能面板", self)
+        self.performance_action.setCheckable(True)
+        self.performance_action.setChecked(self.performance_group.isVisibleTo(self.properties_panel))
+        self.performance_action.toggled.connect(self.performance_group.setVisible)
+        
+        self.add_bookmark_action = QAction("添加视图书签...", self)
+        self.add_bookmark_action.triggered.connect(self.add_view_bookmark)
+        
+        # 工具菜单动作
+        self.tracing_action = QAction("记录性能跟踪", self)
+        self.tracing_action.setCheckable(True)
+        self.tracing_action.setChecked(tracing.is_enabled())
+        self.tracing_action.toggled.connect(self.toggle_tracing)
+        
+        self.export_trace_action = QAction("导出性能跟踪...", self)
+        self.export_trace_action.triggered.connect(self.export_trace)
+        
         # 连接到后端的动作
         self.connect_backend_action = QAction("连接到后端", self)
         self.connect_backend_action.triggered.connect(self.connect_to_backend)
@@ -184,6 +227,9 @@ class MainWindow(QMainWindow):
         file_menu.addAction(self.save_action)
         file_menu.addAction(self.export_action)
         file_menu.addSeparator()
+        file_menu.addAction(self.save_annotations_action)
+        file_menu.addAction(self.load_annotations_action)
+        file_menu.addSeparator()
         file_menu.addAction(self.exit_action)
         
         # 编辑菜单
@@ -194,9 +240,17 @@ class MainWindow(QMainWindow):
         # 视图菜单
         view_menu = self.menuBar().addMenu("视图")
         view_menu.addAction(self.reset_view_action)
+        view_menu.addAction(self.fit_view_action)
+        view_menu.addAction(self.performance_action)
+        view_menu.addSeparator()
+        view_menu.addAction(self.add_bookmark_action)
+        self.bookmark_menu = view_menu.addMenu("视图书签")
+        self.bookmark_menu.aboutToShow.connect(self._update_bookmark_menu)
         
         # 工具菜单
         tools_menu = self.menuBar().addMenu("工具")
+        tools_menu.addAction(self.tracing_action)
+        tools_menu.addAction(self.export_trace_action)
         
         # 后端菜单
         backend_menu = self.menuBar().addMenu("后端")
@@ -223,6 +277,12 @@ class MainWindow(QMainWindow):
         self.data_interface.model_received.connect(self.handle_model_received)
         self.data_interface.connection_error.connect(self.handle_connection_error)
         self.data_interface.processing_complete.connect(self.handle_processing_complete)
+        self.data_interface.connection_checked.connect(self.handle_connection_checked)
+        self.data_interface.transfer_progress.connect(self.handle_transfer_progress)
+        
+        # 渲染器加载信号
+        self.viewport.renderer.load_progress.connect(self.handle_load_progress)
+        self.viewport.renderer.model_loaded.connect(self.handle_model_loaded)
     
     def load_file(self):
         """打开文件选择对话框并加载3D文件"""
@@ -236,13 +296,8 @@ class MainWindow(QMainWindow):
         if file_path:
             self.statusBar().showMessage(f"正在加载模型...")
             
-            success = self.viewport.load_model(file_path)
-            
-            if success:
-                file_name = os.path.basename(file_path)
-                self.statusBar().showMessage(f'已加载: {file_name}')
-            else:
-                self.statusBar().showMessage('加载失败')
+            # 在后台加载，结果由handle_model_loaded处理
+            self.viewport.load_model_async(file_path)
     
     def save_file(self):
         """保存当前模型"""
@@ -266,11 +321,80 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "保存失败", message)
                 self.statusBar().showMessage("保存失败")
     
+    def save_annotations(self):
+        """保存点击标注"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            '保存标注',
+            '',
+            '标注文件 (*.npz)'
+        )
+        
+        if file_path:
+            success, message = self.viewport.renderer.save_annotations(file_path)
+            if success:
+                self.statusBar().showMessage(message)
+            else:
+                QMessageBox.warning(self, "保存失败", message)
+    
+    def load_annotations(self):
+        """加载点击标注"""
+        if not self.viewport.renderer.geometry_loaded:
+            self.statusBar().showMessage("请先加载模型")
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            '加载标注',
+            '',
+            '标注文件 (*.npz)'
+        )
+        
+        if file_path:
+            success, message = self.viewport.renderer.load_annotations(file_path)
+            if success:
+                self.statusBar().showMessage(message)
+            else:
+                QMessageBox.warning(self, "加载失败", message)
+    
     def export_file(self):
         """导出当前模型"""
         # 目前与保存功能相同，未来可以扩展为支持更多格式
         self.save_file()
     
+    def toggle_tracing(self, enabled):
+        """开始或停止记录性能跟踪
+        
+        Args:
+            enabled (bool): 是否记录
+        """
+        if enabled:
+            tracing.enable(self.trace_buffer_size)
+            self.statusBar().showMessage("已开始记录性能跟踪")
+        else:
+            tracing.disable()
+            self.statusBar().showMessage(f"已停止记录性能跟踪，缓冲区中有 {tracing.get_stats()['events']} 个事件")
+    
+    def export_trace(self):
+        """把已记录的性能跟踪导出为Chrome跟踪JSON"""
+        if not tracing.get_stats()["events"]:
+            self.statusBar().showMessage("没有可导出的跟踪事件，请先开启记录")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            '导出性能跟踪',
+            'trace.json',
+            'Chrome跟踪文件 (*.json)'
+        )
+        
+        if file_path:
+            try:
+                count = tracing.export_chrome_trace(file_path)
+                self.statusBar().showMessage(f"已导出 {count} 个跟踪事件到: {file_path}")
+            except OSError as e:
+                QMessageBox.warning(self, "导出失败", str(e))
+    
     def undo(self):
         """撤销操作"""
         if self.model_manager.can_undo():
@@ -289,18 +413,64 @@ class MainWindow(QMainWindow):
     
     def reset_view(self):
         """重置视图"""
-        # 重新加载当前模型以重置视图
-        if self.viewport.renderer.current_model_path:
-            self.viewport.load_model(self.viewport.renderer.current_model_path)
+        # 只恢复相机参数，不重新加载模型，未保存的编辑和历史记录保持不变
+        if self.viewport.renderer.reset_camera():
             self.statusBar().showMessage("视图已重置")
     
+    def fit_view(self):
+        """保持当前朝向，使编辑后的模型完整位于视野内"""
+        if self.viewport.renderer.fit_camera():
+            self.statusBar().showMessage("视图已适配模型")
+    
+    def add_view_bookmark(self):
+        """把当前视图保存为书签"""
+        renderer = self.viewport.renderer
+        if not renderer.geometry_loaded:
+            self.statusBar().showMessage("请先加载模型")
+            return
+        
+        name, ok = QInputDialog.getText(self, "添加视图书签", "书签名称:",
+                                        text=f"视图{len(renderer.get_view_bookmarks()) + 1}")
+        if ok and name:
+            renderer.add_view_bookmark(name)
+            self.statusBar().showMessage(f"已添加视图书签: {name}")
+    
+    def _update_bookmark_menu(self):
+        """根据当前书签重建书签菜单"""
+        self.bookmark_menu.clear()
+        names = self.viewport.renderer.get_view_bookmarks()
+        if not names:
+            action = self.bookmark_menu.addAction("（无书签）")
+            action.setEnabled(False)
+            return
+        for name in names:
+            action = self.bookmark_menu.addAction(name)
+            action.triggered.connect(lambda checked=False, n=name: self.goto_view_bookmark(n))
+    
+    def goto_view_bookmark(self, name):
+        """跳转到视图书签
+        
+        Args:
+            name (str): 书签名称
+        """
+        if self.viewport.renderer.goto_view_bookmark(name):
+            self.statusBar().showMessage(f"视图书签: {name}")
+    
     def connect_to_backend(self):
         """连接到后端服务"""
         self.statusBar().showMessage("正在连接到后端...")
         
-        # 尝试连接到后端
-        success, message = self.data_interface.connect_to_backend()
+        # 在后台尝试连接到后端，结果由handle_connection_checked处理
+        self.data_interface.connect_to_backend_async()
+    
+    @Slot(bool, str)
+    def handle_connection_checked(self, success, message):
+        """处理后端连接测试结果
         
+        Args:
+            success (bool): 是否连接成功
+            message (str): 连接信息
+        """
         if success:
             QMessageBox.information(self, "连接成功", "已成功连接到后端服务")
             self.statusBar().showMessage("已连接到后端")
@@ -381,6 +551,30 @@ class MainWindow(QMainWindow):
         
         self.statusBar().showMessage("已应用设置")
     
+    @Slot(int, str)
+    def handle_load_progress(self, percent, stage):
+        """处理模型加载进度
+        
+        Args:
+            percent (int): 进度百分比
+            stage (str): 阶段描述
+        """
+        self.statusBar().showMessage(f"正在加载模型: {stage} ({percent}%)")
+    
+    @Slot(bool, str)
+    def handle_model_loaded(self, success, message):
+        """处理模型加载结果
+        
+        Args:
+            success (bool): 是否成功加载
+            message (str): 加载信息
+        """
+        if success:
+            file_name = os.path.basename(self.viewport.renderer.current_model_path)
+            self.statusBar().showMessage(f'已加载: {file_name}')
+        else:
+            self.statusBar().showMessage(f'加载失败: {message}')
+    
     @Slot(str)
     def handle_edit_applied(self, message):
         """处理编辑应用
@@ -407,8 +601,8 @@ class MainWindow(QMainWindow):
         Args:
             file_path (str): 模型文件路径
         """
-        self.viewport.load_model(file_path)
-        self.statusBar().showMessage(f"已加载来自后端的模型")
+        self.statusBar().showMessage("正在加载来自后端的模型...")
+        self.viewport.load_model_async(file_path)
     
     @Slot(str)
     def handle_connection_error(self, message):
@@ -420,6 +614,21 @@ class MainWindow(QMainWindow):
         QMessageBox.warning(self, "连接错误", message)
         self.statusBar().showMessage(f"连接错误: {message}")
     
+    @Slot(str, object, object)
+    def handle_transfer_progress(self, direction, done, total):
+        """处理后端传输进度
+        
+        Args:
+            direction (str): 'upload'或'download'
+            done (int): 已传输字节
+            total (int): 总字节，未知时为0
+        """
+        action = "上传" if direction == "upload" else "下载"
+        if total:
+            self.statusBar().showMessage(f"正在{action}模型: {done * 100 // total}%")
+        else:
+            self.statusBar().showMessage(f"正在{action}模型: {done // 1024} KB")
+    
     @Slot(dict)
     def handle_processing_complete(self, result):
         """处理后端处理完成
@@ -429,8 +638,8 @@ class MainWindow(QMainWindow):
         """
         # 处理后端返回的结果
         if "model_id" in result:
-            # 尝试获取处理后的模型
-            self.data_interface.get_model_from_backend(result["model_id"])
+            # 在后台获取处理后的模型
+            self.data_interface.get_model_from_backend_async(result["model_id"])
         
         self.statusBar().showMessage("后端处理完成")
     
@@ -441,6 +650,7 @@ class MainWindow(QMainWindow):
             event: 关闭事件对象
         """
         # 清理资源
+        self.data_interface.shutdown()
         self.viewport.cleanup()
         
         # 调用父类方法
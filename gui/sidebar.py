@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 
 """
-侧边栏组件，包括属性面板和控制面板
+侧边栏组件，包括属性面板、性能面板和控制面板
 """
 
+import os
+import time
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QComboBox, 
                               QPushButton, QGroupBox, QFormLayout, QSpinBox, 
                               QLineEdit, QScrollArea, QSizePolicy)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 
 
 class PropertiesPanel(QWidget):
@@ -43,6 +46,8 @@ class PropertiesPanel(QWidget):
         # 模型信息组
         info_group = self._create_info_group()
         layout.addWidget(info_group)
+        self.content_layout = layout
+        self.performance_group = None
         
         # 密度设置组
         density_group = self._create_density_group()
@@ -193,6 +198,15 @@ class PropertiesPanel(QWidget):
             self.vertices_count_label.setText("-")
             self.dimensions_label.setText("-")
     
+    def set_performance_group(self, group):
+        """在模型信息组下方添加性能面板
+        
+        Args:
+            group (PerformanceGroup): 性能面板
+        """
+        self.performance_group = group
+        self.content_layout.insertWidget(1, group)
+    
     def get_current_settings(self):
         """获取当前面板设置
         
@@ -207,6 +221,115 @@ class PropertiesPanel(QWidget):
         }
 
 
+def _format_bytes(size):
+    """字节数格式化为MB"""
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _process_rss():
+    """读取当前进程的常驻内存字节数，不支持的平台返回None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class PerformanceGroup(QGroupBox):
+    """性能面板，以较低频率读取渲染器和模型管理器维护的计数
+    
+    只读取已有的计数和缓存大小，刷新本身不会遍历几何数据，不影响渲染帧率。
+    隐藏时停止刷新。
+    """
+    
+    def __init__(self, model_manager, renderer, image_view, data_interface=None, refresh_ms=1000, parent=None):
+        """初始化性能面板
+        
+        Args:
+            model_manager: 模型管理器对象
+            renderer: 渲染器对象
+            image_view: 显示渲染结果的图像视图组件
+            data_interface: 后端数据接口对象，可选
+            refresh_ms (int): 刷新间隔（毫秒）
+            parent: 父级窗口部件
+        """
+        super().__init__("性能", parent)
+        self.model_manager = model_manager
+        self.renderer = renderer
+        self.image_view = image_view
+        self.data_interface = data_interface
+        
+        layout = QFormLayout(self)
+        self.fps_label = QLabel("-")
+        self.render_label = QLabel("-")
+        self.capture_label = QLabel("-")
+        self.paint_label = QLabel("-")
+        self.model_memory_label = QLabel("-")
+        self.history_memory_label = QLabel("-")
+        self.cache_memory_label = QLabel("-")
+        self.process_memory_label = QLabel("-")
+        self.jobs_label = QLabel("-")
+        
+        layout.addRow("帧率:", self.fps_label)
+        layout.addRow("渲染:", self.render_label)
+        layout.addRow("捕获:", self.capture_label)
+        layout.addRow("绘制:", self.paint_label)
+        layout.addRow("模型内存:", self.model_memory_label)
+        layout.addRow("历史内存:", self.history_memory_label)
+        layout.addRow("缓存内存:", self.cache_memory_label)
+        layout.addRow("进程内存:", self.process_memory_label)
+        layout.addRow("后台任务:", self.jobs_label)
+        
+        # 帧率由两次刷新之间渲染的帧数计算
+        self._last_frames = self.renderer.scheduler.frames_rendered
+        self._last_time = time.perf_counter()
+        
+        self.timer = QTimer(self)
+        self.timer.setInterval(max(100, int(refresh_ms)))
+        self.timer.timeout.connect(self.refresh)
+    
+    def setVisible(self, visible):
+        """显示时开始刷新，隐藏时停止刷新"""
+        super().setVisible(visible)
+        if visible:
+            self._last_frames = self.renderer.scheduler.frames_rendered
+            self._last_time = time.perf_counter()
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+    
+    def refresh(self):
+        """读取计数并更新显示"""
+        now = time.perf_counter()
+        frames = self.renderer.scheduler.frames_rendered
+        elapsed = now - self._last_time
+        if elapsed > 0:
+            self.fps_label.setText(f"{(frames - self._last_frames) / elapsed:.1f}")
+        self._last_frames = frames
+        self._last_time = now
+        
+        times = self.renderer.frame_times
+        self.render_label.setText(f"{times['poll'] + times['render']:.1f} ms")
+        self.capture_label.setText(f"{times['capture'] + times['convert']:.1f} ms")
+        self.paint_label.setText(f"{self.image_view.last_paint_ms:.1f} ms")
+        
+        memory = self.model_manager.get_memory_usage()
+        self.model_memory_label.setText(_format_bytes(memory["model"]))
+        history = _format_bytes(memory["history"])
+        if memory["history_disk"]:
+            history += f"（磁盘 {_format_bytes(memory['history_disk'])}）"
+        self.history_memory_label.setText(history)
+        self.cache_memory_label.setText(_format_bytes(sum(self.renderer.get_memory_usage().values())))
+        rss = _process_rss()
+        self.process_memory_label.setText(_format_bytes(rss) if rss is not None else "-")
+        
+        jobs = self.renderer.background_jobs()
+        if self.data_interface is not None:
+            jobs += self.data_interface.requests_in_flight()
+        self.jobs_label.setText(str(jobs))
+
+
 class ControlPanel(QWidget):
     """控制面板组件，包含其他不适合放在属性面板的控件"""
     
@@ -43,10 +43,11 @@ class Viewport3D(QWidget):
         
         # 连接信号和槽
         self.renderer.model_loaded.connect(self._on_model_loaded)
-        self.model_manager.model_updated.connect(self._on_model_updated)
+        self.model_manager.geometry_changed.connect(self._on_geometry_changed)
+        self.renderer.lod_ready.connect(self.model_manager.set_lod_pyramid)
     
     def load_model(self, file_path):
-        """加载3D模型文件
+        """同步加载3D模型文件
         
         Args:
             file_path (str): 模型文件路径
@@ -54,19 +55,18 @@ class Viewport3D(QWidget):
         Returns:
             bool: 是否成功加载
         """
-        success = self.renderer.set_geometry(file_path)
+        # 模型管理器在_on_model_loaded中更新
+        return self.renderer.set_geometry(file_path)
+    
+    def load_model_async(self, file_path):
+        """在后台加载3D模型文件，正在进行的旧加载会被取消
         
-        if success:
-            # 根据文件扩展名确定模型类型
-            if file_path.endswith('.pcd'):
-                model_type = 'pcd'
-            else:
-                model_type = 'mesh'
-            
-            # 将当前模型设置到模型管理器
-            self.model_manager.set_model(self.renderer.get_current_model(), model_type)
+        加载进度和结果分别通过渲染器的load_progress和model_loaded信号报告。
         
-        return success
+        Args:
+            file_path (str): 模型文件路径
+        """
+        self.renderer.load_async(file_path)
     
     def set_edit_mode(self, enabled, tool=None):
         """设置编辑模式
@@ -86,13 +86,23 @@ class Viewport3D(QWidget):
             message (str): 加载消息
         """
         print(f"模型加载: {'成功' if success else '失败'} - {message}")
+        
+        if success:
+            # 将当前模型设置到模型管理器
+            # 与渲染器共享统计缓存，包围盒只计算一次；分块模式的模型只读
+            self.model_manager.set_model(self.renderer.get_current_model(), self.renderer.current_model_type,
+                                         stats=self.renderer.model_stats,
+                                         read_only=self.renderer.out_of_core is not None)
     
-    @Slot()
-    def _on_model_updated(self):
-        """模型更新回调，刷新渲染"""
-        # 模型已更新，需要刷新渲染
-        # 由于Open3D渲染器直接引用了模型对象，这里不需要额外操作
-        pass
+    @Slot(object)
+    def _on_geometry_changed(self, change):
+        """模型数据变化回调，刷新渲染
+        
+        Args:
+            change (GeometryChange): 变化描述
+        """
+        # 渲染器合并同一批次的变化，只上传一次几何数据并标记场景为脏
+        self.renderer.update_geometry(change)
     
     def cleanup(self):
         """清理资源"""
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+标注层模块，用可增长的NumPy缓冲区存储点击标注
+
+标注按添加顺序连续存放在预分配的数组中，容量不足时翻倍，
+添加和删除都按批处理，单次操作的开销与本批数量和当前标注数成线性关系。
+渲染时每个标注显示为一个八面体标记，大小和颜色可以逐个设置。
+
+标记网格按容量预分配（每个容量位置6个顶点、8个三角面，空位置退化为一个点），
+标注层记录自上次同步以来变化的位置区间，渲染器只改写这一段顶点和颜色。
+添加一个标注时只需写入它自己的6个顶点，网格只在容量翻倍时重建。
+"""
+
+import numpy as np
+
+
+# 八面体标记的顶点方向和三角面
+_MARKER_OFFSETS = np.array([
+    [1, 0, 0], [-1, 0, 0],
+    [0, 1, 0], [0, -1, 0],
+    [0, 0, 1], [0, 0, -1]
+], dtype=np.float64)
+_MARKER_TRIANGLES = np.array([
+    [0, 2, 4], [2, 1, 4], [1, 3, 4], [3, 0, 4],
+    [2, 0, 5], [1, 2, 5], [3, 1, 5], [0, 3, 5]
+], dtype=np.int32)
+MARKER_VERTICES = len(_MARKER_OFFSETS)  # 每个标记的顶点数
+
+
+class AnnotationLayer:
+    """点击标注集合"""
+
+    def __init__(self, capacity=256):
+        """初始化标注层
+
+        Args:
+            capacity (int): 初始容量
+        """
+        self._capacity = max(int(capacity), 1)
+        self._positions = np.empty((self._capacity, 3), dtype=np.float64)
+        self._colors = np.empty((self._capacity, 3), dtype=np.float64)
+        self._sizes = np.empty(self._capacity, dtype=np.float64)
+        self._ids = np.empty(self._capacity, dtype=np.int64)
+        self._count = 0
+        self._next_id = 0
+        self._dirty = None  # 自上次take_dirty以来变化的位置区间 [start, end)
+        self.version = 0  # 每次修改递增，用于判断显示是否需要更新
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def positions(self):
+        """(N, 3) 标注坐标（只读视图）"""
+        return self._view(self._positions)
+
+    @property
+    def colors(self):
+        """(N, 3) 标注颜色（只读视图）"""
+        return self._view(self._colors)
+
+    @property
+    def sizes(self):
+        """(N,) 标注大小（只读视图）"""
+        return self._view(self._sizes)
+
+    @property
+    def ids(self):
+        """(N,) 标注ID（只读视图），ID在删除后不会复用"""
+        return self._view(self._ids)
+
+    @property
+    def capacity(self):
+        """已分配的容量"""
+        return self._capacity
+
+    def _mark_dirty(self, start, end):
+        """记录位置区间[start, end)的标记需要重新生成"""
+        if end <= start:
+            return
+        if self._dirty is None:
+            self._dirty = (start, end)
+        else:
+            self._dirty = (min(self._dirty[0], start), max(self._dirty[1], end))
+
+    def take_dirty(self):
+        """取出并清空变化的位置区间
+
+        Returns:
+            tuple: (start, end)，没有变化时为(0, 0)
+        """
+        dirty = self._dirty or (0, 0)
+        self._dirty = None
+        return dirty
+
+    def _view(self, array):
+        view = array[:self._count]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, count):
+        """确保容量至少为count，不足时按2倍扩容"""
+        if count <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < count:
+            capacity *= 2
+        for name in ("_positions", "_colors", "_sizes", "_ids"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    def add(self, positions, colors, sizes):
+        """批量添加标注
+
+        Args:
+            positions (numpy.ndarray): (K, 3) 坐标
+            colors (numpy.ndarray): (K, 3) 或 (3,) 颜色
+            sizes (numpy.ndarray or float): (K,) 大小或统一大小
+
+        Returns:
+            numpy.ndarray: 新标注的ID
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        k = len(positions)
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+
+        self._reserve(self._count + k)
+        start, end = self._count, self._count + k
+        self._positions[start:end] = positions
+        self._colors[start:end] = np.broadcast_to(np.asarray(colors, dtype=np.float64), (k, 3))
+        self._sizes[start:end] = np.broadcast_to(np.asarray(sizes, dtype=np.float64), (k,))
+        ids = np.arange(self._next_id, self._next_id + k, dtype=np.int64)
+        self._ids[start:end] = ids
+        self._next_id += k
+        self._count = end
+        self._mark_dirty(start, end)
+        self.version += 1
+        return ids
+
+    def remove(self, ids):
+        """批量删除标注，剩余标注保持原有顺序
+
+        Args:
+            ids (array-like): 要删除的标注ID，不存在的ID会被忽略
+
+        Returns:
+            int: 实际删除的数量
+        """
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        if self._count == 0 or len(ids) == 0:
+            return 0
+        keep = ~np.isin(self._ids[:self._count], ids)
+        removed = self._count - int(keep.sum())
+        if removed == 0:
+            return 0
+        remaining = self._count - removed
+        # 第一个被删除的位置之后的标注都向前移动
+        first = int(np.argmin(keep))
+        for array in (self._positions, self._colors, self._sizes, self._ids):
+            array[first:remaining] = array[first:self._count][keep[first:]]
+        self._mark_dirty(first, self._count)
+        self._count = remaining
+        self.version += 1
+        return removed
+
+    def set_style(self, ids, colors=None, sizes=None):
+        """修改标注的颜色或大小
+
+        Args:
+            ids (array-like): 标注ID
+            colors (numpy.ndarray, optional): (K, 3) 或 (3,) 颜色
+            sizes (numpy.ndarray or float, optional): (K,) 大小或统一大小
+        """
+        rows = np.flatnonzero(np.isin(self._ids[:self._count], np.asarray(ids, dtype=np.int64)))
+        if len(rows) == 0:
+            return
+        if colors is not None:
+            self._colors[rows] = np.asarray(colors, dtype=np.float64)
+        if sizes is not None:
+            self._sizes[rows] = np.asarray(sizes, dtype=np.float64)
+        self._mark_dirty(int(rows[0]), int(rows[-1]) + 1)
+        self.version += 1
+
+    def clear(self):
+        """删除所有标注，保留已分配的容量"""
+        if self._count:
+            self._mark_dirty(0, self._count)
+            self._count = 0
+            self.version += 1
+
+    def save(self, file_path):
+        """保存标注到.npz文件
+
+        Args:
+            file_path (str): 文件路径
+        """
+        np.savez(file_path, positions=self.positions, colors=self.colors,
+                 sizes=self.sizes, ids=self.ids, next_id=self._next_id)
+
+    def load(self, file_path):
+        """从.npz文件加载标注，替换当前所有标注
+
+        Args:
+            file_path (str): 文件路径
+        """
+        with np.load(file_path) as data:
+            positions = data["positions"]
+            count = len(positions)
+            self._mark_dirty(0, max(self._count, count))
+            self._count = 0
+            self._reserve(count)
+            self._positions[:count] = positions
+            self._colors[:count] = data["colors"]
+            self._sizes[:count] = data["sizes"]
+            self._ids[:count] = data["ids"]
+            next_id = int(data["next_id"]) if "next_id" in data else 0
+        self._count = count
+        # 删除过的ID不再复用
+        self._next_id = max(next_id, int(self._ids[:count].max()) + 1 if count else 0)
+        self.version += 1
+
+    def marker_rows(self, start, end):
+        """生成位置区间[start, end)的标记顶点和颜色，超出标注数的位置退化为原点处的一个点
+
+        Args:
+            start (int): 起始位置
+            end (int): 结束位置（不含）
+
+        Returns:
+            tuple: ((end-start)*6, 3) 顶点, ((end-start)*6, 3) 顶点颜色
+        """
+        used = min(max(self._count - start, 0), end - start)
+        k = end - start
+        vertices = np.zeros((k, len(_MARKER_OFFSETS), 3))
+        colors = np.zeros((k, len(_MARKER_OFFSETS), 3))
+        rows = slice(start, start + used)
+        vertices[:used] = self._positions[rows, None, :] + _MARKER_OFFSETS[None, :, :] * self._sizes[rows, None, None]
+        colors[:used] = self._colors[rows, None, :]
+        return vertices.reshape(-1, 3), colors.reshape(-1, 3)
+
+
+def marker_topology(capacity):
+    """生成capacity个标记位置的三角面和顶点法线，与标注内容无关，只在容量变化时生成
+
+    Args:
+        capacity (int): 标记位置数
+
+    Returns:
+        tuple: (capacity*8, 3) 三角面, (capacity*6, 3) 顶点法线
+    """
+    triangles = (_MARKER_TRIANGLES[None, :, :]
+                 + (np.arange(capacity, dtype=np.int32) * len(_MARKER_OFFSETS))[:, None, None]).reshape(-1, 3)
+    normals = np.tile(_MARKER_OFFSETS, (capacity, 1))
+    return triangles, normals
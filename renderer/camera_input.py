@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+相机输入累加模块，把两帧之间的多次鼠标事件合并为每帧一次视图操作
+
+高回报率鼠标在两帧之间可能产生数百个移动事件，逐个调用ViewControl没有意义，
+只有最后的相机位置会被渲染。累加器只记录增量之和，渲染前由渲染器一次性应用:
+旋转和平移的增量直接相加，滚轮按刻度（angleDelta / 120，高精度滚轮为小数）相加。
+"""
+
+
+WHEEL_NOTCH = 120.0  # Qt中一个滚轮刻度的angleDelta
+
+
+class CameraInputAccumulator:
+    """相机输入累加器"""
+
+    def __init__(self):
+        """初始化累加器"""
+        self._rotate = [0.0, 0.0]
+        self._pan = [0.0, 0.0]
+        self._zoom = 0.0
+        self._pending_events = 0
+        self.reset_stats()
+
+    def add_rotate(self, dx, dy):
+        """累加旋转增量（像素）"""
+        self._rotate[0] += dx
+        self._rotate[1] += dy
+        self._pending_events += 1
+        self.events["rotate"] += 1
+
+    def add_pan(self, dx, dy):
+        """累加平移增量（像素）"""
+        self._pan[0] += dx
+        self._pan[1] += dy
+        self._pending_events += 1
+        self.events["pan"] += 1
+
+    def add_wheel(self, angle_delta):
+        """累加滚轮增量
+
+        Args:
+            angle_delta (float): QWheelEvent.angleDelta().y()，正值表示向前滚动
+        """
+        self._zoom += angle_delta / WHEEL_NOTCH
+        self._pending_events += 1
+        self.events["zoom"] += 1
+
+    def has_pending(self):
+        """是否有尚未应用的输入"""
+        return self._pending_events > 0
+
+    def take(self):
+        """取出并清空累加的输入
+
+        Returns:
+            tuple: (旋转(dx, dy)或None, 平移(dx, dy)或None, 滚轮刻度数或None)
+        """
+        if not self._pending_events:
+            return None, None, None
+        rotate = tuple(self._rotate) if any(self._rotate) else None
+        pan = tuple(self._pan) if any(self._pan) else None
+        zoom = self._zoom if self._zoom else None
+
+        commands = (rotate is not None) + (pan is not None) + (zoom is not None)
+        self.commands_applied += commands
+        self.events_coalesced += self._pending_events - commands
+        self.flushes += 1
+
+        self._rotate = [0.0, 0.0]
+        self._pan = [0.0, 0.0]
+        self._zoom = 0.0
+        self._pending_events = 0
+        return rotate, pan, zoom
+
+    def get_stats(self):
+        """获取累加统计
+
+        Returns:
+            dict: 收到的各类事件数、实际应用的视图操作数、被合并的事件数和应用次数
+        """
+        return {
+            "input_events": sum(self.events.values()),
+            "rotate_events": self.events["rotate"],
+            "pan_events": self.events["pan"],
+            "zoom_events": self.events["zoom"],
+            "camera_commands": self.commands_applied,
+            "events_coalesced": self.events_coalesced,
+            "input_flushes": self.flushes
+        }
+
+    def reset_stats(self):
+        """重置统计计数"""
+        self.events = {"rotate": 0, "pan": 0, "zoom": 0}
+        self.commands_applied = 0
+        self.events_coalesced = 0
+        self.flushes = 0
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+颜色映射模块，负责把标量（如高度）批量映射为RGB颜色
+
+所有映射都以整块NumPy数组为单位计算，不对单个点做Python循环。
+"""
+
+import numpy as np
+
+
+# matplotlib "hot" 颜色表的分段锚点: (位置, 值)
+_HOT_SEGMENTS = {
+    "red": [(0.0, 0.0416), (0.365079, 1.0), (1.0, 1.0)],
+    "green": [(0.0, 0.0), (0.365079, 0.0), (0.746032, 1.0), (1.0, 1.0)],
+    "blue": [(0.0, 0.0), (0.746032, 0.0), (1.0, 1.0)],
+}
+
+# 默认查找表大小，与matplotlib保持一致
+LUT_SIZE = 256
+
+
+def _rainbow(t):
+    """五段彩虹渐变（深蓝-蓝-青-绿-黄-红），与原逐点实现结果一致
+
+    Args:
+        t (numpy.ndarray): 归一化后的标量，范围[0,1]
+
+    Returns:
+        numpy.ndarray: (N, 3) 颜色数组
+    """
+    conditions = [t < 0.2, t < 0.4, t < 0.6, t < 0.8]
+    zeros = np.zeros_like(t)
+    ones = np.ones_like(t)
+
+    red = np.select(conditions, [zeros, zeros, zeros, 2 * (t - 0.6)], ones)
+    green = np.select(conditions, [zeros, 2 * (t - 0.2), ones, ones], 1 - 5 * (t - 0.8))
+    blue = np.select(conditions, [0.8 + t, ones, 1 - 2 * (t - 0.4), zeros], zeros)
+
+    return np.stack((red, green, blue), axis=1)
+
+
+def _gray(t):
+    """灰度渐变
+
+    Args:
+        t (numpy.ndarray): 归一化后的标量，范围[0,1]
+
+    Returns:
+        numpy.ndarray: (N, 3) 颜色数组
+    """
+    return np.repeat(t[:, None], 3, axis=1)
+
+
+def lut_from_segments(segments, size=LUT_SIZE):
+    """根据matplotlib风格的分段锚点生成查找表
+
+    Args:
+        segments (dict): 键为'red'/'green'/'blue'，值为[(位置, 值), ...]
+        size (int): 查找表长度
+
+    Returns:
+        numpy.ndarray: (size, 3) 查找表
+    """
+    x = np.linspace(0.0, 1.0, size)
+    channels = []
+    for name in ("red", "green", "blue"):
+        anchors = np.asarray(segments[name], dtype=np.float64)
+        channels.append(np.interp(x, anchors[:, 0], anchors[:, 1]))
+    return np.stack(channels, axis=1)
+
+
+def _lut_colormap(lut):
+    """把查找表包装为颜色映射函数
+
+    Args:
+        lut (numpy.ndarray): (K, 3) 查找表
+
+    Returns:
+        callable: 颜色映射函数
+    """
+    lut = np.ascontiguousarray(lut, dtype=np.float64)
+    last = len(lut) - 1
+
+    def colormap(t):
+        # 与matplotlib一致，按最近的查找表条目取色
+        indices = (t * last + 0.5).astype(np.intp)
+        np.clip(indices, 0, last, out=indices)
+        return lut[indices]
+
+    return colormap
+
+
+# 已注册的颜色映射: 名称 -> 映射函数
+COLORMAPS = {
+    "rainbow": _rainbow,
+    "hot": _lut_colormap(lut_from_segments(_HOT_SEGMENTS)),
+    "gray": _gray,
+}
+
+
+def register_colormap(name, colormap):
+    """注册颜色映射
+
+    Args:
+        name (str): 颜色映射名称
+        colormap: 映射函数，或 (K, 3) 查找表
+    """
+    if not callable(colormap):
+        lut = np.asarray(colormap, dtype=np.float64)
+        if lut.ndim != 2 or lut.shape[1] != 3 or len(lut) < 2:
+            raise ValueError("查找表必须是 (K, 3) 数组，且 K >= 2")
+        colormap = _lut_colormap(lut)
+    COLORMAPS[name] = colormap
+
+
+def get_colormap(name):
+    """获取颜色映射函数
+
+    未注册的名称会尝试从matplotlib中查找（如果已安装）。
+
+    Args:
+        name (str): 颜色映射名称
+
+    Returns:
+        callable: 颜色映射函数
+    """
+    if name in COLORMAPS:
+        return COLORMAPS[name]
+
+    try:
+        import matplotlib
+        lut = matplotlib.colormaps[name](np.linspace(0.0, 1.0, LUT_SIZE))[:, :3]
+    except (ImportError, KeyError):
+        raise ValueError(f"未知的颜色映射: {name}")
+
+    register_colormap(name, lut)
+    return COLORMAPS[name]
+
+
+def normalize(values, vmin=None, vmax=None):
+    """把标量归一化到[0,1]
+
+    当所有值相同（如平面点云）时返回全零，避免除以零。
+
+    Args:
+        values (numpy.ndarray): 标量数组
+        vmin (float, optional): 最小值，默认取数据最小值
+        vmax (float, optional): 最大值，默认取数据最大值
+
+    Returns:
+        numpy.ndarray: 归一化后的float64数组
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values.copy()
+
+    vmin = values.min() if vmin is None else vmin
+    vmax = values.max() if vmax is None else vmax
+    span = vmax - vmin
+    if span <= 0:
+        return np.zeros_like(values)
+
+    t = (values - vmin) / span
+    np.clip(t, 0.0, 1.0, out=t)
+    return t
+
+
+def apply_colormap(values, colormap="rainbow", vmin=None, vmax=None):
+    """把标量数组映射为颜色
+
+    Args:
+        values (numpy.ndarray): 标量数组
+        colormap: 颜色映射名称或映射函数
+        vmin (float, optional): 映射下限
+        vmax (float, optional): 映射上限
+
+    Returns:
+        numpy.ndarray: (N, 3) float64颜色数组，范围[0,1]
+    """
+    if not callable(colormap):
+        colormap = get_colormap(colormap)
+    t = normalize(np.ravel(values), vmin, vmax)
+    return colormap(t)
+
+
+def height_colors(points, axis=2, colormap="rainbow"):
+    """根据点在指定轴上的坐标生成颜色
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        axis (int): 坐标轴，0/1/2分别对应X/Y/Z
+        colormap: 颜色映射名称或映射函数
+
+    Returns:
+        numpy.ndarray: (N, 3) float64颜色数组
+    """
+    points = np.asarray(points)
+    return apply_colormap(points[:, axis], colormap)
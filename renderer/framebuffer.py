@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+帧缓冲转换模块，把渲染器输出的浮点图像转换为可直接显示的uint8图像
+"""
+
+import numpy as np
+
+
+def to_uint8_frame(img):
+    """把float [0,1] 图像转换为连续存储的uint8 [0,255] 图像
+
+    转换规则与原paintEvent中的 (image * 255).astype(np.uint8) 一致。
+    已经是uint8的图像只保证内存连续，不做复制。
+
+    Args:
+        img: 浮点图像（numpy数组或Open3D Image）
+
+    Returns:
+        numpy.ndarray: (H, W, C) 连续存储的uint8数组
+    """
+    img = np.asarray(img)
+    if img.dtype == np.uint8:
+        return np.ascontiguousarray(img)
+
+    return np.ascontiguousarray((img * 255).astype(np.uint8))
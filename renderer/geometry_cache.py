@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何缓存模块，把解析完成、可直接显示的几何数组保存为.npy文件
+
+再次打开同一文件时跳过Open3D解析、着色和法线计算，直接以内存映射方式读取数组。
+构建Open3D几何体时数组仍会被复制一次（Vector3dVector总是复制输入），
+节省的是文件解析和着色计算，而不是这次复制。
+
+缓存目录中每个源文件对应一组文件（<键>为源文件绝对路径和着色参数的哈希）:
+    <键>.json          源文件路径、修改时间、大小、模型类型和数组列表，最后写入，作为完成标记
+    <键>.<数组名>.npy   points/colors/normals/triangles 等数组
+源文件的修改时间或大小变化后旧缓存失效，下次保存时覆盖。
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import open3d as o3d
+
+
+# 缓存格式版本，数组布局变化时递增使旧缓存失效
+FORMAT_VERSION = 1
+
+
+def geometry_to_arrays(geometry, model_type):
+    """把几何体转换为数组字典
+
+    Args:
+        geometry: open3d点云或三角网格
+        model_type (str): 'pcd'或'mesh'
+
+    Returns:
+        dict: 数组名 -> numpy数组
+    """
+    arrays = {}
+    if model_type == 'pcd':
+        arrays['points'] = np.asarray(geometry.points)
+        if geometry.has_colors():
+            arrays['colors'] = np.asarray(geometry.colors)
+        if geometry.has_normals():
+            arrays['normals'] = np.asarray(geometry.normals)
+    else:
+        arrays['points'] = np.asarray(geometry.vertices)
+        arrays['triangles'] = np.asarray(geometry.triangles, dtype=np.int32)
+        if geometry.has_vertex_colors():
+            arrays['colors'] = np.asarray(geometry.vertex_colors)
+        if geometry.has_vertex_normals():
+            arrays['normals'] = np.asarray(geometry.vertex_normals)
+        if geometry.has_triangle_normals():
+            arrays['triangle_normals'] = np.asarray(geometry.triangle_normals)
+    return arrays
+
+
+def arrays_to_geometry(arrays, model_type):
+    """由数组字典构建几何体
+
+    Args:
+        arrays (dict): 数组名 -> numpy数组
+        model_type (str): 'pcd'或'mesh'
+
+    Returns:
+        几何体对象，数据从数组复制，之后与数组无关
+    """
+    if model_type == 'pcd':
+        geometry = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(arrays['points']))
+        if 'colors' in arrays:
+            geometry.colors = o3d.utility.Vector3dVector(arrays['colors'])
+        if 'normals' in arrays:
+            geometry.normals = o3d.utility.Vector3dVector(arrays['normals'])
+        return geometry
+
+    geometry = o3d.geometry.TriangleMesh(
+        o3d.utility.Vector3dVector(arrays['points']),
+        o3d.utility.Vector3iVector(arrays['triangles'])
+    )
+    if 'colors' in arrays:
+        geometry.vertex_colors = o3d.utility.Vector3dVector(arrays['colors'])
+    if 'normals' in arrays:
+        geometry.vertex_normals = o3d.utility.Vector3dVector(arrays['normals'])
+    if 'triangle_normals' in arrays:
+        geometry.triangle_normals = o3d.utility.Vector3dVector(arrays['triangle_normals'])
+    return geometry
+
+
+class GeometryCache:
+    """解析结果的磁盘缓存，按源文件路径、修改时间和大小识别，超出容量时按LRU淘汰"""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024):
+        """初始化几何缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int): 容量上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, file_path, variant):
+        """计算源文件对应的缓存键"""
+        ident = f"{os.path.abspath(file_path)}|{variant}|v{FORMAT_VERSION}"
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _array_path(self, key, name):
+        return os.path.join(self.cache_dir, f"{key}.{name}.npy")
+
+    @staticmethod
+    def _source_stamp(file_path):
+        """源文件的修改时间和大小"""
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, file_path, variant=""):
+        """读取缓存
+
+        Args:
+            file_path (str): 源文件路径
+            variant (str): 影响解析结果的参数（如颜色映射），不同参数分别缓存
+
+        Returns:
+            tuple: (数组字典, 模型类型)，数组以写时复制内存映射方式打开（对数组的修改不会写回缓存文件）；
+                未命中时为None
+        """
+        key = self._key(file_path, variant)
+        meta_path = self._meta_path(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            mtime_ns, size = self._source_stamp(file_path)
+            if meta["mtime_ns"] != mtime_ns or meta["size"] != size:
+                raise ValueError("源文件已变化")
+            # 'c'为写时复制：Open3D只接受可写数组，而修改不能写回缓存
+            arrays = {
+                name: np.load(self._array_path(key, name), mmap_mode='c')
+                for name in meta["arrays"]
+            }
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        # 更新访问时间，用于LRU淘汰
+        os.utime(meta_path)
+        with self._lock:
+            self.stats["hits"] += 1
+        return arrays, meta["model_type"]
+
+    def store(self, file_path, arrays, model_type, variant=""):
+        """保存解析结果
+
+        Args:
+            file_path (str): 源文件路径
+            arrays (dict): 数组名 -> numpy数组
+            model_type (str): 模型类型
+            variant (str): 影响解析结果的参数
+        """
+        key = self._key(file_path, variant)
+        meta_path = self._meta_path(key)
+        mtime_ns, size = self._source_stamp(file_path)
+
+        # 先删除完成标记，写入过程中中断时旧数组不会被误用
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name, array in arrays.items():
+            path = self._array_path(key, name)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(temp_path, path)
+
+        meta = {
+            "source": os.path.abspath(file_path),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "model_type": model_type,
+            "arrays": sorted(arrays)
+        }
+        temp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temp_path, meta_path)
+
+        with self._lock:
+            self.stats["stores"] += 1
+            self._evict(keep=key)
+
+    def discard(self, file_path, variant=""):
+        """删除一个源文件的缓存条目，用于丢弃损坏或不兼容的缓存
+
+        Args:
+            file_path (str): 源文件路径
+            variant (str): 影响解析结果的参数
+        """
+        with self._lock:
+            self._remove(self._key(file_path, variant))
+
+    def _entries(self):
+        """列出缓存条目
+
+        Returns:
+            list: [(最后访问时间, 键, 总字节数)]
+        """
+        groups = {}
+        for name in os.listdir(self.cache_dir):
+            key = name.split('.', 1)[0]
+            path = os.path.join(self.cache_dir, name)
+            try:
+                size = os.path.getsize(path)
+                mtime = os.path.getmtime(path) if name == f"{key}.json" else None
+            except OSError:
+                continue
+            used, total = groups.get(key, (None, 0))
+            groups[key] = (mtime if mtime is not None else used, total + size)
+        # 没有完成标记的残留文件最先淘汰
+        return [(used or 0.0, key, total) for key, (used, total) in groups.items()]
+
+    def _evict(self, keep=None):
+        """按LRU删除条目直到不超过容量上限"""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(key)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def _remove(self, key):
+        """删除一个条目的所有文件"""
+        # 先删除完成标记，再删除数组文件
+        names = [name for name in os.listdir(self.cache_dir) if name.split('.', 1)[0] == key]
+        names.sort(key=lambda name: name != f"{key}.json")
+        for name in names:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for _, key, _ in self._entries():
+                self._remove(key)
+
+    def get_stats(self):
+        """获取缓存统计
+
+        Returns:
+            dict: 命中/未命中/写入/淘汰次数和容量信息
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            entries = self._entries()
+        stats["entries"] = len(entries)
+        stats["total_bytes"] = sum(size for _, _, size in entries)
+        stats["max_bytes"] = self.max_bytes
+        return stats
@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何文件读写模块，负责解析、着色、几何缓存和保存
+
+不依赖Open3D可视化器，既供Open3DRenderer使用，也可在无界面的批处理进程中使用。
+"""
+
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import open3d as o3d
+
+from renderer.colormap import height_colors
+from renderer.geometry_cache import GeometryCache, geometry_to_arrays, arrays_to_geometry
+from renderer.out_of_core import OutOfCoreCloud, convert, is_converted, prune_layouts, read_layout
+from utils import tracing
+
+
+# 支持读取的文件扩展名
+SUPPORTED_EXTENSIONS = ('.pcd', '.obj', '.ply')
+
+
+class GeometryIO:
+    """3D文件读写器"""
+
+    def __init__(self, config=None, use_cache=None):
+        """初始化文件读写器
+
+        Args:
+            config: 配置对象，可选
+            use_cache (bool, optional): 是否使用几何缓存，默认取配置cache.geometry_cache_enabled
+        """
+        self.colormap = "rainbow"  # 无颜色点云使用的颜色映射
+        self.color_axis = 2  # 颜色映射所依据的坐标轴
+        geometry_cache_enabled = True
+        geometry_cache_mb = 2048
+        temp_dir = "temp/"
+        self.out_of_core_enabled = True  # 大文件是否使用超出内存的分块模式
+        self.out_of_core_min_file_mb = 2048  # 文件不小于该大小时使用分块模式
+        self.out_of_core_resident_mb = 1024  # 分块模式下已读入节点数据的内存预算
+        self.out_of_core_tile_points = 262144  # 八叉树叶节点的目标点数
+        self.out_of_core_cache_mb = 20480  # 转换结果的容量上限
+
+        if config:
+            self.colormap = config.get_value("renderer", "colormap", "rainbow")
+            self.color_axis = config.get_value("renderer", "color_axis", 2)
+            geometry_cache_enabled = config.get_value("cache", "geometry_cache_enabled", True)
+            geometry_cache_mb = config.get_value("cache", "geometry_cache_mb", 2048)
+            temp_dir = config.get_value("paths", "temp", "temp/")
+            self.out_of_core_enabled = config.get_value("out_of_core", "enabled", True)
+            self.out_of_core_min_file_mb = config.get_value("out_of_core", "min_file_mb", 2048)
+            self.out_of_core_resident_mb = config.get_value("out_of_core", "resident_budget_mb", 1024)
+            self.out_of_core_tile_points = config.get_value("out_of_core", "tile_points", 262144)
+            self.out_of_core_cache_mb = config.get_value("out_of_core", "cache_mb", 20480)
+
+        if use_cache is not None:
+            geometry_cache_enabled = use_cache
+
+        # 解析结果缓存，位于 paths.temp/geometry_cache
+        self.geometry_cache = None
+        if geometry_cache_enabled:
+            self.geometry_cache = GeometryCache(
+                os.path.join(os.path.dirname(os.path.dirname(__file__)), temp_dir, "geometry_cache"),
+                max_bytes=geometry_cache_mb * 1024 * 1024
+            )
+
+        # 分块模式的转换结果，位于 paths.temp/out_of_core/<源文件路径和状态的哈希>
+        self.out_of_core_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), temp_dir, "out_of_core")
+
+    @tracing.traced("io.load", "load")
+    def load(self, file_path, progress=None):
+        """解析3D文件，可在工作线程中调用
+
+        Args:
+            file_path (str): 3D模型文件路径
+            progress (callable, optional): 进度回调，签名为progress(百分比, 阶段描述)
+
+        Returns:
+            object: 几何体对象，失败时为None
+            str: 模型类型，'pcd'或'mesh'
+            str: 成功或错误信息
+        """
+        if progress is None:
+            progress = lambda percent, message: None
+
+        if file_path.endswith('.pcd'):
+            parse = self._load_point_cloud
+        elif file_path.endswith(('.obj', '.ply')):
+            parse = self._load_mesh
+        else:
+            return None, None, "不支持的文件格式"
+
+        cached = self._load_cached(file_path, progress)
+        if cached is not None:
+            return cached
+
+        geometry, model_type, message = parse(file_path, progress)
+        if geometry is not None and self.geometry_cache is not None:
+            progress(95, "写入几何缓存")
+            try:
+                self.geometry_cache.store(file_path, geometry_to_arrays(geometry, model_type),
+                                          model_type, self._cache_variant())
+            except Exception as e:
+                # 缓存写入失败不影响加载
+                print(f"写入几何缓存失败: {str(e)}")
+        return geometry, model_type, message
+
+    def wants_out_of_core(self, file_path):
+        """文件是否应以超出内存的分块模式打开
+
+        只有足够大的二进制PCD/PLY点云文件使用分块模式，其他文件按原方式完整读取。
+
+        Args:
+            file_path (str): 3D模型文件路径
+
+        Returns:
+            bool: 是否使用分块模式
+        """
+        if not self.out_of_core_enabled or not file_path.lower().endswith(('.pcd', '.ply')):
+            return False
+        try:
+            if os.path.getsize(file_path) < self.out_of_core_min_file_mb * 1024 * 1024:
+                return False
+        except OSError:
+            return False
+        layout = read_layout(file_path)
+        if layout is None:
+            return False
+        if file_path.lower().endswith('.ply'):
+            # 带面的PLY是网格，按原方式读取
+            with open(file_path, 'rb') as f:
+                return b"element face" not in f.read(65536).split(b"end_header")[0]
+        return True
+
+    @tracing.traced("io.open_out_of_core", "load")
+    def open_out_of_core(self, file_path, progress=None, cancel_event=None):
+        """以分块模式打开点云，首次打开时先转换为内存映射布局
+
+        Args:
+            file_path (str): 点云文件路径
+            progress (callable, optional): 进度回调，签名为progress(百分比, 阶段描述)
+            cancel_event (threading.Event, optional): 取消事件
+
+        Returns:
+            OutOfCoreCloud: 分块点云，转换失败或被取消时为None
+        """
+        if progress is None:
+            progress = lambda percent, message: None
+        stat = os.stat(file_path)
+        key = hashlib.sha1(f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+        directory = os.path.join(self.out_of_core_dir, key)
+
+        if not is_converted(directory, file_path):
+            print(f"转换为分块布局: {file_path} -> {directory}")
+            tmp_dir = directory + ".tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            scale = lambda percent, message: progress(percent * 9 // 10, message)
+            try:
+                converted = convert(file_path, tmp_dir, tile_points=self.out_of_core_tile_points,
+                                    progress=scale, cancel_event=cancel_event)
+            except Exception:
+                # 进度回调也可能以异常方式取消加载，不留下不完整的转换结果
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            if not converted:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return None
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_dir, directory)
+            # 删除同一文件的旧转换结果，并把总大小限制在容量上限内
+            removed = prune_layouts(self.out_of_core_dir, self.out_of_core_cache_mb * 1024 * 1024, directory)
+            if removed:
+                print(f"已删除 {removed} 个旧的分块布局")
+        else:
+            # 更新访问时间，用于按最近使用顺序淘汰
+            os.utime(os.path.join(directory, "index.json"))
+
+        progress(90, "打开分块布局")
+        return OutOfCoreCloud(directory, self.out_of_core_resident_mb * 1024 * 1024,
+                              self.colormap, self.color_axis)
+
+    @tracing.traced("io.save", "load")
+    def save(self, geometry, file_path):
+        """保存几何体到文件
+
+        Args:
+            geometry: 点云或网格
+            file_path (str): 保存路径
+
+        Returns:
+            bool: 是否成功保存
+            str: 成功或错误信息
+        """
+        try:
+            # 根据文件类型决定保存方法
+            if file_path.endswith('.pcd'):
+                o3d.io.write_point_cloud(file_path, geometry)
+            elif file_path.endswith('.ply'):
+                o3d.io.write_triangle_mesh(file_path, geometry)
+            elif file_path.endswith('.obj'):
+                o3d.io.write_triangle_mesh(file_path, geometry)
+            else:
+                return False, "不支持的文件格式"
+
+            return True, "模型保存成功"
+        except Exception as e:
+            return False, f"保存模型时出错: {str(e)}"
+
+    def get_cache_stats(self):
+        """获取几何缓存统计
+
+        Returns:
+            dict: 统计信息，缓存未启用时为None
+        """
+        if self.geometry_cache is None:
+            return None
+        return self.geometry_cache.get_stats()
+
+    def _cache_variant(self):
+        """影响解析结果的参数，不同参数的结果分别缓存"""
+        return f"{self.colormap}|{self.color_axis}"
+
+    @tracing.traced("io.load_cached", "load")
+    def _load_cached(self, file_path, progress):
+        """从几何缓存中读取解析结果
+
+        Args:
+            file_path (str): 模型文件路径
+            progress (callable): 进度回调
+
+        Returns:
+            tuple: (几何体, 模型类型, 信息)，未命中或缓存无法读取时为None
+        """
+        if self.geometry_cache is None:
+            return None
+        variant = self._cache_variant()
+        try:
+            cached = self.geometry_cache.load(file_path, variant)
+            if cached is None:
+                return None
+            arrays, model_type = cached
+            progress(50, "读取几何缓存")
+            geometry = arrays_to_geometry(arrays, model_type)
+        except Exception as e:
+            # 缓存损坏或与当前版本不兼容时删除该条目，改为重新解析
+            print(f"读取几何缓存失败，重新解析: {str(e)}")
+            self.geometry_cache.discard(file_path, variant)
+            return None
+        progress(90, "准备显示")
+        if model_type == 'pcd':
+            return geometry, model_type, f"点云加载成功（缓存），点数: {len(geometry.points)}"
+        return geometry, model_type, f"网格加载成功（缓存），顶点数: {len(geometry.vertices)}"
+
+    @tracing.traced("io.load_point_cloud", "load")
+    def _load_point_cloud(self, file_path, progress):
+        """解析点云文件
+
+        Args:
+            file_path (str): 点云文件路径
+            progress (callable): 进度回调
+
+        Returns:
+            tuple: (点云对象或None, 'pcd', 信息)
+        """
+        print(f"尝试加载点云: {file_path}")
+        progress(10, "读取点云文件")
+        pcd = o3d.io.read_point_cloud(file_path)
+        if len(pcd.points) == 0:
+            return None, 'pcd', "加载失败: 点云为空"
+
+        # 为点云添加颜色(如果没有)
+        if not pcd.has_colors():
+            progress(60, "生成高度颜色")
+            # 使用基于高度的渐变色，以便更好地可视化
+            points = np.asarray(pcd.points)
+            colors = height_colors(points, self.color_axis, self.colormap)
+            pcd.colors = o3d.utility.Vector3dVector(colors)
+
+        progress(90, "准备显示")
+        return pcd, 'pcd', f"点云加载成功，点数: {len(pcd.points)}"
+
+    @tracing.traced("io.load_mesh", "load")
+    def _load_mesh(self, file_path, progress):
+        """解析网格文件
+
+        Args:
+            file_path (str): 网格文件路径
+            progress (callable): 进度回调
+
+        Returns:
+            tuple: (网格对象或None, 'mesh', 信息)
+        """
+        print(f"尝试加载网格: {file_path}")
+        progress(10, "读取网格文件")
+        mesh = o3d.io.read_triangle_mesh(file_path)
+        if mesh.is_empty():
+            return None, 'mesh', "加载失败: 网格为空"
+
+        if not mesh.has_vertex_colors():
+            mesh.paint_uniform_color([0.7, 0.7, 0.7])
+
+        # 确保有法线
+        if not mesh.has_triangle_normals():
+            progress(60, "计算法线")
+            mesh.compute_triangle_normals()
+
+        progress(90, "准备显示")
+        return mesh, 'mesh', f"网格加载成功，顶点数: {len(mesh.vertices)}"
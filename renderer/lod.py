@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点云多分辨率（LOD）金字塔模块，用于交互时显示降采样后的点云
+"""
+
+import threading
+
+import numpy as np
+import open3d as o3d
+
+
+class LODPyramid:
+    """体素降采样金字塔
+
+    各层体素大小按2倍递增，由细到粗排列。每一层都是对源点云直接执行
+    voxel_down_sample 的结果，各层的体素大小和点数可供密度调整的体素搜索作为初始区间。
+    源点云在构造时复制一份，构建过程不受模型后续修改的影响。
+    """
+
+    def __init__(self, pcd, min_points=50000, max_levels=6, base_voxel=None):
+        """初始化LOD金字塔
+
+        Args:
+            pcd (open3d.geometry.PointCloud): 源点云
+            min_points (int): 最粗一层的目标点数，达到后停止构建
+            max_levels (int): 最多层数
+            base_voxel (float, optional): 最细一层的体素大小，默认由包围盒对角线推算
+        """
+        self.model = pcd  # 构建所依据的模型对象，用于判断金字塔属于哪个模型
+        self.source = o3d.geometry.PointCloud(pcd)
+        self.source_points = len(self.source.points)
+        self.min_points = min_points
+        self.max_levels = max_levels
+        self.base_voxel = base_voxel or self._default_base_voxel()
+        self.levels = []  # [(体素大小, 点云)]，由细到粗
+        self._cache = {}  # 体素大小 -> 点云
+        self._lock = threading.Lock()
+
+    def _default_base_voxel(self):
+        """根据包围盒对角线估计最细一层的体素大小"""
+        bounds = self.source.get_axis_aligned_bounding_box()
+        diagonal = float(np.linalg.norm(bounds.get_extent()))
+        if diagonal <= 0:
+            return 1.0
+        # 近似使最细一层在对角线方向上有约1024个体素
+        return diagonal / 1024
+
+    def level(self, voxel_size):
+        """获取指定体素大小的降采样点云，结果会被缓存
+
+        Args:
+            voxel_size (float): 体素大小
+
+        Returns:
+            open3d.geometry.PointCloud: 降采样后的点云（调用方不应修改）
+        """
+        key = round(float(voxel_size), 12)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        downsampled = self.source.voxel_down_sample(voxel_size)
+        with self._lock:
+            self._cache.setdefault(key, downsampled)
+            return self._cache[key]
+
+    def build(self, cancel_event=None):
+        """构建金字塔各层
+
+        Args:
+            cancel_event (threading.Event, optional): 置位时提前停止
+
+        Returns:
+            bool: 是否完整构建
+        """
+        levels = []
+        voxel_size = self.base_voxel
+        for _ in range(self.max_levels):
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            pcd = self.level(voxel_size)
+            levels.append((voxel_size, pcd))
+            if len(pcd.points) <= self.min_points:
+                break
+            voxel_size *= 2
+        self.levels = levels
+        return True
+
+    def select(self, max_points):
+        """选择点数不超过max_points的最细一层
+
+        Args:
+            max_points (int): 最大点数
+
+        Returns:
+            open3d.geometry.PointCloud: 选中的层，金字塔为空时为None
+        """
+        if not self.levels:
+            return None
+        for _, pcd in self.levels:
+            if len(pcd.points) <= max_points:
+                return pcd
+        return self.levels[-1][1]
+
+    def memory_usage(self):
+        """计算源点云副本和已缓存各层的内存占用
+
+        Returns:
+            int: 字节数
+        """
+        with self._lock:
+            clouds = [self.source] + list(self._cache.values())
+        return sum(len(pcd.points) * 24 * (1 + pcd.has_colors() + pcd.has_normals()) for pcd in clouds)
+
+    def get_stats(self):
+        """获取各层统计
+
+        Returns:
+            list: [(体素大小, 点数)]
+        """
+        return [(voxel_size, len(pcd.points)) for voxel_size, pcd in self.levels]
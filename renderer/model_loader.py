@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+后台模型加载模块，在工作线程中解析模型文件，避免阻塞GUI线程
+"""
+
+import threading
+from PySide6.QtCore import QObject, Signal
+
+
+class LoadCancelled(Exception):
+    """加载任务被取消时在工作线程中抛出"""
+
+
+class ModelLoader(QObject):
+    """后台模型加载器
+
+    每次调用 load() 都会启动一个新的工作线程，并取消尚未完成的旧任务。
+    解析函数在各阶段之间通过进度回调报告进度，被取消的任务会在下一个
+    阶段边界处停止，耗时的阶段也可以直接检查传入的取消事件；
+    已经完成但过期的结果会被丢弃，并交给release_func释放其占用的资源。
+    信号从工作线程发出，以队列方式投递到GUI线程中的接收者。
+    """
+
+    # 信号定义
+    progress = Signal(int, str)  # 参数: 进度百分比, 阶段描述
+    finished = Signal(str, object, str, str)  # 参数: 文件路径, 几何体, 模型类型, 信息
+    failed = Signal(str, str)  # 参数: 文件路径, 错误信息
+    cancelled = Signal(str)  # 参数: 文件路径
+
+    def __init__(self, parse_func, release_func=None, parent=None):
+        """初始化后台模型加载器
+
+        Args:
+            parse_func (callable): 解析函数，签名为
+                parse_func(file_path, progress, cancel_event) -> (几何体, 模型类型, 信息)，
+                失败时几何体为None；cancel_event为threading.Event，任务被取消或被新任务替代时置位
+            release_func (callable, optional): 丢弃过期结果时在工作线程中调用，签名为release_func(几何体)
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.parse_func = parse_func
+        self.release_func = release_func
+        self._lock = threading.Lock()
+        self._job_id = 0
+        self._cancel_event = None
+        self._thread = None
+
+    def load(self, file_path):
+        """开始后台加载模型文件，正在进行的旧任务会被取消
+
+        Args:
+            file_path (str): 模型文件路径
+
+        Returns:
+            int: 任务ID
+        """
+        with self._lock:
+            if self._cancel_event is not None:
+                self._cancel_event.set()
+            self._job_id += 1
+            job_id = self._job_id
+            cancel_event = threading.Event()
+            self._cancel_event = cancel_event
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(job_id, file_path, cancel_event),
+            name=f"ModelLoader-{job_id}",
+            daemon=True
+        )
+        self._thread.start()
+        return job_id
+
+    def cancel(self):
+        """取消正在进行的加载任务"""
+        with self._lock:
+            if self._cancel_event is not None:
+                self._cancel_event.set()
+                self._cancel_event = None
+
+    def is_loading(self):
+        """检查是否有正在进行的加载任务
+
+        Returns:
+            bool: 是否正在加载
+        """
+        return self._cancel_event is not None
+
+    def _is_current(self, job_id, cancel_event):
+        """检查任务是否仍是最新且未被取消"""
+        with self._lock:
+            return job_id == self._job_id and not cancel_event.is_set()
+
+    def _run(self, job_id, file_path, cancel_event):
+        """工作线程主函数"""
+        def report(percent, message):
+            if not self._is_current(job_id, cancel_event):
+                raise LoadCancelled()
+            self.progress.emit(percent, message)
+
+        try:
+            geometry, model_type, message = self.parse_func(file_path, report, cancel_event)
+        except LoadCancelled:
+            self.cancelled.emit(file_path)
+            return
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            if self._finish(job_id, cancel_event):
+                self.failed.emit(file_path, f"加载文件错误: {str(e)}")
+            return
+
+        if not self._finish(job_id, cancel_event):
+            # 任务在最后阶段被取消或被新任务替代，丢弃结果
+            if geometry is not None and self.release_func is not None:
+                self.release_func(geometry)
+            self.cancelled.emit(file_path)
+        elif geometry is None:
+            self.failed.emit(file_path, message)
+        else:
+            self.finished.emit(file_path, geometry, model_type, message)
+
+    def _finish(self, job_id, cancel_event):
+        """结束任务，返回结果是否仍然有效"""
+        with self._lock:
+            if job_id != self._job_id or cancel_event.is_set():
+                return False
+            self._cancel_event = None
+            return True
@@ -5,18 +5,39 @@
 Open3D渲染器模块，负责3D模型的渲染和视图操作
 """
 
+import threading
+import time
 import open3d as o3d
 import numpy as np
 from PySide6.QtCore import QObject, QTimer, Signal
 
+from renderer.framebuffer import to_uint8_frame
+from renderer.render_scheduler import RenderScheduler
+from renderer.model_loader import ModelLoader
+from renderer.lod import LODPyramid
+from renderer.spatial_index import VoxelHashIndex
+from renderer.view_state import ViewState, ViewAnimator
+from renderer.annotations import AnnotationLayer, MARKER_VERTICES, marker_topology
+from renderer.camera_input import CameraInputAccumulator
+from renderer.geometry_io import GeometryIO
+from utils.geometry_change import GeometryChange
+from utils.model_stats import ModelStats
+from utils import tracing
+
 
 class Open3DRenderer(QObject):
     """Open3D渲染器类，用于渲染3D模型并提供视图交互功能"""
     
     # 信号定义
-    render_ready = Signal(np.ndarray)
+    render_ready = Signal(np.ndarray)  # 参数: (H, W, 3) uint8图像
     model_loaded = Signal(bool, str)  # 参数: 是否成功, 信息
+    load_progress = Signal(int, str)  # 后台加载进度，参数: 百分比, 阶段描述
+    lod_ready = Signal(object)  # LOD金字塔构建完成，参数: LODPyramid
+    _lod_built = Signal(int, object)  # 内部信号，从构建线程投递到GUI线程
+    _pick_index_built = Signal(int, object)  # 内部信号，空间索引构建完成
+    _out_of_core_paged = Signal(int, object)  # 内部信号，分块读入完成，参数: 任务ID, (节点, 坐标, 颜色)或None
     point_added = Signal(np.ndarray)  # 新增：当添加新点时发出信号
+    point_picked = Signal(int, float)  # 拾取到模型点，参数: 点或顶点索引, 到拾取射线的距离
     
     def __init__(self, config=None):
         """初始化Open3D渲染器
@@ -31,8 +52,20 @@ class Open3DRenderer(QObject):
         self.height = 600
         self.background_color = np.array([1, 1, 1])  # 白色背景
         self.point_size = 2.0
-        self.click_points = []  # 存储点击生成的点
-        self.click_point_cloud = None  # 存储点击生成的点云对象
+        self.annotation_color = [1, 0, 0]  # 点击标注的默认颜色
+        self.annotation_size = 0.003  # 点击标注的默认大小（相对模型包围盒对角线）
+        self.max_fps = 30  # 最大帧率
+        self.lod_enabled = True  # 是否为大点云构建LOD金字塔
+        self.lod_min_points = 1000000  # 点数超过该值才构建LOD
+        self.lod_interactive_points = 300000  # 交互时显示的最大点数
+        self.lod_idle_ms = 300  # 交互停止多久后恢复全分辨率
+        self.pick_radius_px = 5  # 点击拾取的命中半径（像素）
+        self.view_transition_ms = 300  # 重置视图/跳转书签的过渡动画时长
+        self.zoom_speed = 1.0  # 每个滚轮刻度的缩放步数
+        self.follow_widget_size = True  # 渲染分辨率是否跟随显示控件的物理像素尺寸
+        self.interactive_scale = 0.5  # 拖动视图时输出帧的分辨率比例
+        self.out_of_core_point_budget = 3000000  # 分块模式下最多显示的点数
+        self.out_of_core_refresh_ms = 200  # 相机停止多久后按新视图重新选择分块
         
         # 如果提供了配置，从配置中加载参数
         if config:
@@ -40,6 +73,20 @@ class Open3DRenderer(QObject):
             self.height = config.get_value("renderer", "height", 600)
             self.background_color = np.array(config.get_value("renderer", "background_color", [1, 1, 1]))
             self.point_size = config.get_value("renderer", "point_size", 2.0)
+            self.max_fps = config.get_value("renderer", "max_fps", 30)
+            self.lod_enabled = config.get_value("renderer", "lod_enabled", True)
+            self.lod_min_points = config.get_value("renderer", "lod_min_points", 1000000)
+            self.lod_interactive_points = config.get_value("renderer", "lod_interactive_points", 300000)
+            self.lod_idle_ms = config.get_value("renderer", "lod_idle_ms", 300)
+            self.pick_radius_px = config.get_value("renderer", "pick_radius_px", 5)
+            self.view_transition_ms = config.get_value("renderer", "view_transition_ms", 300)
+            self.zoom_speed = config.get_value("renderer", "zoom_speed", 1.0)
+            self.follow_widget_size = config.get_value("renderer", "follow_widget_size", True)
+            self.interactive_scale = config.get_value("renderer", "interactive_scale", 0.5)
+            self.annotation_color = config.get_value("renderer", "annotation_color", [1, 0, 0])
+            self.annotation_size = config.get_value("renderer", "annotation_size", 0.003)
+            self.out_of_core_point_budget = config.get_value("out_of_core", "point_budget", 3000000)
+            self.out_of_core_refresh_ms = config.get_value("out_of_core", "refresh_ms", 200)
             
             # 视图设置
             self.zoom = config.get_value("view", "zoom", 0.8)
@@ -50,14 +97,8 @@ class Open3DRenderer(QObject):
             self.front = [0, 0, -1]
             self.up = [0, 1, 0]
         
-        self.vis = o3d.visualization.Visualizer()
-        # 创建一个不可见的窗口用于渲染
-        self.vis.create_window(visible=False, width=self.width, height=self.height)
-        
-        # 设置渲染选项
-        opt = self.vis.get_render_option()
-        opt.background_color = self.background_color
-        opt.point_size = self.point_size
+        self.resize_count = 0  # 渲染窗口按新尺寸重建的次数
+        self._create_window()
         
         # 设置视图控制
         view = self.vis.get_view_control()
@@ -65,29 +106,242 @@ class Open3DRenderer(QObject):
         view.set_front(self.front)
         view.set_up(self.up)
         
-        # 初始化渲染定时器
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_render)
-        self.timer.start(50)  # 20fps
+        # 初始化渲染调度器，仅在场景变化时渲染
+        self.scheduler = RenderScheduler(self.max_fps)
+        self.scheduler.frame_requested.connect(self.update_render)
         
         self.geometry_loaded = False
         self.current_model = None  # 存储当前加载的模型对象引用
         self.current_model_path = None  # 存储当前模型文件路径
+        self.current_model_type = None  # 当前模型类型，'pcd'或'mesh'
+        
+        # 视图状态: 加载模型时的适配视图、命名书签和过渡动画
+        self.home_view = None
+        self.view_bookmarks = {}  # 名称 -> ViewState
+        self.view_animator = ViewAnimator(parent=self)
+        self.view_animator.frame.connect(self._apply_view)
+        
+        # 鼠标输入累加器，两帧之间的旋转/平移/缩放在渲染前合并应用
+        self.camera_input = CameraInputAccumulator()
+        
+        # 文件读写（解析、着色、几何缓存），不依赖可视化器
+        self.io = GeometryIO(config)
+        
+        # 点击标注层，显示为一个八面体标记网格
+        self.annotations = AnnotationLayer()
+        self.annotation_mesh = None
+        self._annotation_capacity = 0  # 标记网格中预分配的标记位置数
+        self._annotation_version = -1  # 已显示的标注层版本
+        
+        # 当前模型的统计缓存（包围盒、质心等），用于标注大小和相机适配，
+        # 与模型管理器共享并由其随编辑更新
+        self.model_stats = ModelStats()
+        
+        # 累积的几何变化，在下一次事件循环中一次性应用
+        self._pending_change = None
+        self._update_scheduled = False
+        self.geometry_update_stats = {"batches": 0, "changes": 0}
+        # 最近一帧各阶段耗时（毫秒），供性能面板显示
+        self.frame_times = {"input": 0.0, "poll": 0.0, "render": 0.0, "capture": 0.0, "convert": 0.0}
+        self._jobs = []  # 后台线程（LOD、空间索引、分块读入）
+        
+        # 后台模型加载器
+        self.loader = ModelLoader(self.load_geometry, self._release_geometry)
+        self.loader.progress.connect(self.load_progress)
+        self.loader.finished.connect(self._on_load_finished)
+        self.loader.failed.connect(self._on_load_failed)
+        
+        # LOD金字塔及交互状态
+        self.lod = None
+        self._lod_build_id = 0
+        self._lod_cancel = None
+        self._lod_built.connect(self._on_lod_built)
+        self.interactive = False  # 是否正在显示粗糙层
+        self.interacting = False  # 是否正在拖动视图（输出帧降低分辨率）
+        self._display_geometry = None  # 交互时显示的粗糙层
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.end_interaction)
+        
+        # 点击拾取用的空间索引，每个模型构建一次
+        self.pick_index = None
+        self._pick_index_build_id = 0
+        self._pick_index_built.connect(self._on_pick_index_built)
+        
+        # 超出内存的分块点云，显示的点云只包含按当前视图选中的节点
+        self.out_of_core = None
+        # 已打开但尚未显示的分块点云，id(几何体) -> (几何体, OutOfCoreCloud)，
+        # 显示时取出，加载结果被丢弃时关闭
+        self._out_of_core_opened = {}
+        self._out_of_core_lock = threading.Lock()
+        self._out_of_core_nodes = None  # 当前显示的节点
+        # 分块在工作线程中读入，同一时间只有一个任务，进行中再次请求时完成后重新选择
+        self._out_of_core_page_id = 0
+        self._out_of_core_paging = False
+        self._out_of_core_refresh_pending = False
+        self._out_of_core_paged.connect(self._on_out_of_core_paged)
+        self.out_of_core_timer = QTimer(self)
+        self.out_of_core_timer.setSingleShot(True)
+        self.out_of_core_timer.timeout.connect(self.refresh_out_of_core)
+    
+    def _create_window(self):
+        """按当前尺寸创建不可见的渲染窗口并设置渲染选项"""
+        self.vis = o3d.visualization.Visualizer()
+        # 创建一个不可见的窗口用于渲染
+        self.vis.create_window(visible=False, width=self.width, height=self.height)
+        
+        # 设置渲染选项
+        opt = self.vis.get_render_option()
+        opt.background_color = self.background_color
+        opt.point_size = self.point_size
     
+    def resize(self, width, height):
+        """把渲染分辨率改为指定的像素尺寸
+        
+        Open3D的Visualizer不能改变已创建窗口的尺寸，因此按新尺寸重建窗口，
+        重新添加当前显示的几何体，并保持相机位置和朝向。应在尺寸稳定后调用。
+        
+        Args:
+            width (int): 宽度（物理像素）
+            height (int): 高度（物理像素）
+            
+        Returns:
+            bool: 尺寸是否发生变化
+        """
+        width = max(int(width), 64)
+        height = max(int(height), 64)
+        if (width, height) == (self.width, self.height):
+            return False
+        
+        view = self.save_view()
+        geometries = [self._display_geometry if self.interactive else self.current_model, self.annotation_mesh]
+        geometries = [g for g in geometries if g is not None and self.geometry_loaded]
+        option = self.vis.get_render_option()
+        self.background_color = np.asarray(option.background_color)
+        self.point_size = option.point_size
+        
+        self.vis.destroy_window()
+        self.width, self.height = width, height
+        self._create_window()
+        for i, geometry in enumerate(geometries):
+            self.vis.add_geometry(geometry, reset_bounding_box=(i == 0))
+        
+        # 保持外参，内参按新尺寸换算（垂直视场不变）
+        self._apply_view(view.resized(width, height))
+        self.resize_count += 1
+        print(f"渲染分辨率: {width} x {height}")
+        return True
+    
+    def mark_dirty(self):
+        """标记场景已变化，请求重新渲染"""
+        self.scheduler.mark_dirty()
+    
+    def update_geometry(self, change=None):
+        """通知渲染器当前模型数据已变化
+        
+        同一事件循环周期内的多次变化会被合并，在下一次事件循环中只调用一次
+        vis.update_geometry，并且只更新受影响的派生数据（法线、空间索引、LOD）。
+        
+        Args:
+            change (GeometryChange, optional): 变化描述，None表示未知变化
+        """
+        if change is None:
+            change = GeometryChange.full()
+        if change.attributes & {"points", "colors", "normals"}:
+            # 立即作废进行中的LOD构建，已排队但尚未处理的旧构建结果不会再被安装
+            self._cancel_lod_build()
+        if self._pending_change is None:
+            self._pending_change = change
+        else:
+            self._pending_change = self._pending_change.merge(change)
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            QTimer.singleShot(0, self.flush_geometry_update)
+    
+    @tracing.traced("renderer.flush_geometry_update", "edit")
+    def flush_geometry_update(self):
+        """立即应用累积的几何变化"""
+        change = self._pending_change
+        self._pending_change = None
+        self._update_scheduled = False
+        if change is None or change.is_empty():
+            return
+        if not self.geometry_loaded or self.current_model is None:
+            return
+        
+        self.end_interaction()
+        if (self.current_model_type == 'mesh' and change.points_changed
+                and self.current_model.has_triangle_normals()):
+            # 顶点移动后面法线失效
+            self.current_model.compute_triangle_normals()
+        
+        self.vis.update_geometry(self.current_model)
+        self.geometry_update_stats["batches"] += 1
+        self.geometry_update_stats["changes"] += change.merged
+        self.mark_dirty()
+        
+        # 只有坐标变化时才需要更新空间索引，点数变化时重建
+        if change.points_changed:
+            self._update_pick_index(None if change.resized else change.rows)
+        # LOD层包含坐标、颜色和法线，任一变化都需要重建
+        if change.attributes & {"points", "colors", "normals"}:
+            self._start_lod_build()
+    
+    def get_render_stats(self):
+        """获取渲染统计
+        
+        Returns:
+            dict: 已渲染帧数、跳过帧数、最大帧率和几何更新批次数
+        """
+        stats = self.scheduler.get_stats()
+        stats["geometry_update_batches"] = self.geometry_update_stats["batches"]
+        stats["geometry_update_changes"] = self.geometry_update_stats["changes"]
+        stats.update(self.camera_input.get_stats())
+        return stats
+    
+    @tracing.traced("renderer.update_render", "render")
     def update_render(self):
-        """更新渲染"""
+        """更新渲染，并记录各阶段耗时"""
+        start = time.perf_counter()
+        # 先应用自上一帧以来累加的鼠标输入，每帧最多一次旋转/平移/缩放
+        with tracing.span("renderer.input", "render"):
+            self.flush_camera_input()
         if self.geometry_loaded:
-            self.vis.poll_events()
-            self.vis.update_renderer()
+            polled = time.perf_counter()
+            with tracing.span("renderer.poll", "render"):
+                self.vis.poll_events()
+            rendered = time.perf_counter()
+            with tracing.span("renderer.render", "render"):
+                self.vis.update_renderer()
             # 捕获渲染的图像
-            img = self.vis.capture_screen_float_buffer(do_render=True)
+            captured = time.perf_counter()
+            with tracing.span("renderer.capture", "render"):
+                img = self.vis.capture_screen_float_buffer(do_render=True)
+            converted = time.perf_counter()
+            frame = None
             if img is not None:
-                # 转换为numpy数组并发送信号
-                img_np = np.asarray(img)
-                self.render_ready.emit(img_np)
+                with tracing.span("renderer.convert", "render"):
+                    img = np.asarray(img)
+                    step = self._interactive_step()
+                    if step > 1:
+                        # 拖动视图时按步长抽取像素，减少转换和显示的开销
+                        img = img[::step, ::step]
+                    # 每帧只转换一次为连续的uint8数组，显示时无需再转换
+                    frame = to_uint8_frame(img)
+            end = time.perf_counter()
+            self.frame_times = {
+                "input": (polled - start) * 1000,
+                "poll": (rendered - polled) * 1000,
+                "render": (captured - rendered) * 1000,
+                "capture": (converted - captured) * 1000,
+                "convert": (end - converted) * 1000
+            }
+            if frame is not None:
+                self.render_ready.emit(frame)
     
+    @tracing.traced("renderer.set_geometry", "load")
     def set_geometry(self, file_path):
-        """加载3D文件并设置到可视化器中
+        """加载3D文件并设置到可视化器中（同步）
         
         Args:
             file_path (str): 3D模型文件路径
@@ -96,143 +350,497 @@ class Open3DRenderer(QObject):
             bool: 是否成功加载
         """
         try:
-            self.geometry_loaded = False
-            self.vis.clear_geometries()
-            self.current_model_path = file_path
-            
-            if file_path.endswith('.pcd'):
-                return self._load_point_cloud(file_path)
-            elif file_path.endswith(('.obj', '.ply')):
-                return self._load_mesh(file_path)
-            else:
-                self.model_loaded.emit(False, "不支持的文件格式")
-                return False
+            geometry, model_type, message = self.load_geometry(file_path)
         except Exception as e:
             import traceback
             traceback.print_exc()
             self.model_loaded.emit(False, f"加载文件错误: {str(e)}")
             return False
+        
+        if geometry is None:
+            self.model_loaded.emit(False, message)
+            return False
+        return self.show_geometry(file_path, geometry, model_type, message)
     
-    def _load_point_cloud(self, file_path):
-        """加载点云文件
+    def load_async(self, file_path):
+        """在后台线程中加载3D文件，完成后在GUI线程中设置到可视化器
+        
+        正在进行的旧加载任务会被取消。进度通过load_progress信号报告，
+        结果通过model_loaded信号报告。
         
         Args:
-            file_path (str): 点云文件路径
+            file_path (str): 3D模型文件路径
+        """
+        self.load_progress.emit(0, "开始加载")
+        self.loader.load(file_path)
+    
+    def cancel_load(self):
+        """取消正在进行的后台加载"""
+        self.loader.cancel()
+    
+    @tracing.traced("renderer.load_geometry", "load")
+    def load_geometry(self, file_path, progress=None, cancel_event=None):
+        """解析3D文件，不访问可视化器，可在工作线程中调用
+        
+        Args:
+            file_path (str): 3D模型文件路径
+            progress (callable, optional): 进度回调，签名为progress(百分比, 阶段描述)
+            cancel_event (threading.Event, optional): 取消事件，分块模式的转换会及时响应
+            
+        Returns:
+            object: 几何体对象，失败时为None
+            str: 模型类型，'pcd'或'mesh'
+            str: 成功或错误信息
+        """
+        if self.io.wants_out_of_core(file_path):
+            # 超出内存的点云只读入根节点的抽样点，显示后再按视图选择分块
+            cloud = self.io.open_out_of_core(file_path, progress, cancel_event)
+            if cloud is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None, 'pcd', "加载已取消"
+                return None, 'pcd', "转换分块布局失败"
+            try:
+                points, colors = cloud.assemble([0])
+                pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(points))
+                pcd.colors = o3d.utility.Vector3dVector(colors)
+            except Exception:
+                cloud.close()
+                raise
+            with self._out_of_core_lock:
+                self._out_of_core_opened[id(pcd)] = (pcd, cloud)
+            return pcd, 'pcd', f"点云以分块模式打开，总点数: {cloud.count}"
+        return self.io.load(file_path, progress)
+    
+    def _take_out_of_core(self, geometry):
+        """取出为该几何体打开的分块点云"""
+        with self._out_of_core_lock:
+            _, cloud = self._out_of_core_opened.pop(id(geometry), (None, None))
+        return cloud
+    
+    def _release_geometry(self, geometry):
+        """后台加载结果被丢弃时关闭为它打开的分块点云（工作线程）"""
+        cloud = self._take_out_of_core(geometry)
+        if cloud is not None:
+            cloud.close()
+    
+    def get_geometry_cache_stats(self):
+        """获取几何缓存统计
+        
+        Returns:
+            dict: 统计信息，缓存未启用时为None
+        """
+        return self.io.get_cache_stats()
+    
+    @tracing.traced("renderer.show_geometry", "load")
+    def show_geometry(self, file_path, geometry, model_type, message=""):
+        """把已解析的几何体设置到可视化器中，必须在GUI线程中调用
+        
+        Args:
+            file_path (str): 模型文件路径
+            geometry: 几何体对象
+            model_type (str): 模型类型，'pcd'或'mesh'
+            message (str): 加载成功信息
             
         Returns:
             bool: 是否成功加载
         """
-        print(f"尝试加载点云: {file_path}")
-        pcd = o3d.io.read_point_cloud(file_path)
-        if len(pcd.points) == 0:
-            self.model_loaded.emit(False, "加载失败: 点云为空")
-            return False
+        self.geometry_loaded = False
+        self._cancel_lod_build()
+        self._pick_index_build_id += 1
+        self.pick_index = None
+        self.idle_timer.stop()
+        self.view_animator.stop()
+        self._pending_change = None  # 旧模型的未应用变化
+        self.interactive = False
+        self._display_geometry = None
+        self.vis.clear_geometries()
+        # 标注网格已随clear_geometries一起移除
+        self.annotations.clear()
+        self.annotation_mesh = None
+        self._annotation_version = self.annotations.version
+        self.current_model_path = file_path
+        self.out_of_core_timer.stop()
+        if self.out_of_core is not None:
+            self.out_of_core.close()
+        self.out_of_core = self._take_out_of_core(geometry)
+        self._out_of_core_nodes = None
+        # 旧模型的分块读入结果不再安装
+        self._out_of_core_page_id += 1
+        self._out_of_core_paging = False
+        self._out_of_core_refresh_pending = False
         
-        # 为点云添加颜色(如果没有)
-        if not pcd.has_colors():
-            # 使用基于高度的彩虹渐变色，以便更好地可视化
-            points = np.asarray(pcd.points)
-            min_z = np.min(points[:, 2])
-            max_z = np.max(points[:, 2])
-            colors = np.zeros((len(points), 3))
-            for i in range(len(points)):
-                normalized = (points[i, 2] - min_z) / (max_z - min_z)
-                # 使用更明亮的渐变色
-                if normalized < 0.2:
-                    colors[i] = [0, 0, 0.8 + normalized]  # 深蓝到蓝
-                elif normalized < 0.4:
-                    colors[i] = [0, 2 * (normalized - 0.2), 1]  # 蓝到青
-                elif normalized < 0.6:
-                    colors[i] = [0, 1, 1 - 2 * (normalized - 0.4)]  # 青到绿
-                elif normalized < 0.8:
-                    colors[i] = [2 * (normalized - 0.6), 1, 0]  # 绿到黄
-                else:
-                    colors[i] = [1, 1 - 5 * (normalized - 0.8), 0]  # 黄到红
-            pcd.colors = o3d.utility.Vector3dVector(colors)
-        
-        added = self.vis.add_geometry(pcd)
+        added = self.vis.add_geometry(geometry)
         if not added:
             self.model_loaded.emit(False, "添加几何体到可视化器失败")
             return False
         
-        self.current_model = pcd
+        self.current_model = geometry
+        self.current_model_type = model_type
         self.geometry_loaded = True
-        self.model_loaded.emit(True, f"点云加载成功，点数: {len(pcd.points)}")
+        self.model_stats = ModelStats(geometry, model_type)
+        self.model_loaded.emit(True, message)
         
-        # 重置视图
+        # 重置视图，并记录适配后的视图供重置使用
         self.vis.reset_view_point(True)
+        self.home_view = self.save_view()
+        self.view_bookmarks = {}
+        self.mark_dirty()
+        
+        if self.out_of_core is not None:
+            # 按适配后的视图在后台读入分块，完成前显示根节点的抽样点
+            self.refresh_out_of_core()
+        
+        # 在后台构建拾取索引和LOD金字塔
+        self._start_pick_index_build()
+        self._start_lod_build()
         return True
     
-    def _load_mesh(self, file_path):
-        """加载网格文件
+    def _start_lod_build(self):
+        """为当前点云在后台线程中构建LOD金字塔，旧的构建任务会被取消"""
+        self._cancel_lod_build()
+        # 分块模式自带八叉树LOD，不再构建内存中的金字塔
+        if (not self.lod_enabled or self.current_model_type != 'pcd' or self.out_of_core is not None
+                or len(self.current_model.points) <= self.lod_min_points):
+            return
+        
+        self._lod_build_id += 1
+        build_id = self._lod_build_id
+        cancel_event = threading.Event()
+        self._lod_cancel = cancel_event
+        # 在GUI线程中复制源点云，构建过程不受后续编辑影响
+        pyramid = LODPyramid(self.current_model, min_points=self.lod_interactive_points // 4)
+        
+        def build():
+            if pyramid.build(cancel_event):
+                self._lod_built.emit(build_id, pyramid)
+        
+        self._start_job(build, f"LODBuilder-{build_id}")
+    
+    def _start_job(self, target, name):
+        """在后台线程中执行构建任务，并记录以便统计进行中的任务数"""
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        self._jobs = [job for job in self._jobs if job.is_alive()]
+        self._jobs.append(thread)
+        thread.start()
+    
+    def background_jobs(self):
+        """获取进行中的后台任务数
         
-        Args:
-            file_path (str): 网格文件路径
-            
         Returns:
-            bool: 是否成功加载
+            int: 模型加载、LOD/空间索引构建和分块读入线程数
         """
-        print(f"尝试加载网格: {file_path}")
-        mesh = o3d.io.read_triangle_mesh(file_path)
-        if mesh.is_empty():
-            self.model_loaded.emit(False, "加载失败: 网格为空")
-            return False
+        self._jobs = [job for job in self._jobs if job.is_alive()]
+        return len(self._jobs) + (1 if self.loader.is_loading() else 0)
+    
+    def get_memory_usage(self):
+        """获取渲染器缓存的内存占用
         
-        if not mesh.has_vertex_colors():
-            mesh.paint_uniform_color([0.7, 0.7, 0.7])
-            
-        # 确保有法线
-        if not mesh.has_triangle_normals():
-            mesh.compute_triangle_normals()
+        Returns:
+            dict: LOD金字塔、空间索引和分块点云常驻数据的字节数
+        """
+        return {
+            "lod": self.lod.memory_usage() if self.lod is not None else 0,
+            "pick_index": self.pick_index.memory_usage() if self.pick_index is not None else 0,
+            "out_of_core": self.out_of_core.resident_bytes if self.out_of_core is not None else 0
+        }
+    
+    def _cancel_lod_build(self):
+        """取消正在进行的LOD构建，并丢弃已有的金字塔"""
+        if self._lod_cancel is not None:
+            self._lod_cancel.set()
+            self._lod_cancel = None
+        self._lod_build_id += 1
+        self.lod = None
+    
+    def _on_lod_built(self, build_id, pyramid):
+        """LOD构建完成回调（GUI线程）"""
+        if build_id != self._lod_build_id:
+            # 构建期间模型已变化，丢弃过期结果
+            return
+        self._lod_cancel = None
+        self.lod = pyramid
+        print(f"LOD构建完成: {pyramid.get_stats()}")
+        self.lod_ready.emit(pyramid)
+    
+    def _interactive_step(self):
+        """拖动视图时输出帧的像素抽取步长，取与interactive_scale最接近的整数"""
+        if not self.interacting or not 0 < self.interactive_scale < 1:
+            return 1
+        return max(1, int(round(1.0 / self.interactive_scale)))
+    
+    def begin_interaction(self):
+        """开始或继续交互，显示粗糙的LOD层并降低输出帧的分辨率
         
-        added = self.vis.add_geometry(mesh)
-        if not added:
-            self.model_loaded.emit(False, "添加几何体到可视化器失败")
-            return False
+        交互停止lod_idle_ms毫秒后（或调用end_interaction时）自动恢复全分辨率。
+        """
+        self.idle_timer.start(self.lod_idle_ms)
+        self.interacting = True
+        if self.interactive or self.lod is None or not self.geometry_loaded:
+            return
         
-        self.current_model = mesh
-        self.geometry_loaded = True
-        self.model_loaded.emit(True, f"网格加载成功，顶点数: {len(mesh.vertices)}")
+        coarse = self.lod.select(self.lod_interactive_points)
+        if coarse is None or len(coarse.points) >= len(self.current_model.points):
+            return
         
-        # 重置视图
-        self.vis.reset_view_point(True)
-        return True
+        self.vis.remove_geometry(self.current_model, reset_bounding_box=False)
+        self.vis.add_geometry(coarse, reset_bounding_box=False)
+        self._display_geometry = coarse
+        self.interactive = True
+        self.mark_dirty()
+    
+    def end_interaction(self):
+        """结束交互，恢复显示全分辨率模型和全分辨率输出帧"""
+        self.idle_timer.stop()
+        if self._interactive_step() > 1:
+            # 最后一帧是降低分辨率的，重新渲染一帧全分辨率图像
+            self.mark_dirty()
+        self.interacting = False
+        if not self.interactive:
+            return
+        
+        self.vis.remove_geometry(self._display_geometry, reset_bounding_box=False)
+        self.vis.add_geometry(self.current_model, reset_bounding_box=False)
+        self._display_geometry = None
+        self.interactive = False
+        self.mark_dirty()
+    
+    def _on_load_finished(self, file_path, geometry, model_type, message):
+        """后台加载完成回调"""
+        self.load_progress.emit(95, "添加到场景")
+        if self.show_geometry(file_path, geometry, model_type, message):
+            self.load_progress.emit(100, "加载完成")
+    
+    def _on_load_failed(self, file_path, message):
+        """后台加载失败回调"""
+        self.model_loaded.emit(False, message)
     
     def rotate_view(self, dx, dy):
-        """旋转视图
+        """旋转视图，增量累加到下一帧渲染前一次应用
         
         Args:
             dx (float): X方向旋转量
             dy (float): Y方向旋转量
         """
-        ctr = self.vis.get_view_control()
-        ctr.rotate(dx, dy)
+        self.view_animator.stop()
+        self.camera_input.add_rotate(dx, dy)
+        self._view_changed()
     
     def pan_view(self, dx, dy):
-        """平移视图
+        """平移视图，增量累加到下一帧渲染前一次应用
         
         Args:
             dx (float): X方向平移量
             dy (float): Y方向平移量
         """
+        self.view_animator.stop()
+        self.camera_input.add_pan(dx, dy)
+        self._view_changed()
+    
+    def zoom_view(self, angle_delta):
+        """缩放视图，增量累加到下一帧渲染前一次应用
+        
+        Args:
+            angle_delta (float): 滚轮的angleDelta，正值（向前滚动）表示放大，
+                缩放量与其成正比，高精度滚轮和触控板的小增量也能平滑缩放
+        """
+        self.view_animator.stop()
+        self.camera_input.add_wheel(angle_delta)
+        self._view_changed()
+    
+    def flush_camera_input(self):
+        """把累加的鼠标输入一次性应用到相机
+        
+        Returns:
+            bool: 是否有输入被应用
+        """
+        rotate, pan, zoom = self.camera_input.take()
+        if rotate is None and pan is None and zoom is None:
+            return False
         ctr = self.vis.get_view_control()
-        ctr.translate(dx, dy)
+        if rotate is not None:
+            ctr.rotate(*rotate)
+        if pan is not None:
+            ctr.translate(*pan)
+        if zoom is not None:
+            # ViewControl.scale按固定步长累加缩放系数，正值拉远，因此向前滚动取负值
+            ctr.scale(-zoom * self.zoom_speed)
+        return True
     
-    def zoom_view(self, dy):
-        """缩放视图
+    def save_view(self):
+        """保存当前相机参数
+        
+        Returns:
+            ViewState: 当前视图状态
+        """
+        self.flush_camera_input()
+        params = self.vis.get_view_control().convert_to_pinhole_camera_parameters()
+        return ViewState.from_camera_parameters(params)
+    
+    def restore_view(self, state, duration_ms=None):
+        """恢复相机参数，不修改几何体
         
         Args:
-            dy (float): 缩放量
+            state (ViewState): 目标视图状态
+            duration_ms (int, optional): 过渡动画时长，默认使用view_transition_ms，0表示立即跳转
         """
+        if duration_ms is None:
+            duration_ms = self.view_transition_ms
+        if (state.width, state.height) != (self.width, self.height):
+            state = state.resized(self.width, self.height)
+        self.view_animator.start(self.save_view(), state, duration_ms)
+    
+    def _apply_view(self, state):
+        """把视图状态写入可视化器"""
+        if (state.width, state.height) != (self.width, self.height):
+            # 书签等在其他渲染分辨率下保存的视图，按当前尺寸换算内参
+            state = state.resized(self.width, self.height)
         ctr = self.vis.get_view_control()
-        # Open3D中，scale值小于1表示放大，大于1表示缩小
-        # 这与直觉相反，所以我们需要反转逻辑
-        if dy > 0:
-            # 向前滚动 - 放大（在Open3D中使用小于1的值）
-            ctr.scale(0.9)
-        else:
-            # 向后滚动 - 缩小（在Open3D中使用大于1的值）
-            ctr.scale(1.1)
+        params = state.apply_to(ctr.convert_to_pinhole_camera_parameters())
+        ctr.convert_from_pinhole_camera_parameters(params, allow_arbitrary=True)
+        if self.view_animator.is_running():
+            # 动画过程中按交互处理，大点云显示粗糙层
+            self.begin_interaction()
+        self._view_changed()
+    
+    def _view_changed(self):
+        """相机已变化: 请求重新渲染，分块模式下在相机停止后重新选择分块"""
+        self.mark_dirty()
+        if self.out_of_core is not None:
+            self.out_of_core_timer.start(self.out_of_core_refresh_ms)
+    
+    @tracing.traced("renderer.refresh_out_of_core", "render")
+    def refresh_out_of_core(self):
+        """按当前视图在工作线程中重新选择并读入分块点云的节点，选择变化时在GUI线程中替换显示的点"""
+        if self.out_of_core is None or not self.geometry_loaded:
+            return
+        if self._out_of_core_paging:
+            self._out_of_core_refresh_pending = True
+            return
+        self._out_of_core_paging = True
+        self._out_of_core_page_id += 1
+        page_id = self._out_of_core_page_id
+        cloud = self.out_of_core
+        view = self.save_view()
+        displayed = self._out_of_core_nodes
+        budget = self.out_of_core_point_budget
+        
+        def page():
+            result = None
+            try:
+                with tracing.span("renderer.page_out_of_core", "load"):
+                    nodes = cloud.select(view, budget)
+                    if nodes != displayed:
+                        points, colors = cloud.assemble(nodes)
+                        result = (nodes, o3d.utility.Vector3dVector(points), o3d.utility.Vector3dVector(colors))
+            except Exception as e:
+                # 模型已切换、点云已关闭时读入失败，结果本来也会被丢弃
+                print(f"读入分块失败: {str(e)}")
+            self._out_of_core_paged.emit(page_id, result)
+        
+        self._start_job(page, f"OutOfCorePager-{page_id}")
+    
+    def _on_out_of_core_paged(self, page_id, result):
+        """分块读入完成回调（GUI线程）"""
+        if page_id != self._out_of_core_page_id:
+            return
+        self._out_of_core_paging = False
+        if result is not None and self.out_of_core is not None and self.geometry_loaded:
+            nodes, points, colors = result
+            self._out_of_core_nodes = nodes
+            self.current_model.points = points
+            self.current_model.colors = colors
+            # 分块模式下模型为只读，显示的点由渲染器替换，统计也由渲染器更新
+            change = GeometryChange(("points", "colors"), resized=True)
+            self.model_stats.apply_change(change)
+            self.update_geometry(change)
+        if self._out_of_core_refresh_pending:
+            # 读入期间视图又变化了，按最新视图重新选择
+            self._out_of_core_refresh_pending = False
+            self.refresh_out_of_core()
+    
+    def get_out_of_core_stats(self):
+        """获取分块模式统计
+        
+        Returns:
+            dict: 节点读入/命中/释放次数、常驻字节数和显示的节点数，未使用分块模式时为None
+        """
+        if self.out_of_core is None:
+            return None
+        stats = self.out_of_core.get_stats()
+        stats["displayed_nodes"] = len(self._out_of_core_nodes or [])
+        stats["displayed_points"] = len(self.current_model.points) if self.current_model is not None else 0
+        return stats
+    
+    def reset_camera(self, duration_ms=None):
+        """把相机恢复到加载模型时的适配视图，开销与模型大小无关
+        
+        Args:
+            duration_ms (int, optional): 过渡动画时长
+            
+        Returns:
+            bool: 是否已重置（未加载模型时为False）
+        """
+        if self.home_view is None or not self.geometry_loaded:
+            return False
+        self.restore_view(self.home_view, duration_ms)
+        return True
+    
+    def fit_camera(self, duration_ms=None):
+        """保持当前朝向，移动相机使模型的包围球恰好位于视野内
+        
+        包围盒取自统计缓存，模型编辑后（如变换、降采样）无需遍历数据。
+        
+        Args:
+            duration_ms (int, optional): 过渡动画时长
+            
+        Returns:
+            bool: 是否已适配（未加载模型时为False）
+        """
+        if not self.geometry_loaded or self.model_stats.point_count == 0:
+            return False
+        target = self.save_view().fitted(self.model_stats.center, self.model_stats.radius)
+        self.restore_view(target, duration_ms)
+        return True
+    
+    def add_view_bookmark(self, name):
+        """把当前视图保存为命名书签，同名书签会被覆盖
+        
+        Args:
+            name (str): 书签名称
+        """
+        self.view_bookmarks[name] = self.save_view()
+    
+    def goto_view_bookmark(self, name, duration_ms=None):
+        """跳转到命名书签
+        
+        Args:
+            name (str): 书签名称
+            duration_ms (int, optional): 过渡动画时长
+            
+        Returns:
+            bool: 书签是否存在
+        """
+        state = self.view_bookmarks.get(name)
+        if state is None:
+            return False
+        self.restore_view(state, duration_ms)
+        return True
+    
+    def remove_view_bookmark(self, name):
+        """删除命名书签
+        
+        Args:
+            name (str): 书签名称
+        """
+        self.view_bookmarks.pop(name, None)
+    
+    def get_view_bookmarks(self):
+        """获取所有书签名称
+        
+        Returns:
+            list: 书签名称列表，按添加顺序
+        """
+        return list(self.view_bookmarks)
     
     def save_model(self, file_path):
         """保存当前模型到文件
@@ -247,20 +855,7 @@ class Open3DRenderer(QObject):
         if not self.current_model:
             return False, "没有模型可保存"
         
-        try:
-            # 根据文件类型决定保存方法
-            if file_path.endswith('.pcd'):
-                o3d.io.write_point_cloud(file_path, self.current_model)
-            elif file_path.endswith('.ply'):
-                o3d.io.write_triangle_mesh(file_path, self.current_model)
-            elif file_path.endswith('.obj'):
-                o3d.io.write_triangle_mesh(file_path, self.current_model)
-            else:
-                return False, "不支持的文件格式"
-            
-            return True, "模型保存成功"
-        except Exception as e:
-            return False, f"保存模型时出错: {str(e)}"
+        return self.io.save(self.current_model, file_path)
     
     def set_background_color(self, color):
         """设置背景颜色
@@ -270,6 +865,7 @@ class Open3DRenderer(QObject):
         """
         opt = self.vis.get_render_option()
         opt.background_color = np.array(color)
+        self.mark_dirty()
     
     def set_point_size(self, size):
         """设置点大小
@@ -279,6 +875,7 @@ class Open3DRenderer(QObject):
         """
         opt = self.vis.get_render_option()
         opt.point_size = size
+        self.mark_dirty()
     
     def get_current_model(self):
         """获取当前模型对象
@@ -288,11 +885,260 @@ class Open3DRenderer(QObject):
         """
         return self.current_model
     
+    def add_annotations(self, positions, colors=None, sizes=None):
+        """批量添加标注
+        
+        Args:
+            positions (numpy.ndarray): (K, 3) 或 (3,) 坐标
+            colors (numpy.ndarray, optional): (K, 3) 或 (3,) 颜色，默认annotation_color
+            sizes (numpy.ndarray or float, optional): 世界坐标下的标注半径，
+                默认为annotation_size乘以模型包围盒对角线
+            
+        Returns:
+            numpy.ndarray: 新标注的ID
+        """
+        if colors is None:
+            colors = self.annotation_color
+        if sizes is None:
+            sizes = self.annotation_size * (self.model_stats.diagonal or 1.0)
+        ids = self.annotations.add(positions, colors, sizes)
+        self._schedule_annotation_update()
+        return ids
+    
+    def remove_annotations(self, ids):
+        """批量删除标注
+        
+        Args:
+            ids (array-like): 标注ID
+            
+        Returns:
+            int: 删除的数量
+        """
+        removed = self.annotations.remove(ids)
+        self._schedule_annotation_update()
+        return removed
+    
+    def set_annotation_style(self, ids, colors=None, sizes=None):
+        """修改标注的颜色或大小
+        
+        Args:
+            ids (array-like): 标注ID
+            colors (numpy.ndarray, optional): 颜色
+            sizes (numpy.ndarray or float, optional): 世界坐标下的标注半径
+        """
+        self.annotations.set_style(ids, colors, sizes)
+        self._schedule_annotation_update()
+    
+    def clear_annotations(self):
+        """删除所有标注"""
+        self.annotations.clear()
+        self._schedule_annotation_update()
+    
+    def save_annotations(self, file_path):
+        """保存标注到文件
+        
+        Args:
+            file_path (str): .npz文件路径
+            
+        Returns:
+            bool: 是否成功保存
+            str: 成功或错误信息
+        """
+        try:
+            self.annotations.save(file_path)
+            return True, f"已保存 {len(self.annotations)} 个标注"
+        except Exception as e:
+            return False, f"保存标注错误: {str(e)}"
+    
+    def load_annotations(self, file_path):
+        """从文件加载标注，替换当前所有标注
+        
+        Args:
+            file_path (str): .npz文件路径
+            
+        Returns:
+            bool: 是否成功加载
+            str: 成功或错误信息
+        """
+        try:
+            self.annotations.load(file_path)
+        except Exception as e:
+            return False, f"加载标注错误: {str(e)}"
+        self._schedule_annotation_update()
+        return True, f"已加载 {len(self.annotations)} 个标注"
+    
+    def _schedule_annotation_update(self):
+        """在下一次事件循环中更新标注显示，同一周期内的多次修改只更新一次"""
+        if self.annotations.version != self._annotation_version:
+            QTimer.singleShot(0, self.flush_annotations)
+    
+    def flush_annotations(self):
+        """把标注层的当前内容同步到可视化器
+        
+        标记网格按标注层的容量预分配，平时只改写变化区间内的顶点和颜色，
+        容量翻倍时才重建网格，同一周期内的批量修改只更新一次。
+        """
+        if self.annotations.version == self._annotation_version or not self.geometry_loaded:
+            return
+        self._annotation_version = self.annotations.version
+        
+        if len(self.annotations) == 0:
+            self.annotations.take_dirty()
+            if self.annotation_mesh is not None:
+                self.vis.remove_geometry(self.annotation_mesh, reset_bounding_box=False)
+                self.annotation_mesh = None
+                self._annotation_capacity = 0
+                self.mark_dirty()
+            return
+        
+        if self.annotation_mesh is None or len(self.annotations) > self._annotation_capacity:
+            # 首次显示或容量不足，按标注层的容量重建整个网格
+            if self.annotation_mesh is not None:
+                self.vis.remove_geometry(self.annotation_mesh, reset_bounding_box=False)
+            capacity = self.annotations.capacity
+            self.annotations.take_dirty()
+            vertices, colors = self.annotations.marker_rows(0, capacity)
+            triangles, normals = marker_topology(capacity)
+            self.annotation_mesh = o3d.geometry.TriangleMesh(
+                o3d.utility.Vector3dVector(vertices), o3d.utility.Vector3iVector(triangles))
+            self.annotation_mesh.vertex_colors = o3d.utility.Vector3dVector(colors)
+            self.annotation_mesh.vertex_normals = o3d.utility.Vector3dVector(normals)
+            self._annotation_capacity = capacity
+            self.vis.add_geometry(self.annotation_mesh, reset_bounding_box=False)
+        else:
+            # 只改写变化区间，直接写入网格的顶点缓冲区
+            start, end = self.annotations.take_dirty()
+            end = min(end, self._annotation_capacity)
+            if end > start:
+                vertices, colors = self.annotations.marker_rows(start, end)
+                rows = slice(start * MARKER_VERTICES, end * MARKER_VERTICES)
+                np.asarray(self.annotation_mesh.vertices)[rows] = vertices
+                np.asarray(self.annotation_mesh.vertex_colors)[rows] = colors
+            self.vis.update_geometry(self.annotation_mesh)
+        self.mark_dirty()
+    
     def cleanup(self):
         """清理资源"""
-        self.timer.stop()
+        self.loader.cancel()
+        self._cancel_lod_build()
+        self.idle_timer.stop()
+        self.view_animator.stop()
+        self.out_of_core_timer.stop()
+        self._out_of_core_page_id += 1
+        if self.out_of_core is not None:
+            self.out_of_core.close()
+            self.out_of_core = None
+        self.scheduler.stop()
         self.vis.destroy_window()
 
+    def _start_pick_index_build(self):
+        """为当前模型在后台线程中构建拾取用的空间索引"""
+        self._pick_index_build_id += 1
+        self.pick_index = None
+        if self.current_model is None:
+            return
+        
+        build_id = self._pick_index_build_id
+        # 在GUI线程中复制坐标，构建过程不受后续编辑影响
+        points = self._model_points().copy()
+        
+        def build():
+            self._pick_index_built.emit(build_id, VoxelHashIndex(points))
+        
+        self._start_job(build, f"PickIndexBuilder-{build_id}")
+    
+    def _on_pick_index_built(self, build_id, index):
+        """空间索引构建完成回调（GUI线程）"""
+        if build_id == self._pick_index_build_id:
+            self.pick_index = index
+    
+    def _update_pick_index(self, changed_rows=None):
+        """模型编辑后更新空间索引
+        
+        已知变化行且点数不变时就地增量更新，否则在后台重建。
+        
+        Args:
+            changed_rows (numpy.ndarray, optional): 变化的点索引
+        """
+        points = self._model_points()
+        if (self.pick_index is not None and changed_rows is not None
+                and len(points) == len(self.pick_index.points)):
+            self.pick_index.update(points, changed_rows)
+        else:
+            self._start_pick_index_build()
+    
+    def _ensure_pick_index(self):
+        """确保空间索引可用，后台构建尚未完成时同步构建"""
+        if self.pick_index is None and self.current_model is not None:
+            self._pick_index_build_id += 1
+            self.pick_index = VoxelHashIndex(self._model_points())
+        return self.pick_index
+    
+    def _model_points(self):
+        """获取当前模型的点或顶点坐标"""
+        if self.current_model_type == 'pcd':
+            return np.asarray(self.current_model.points)
+        return np.asarray(self.current_model.vertices)
+    
+    def screen_ray(self, x, y):
+        """计算从相机穿过渲染图像像素(x, y)的射线
+        
+        Args:
+            x (float): 像素x坐标
+            y (float): 像素y坐标
+            
+        Returns:
+            numpy.ndarray: 射线起点（世界坐标系中的相机中心）
+            numpy.ndarray: 单位方向向量
+            float: x方向焦距（像素）
+        """
+        self.flush_camera_input()
+        camera_params = self.vis.get_view_control().convert_to_pinhole_camera_parameters()
+        intrinsic = camera_params.intrinsic.intrinsic_matrix
+        extrinsic = camera_params.extrinsic
+        
+        # 外参为世界到相机的变换，求逆得到相机中心和世界坐标系下的方向
+        rotation = extrinsic[:3, :3]
+        origin = -rotation.T @ extrinsic[:3, 3]
+        direction_cam = np.array([
+            (x - intrinsic[0, 2]) / intrinsic[0, 0],
+            (y - intrinsic[1, 2]) / intrinsic[1, 1],
+            1.0
+        ])
+        direction = rotation.T @ direction_cam
+        return origin, direction / np.linalg.norm(direction), intrinsic[0, 0]
+    
+    def pick(self, x, y):
+        """拾取渲染图像像素(x, y)处离相机最近的模型点
+        
+        Args:
+            x (float): 像素x坐标
+            y (float): 像素y坐标
+            
+        Returns:
+            tuple: (点或顶点索引, 到拾取射线的距离)，未命中时为None
+        """
+        if not self.geometry_loaded or self._ensure_pick_index() is None:
+            return None
+        origin, direction, focal = self.screen_ray(x, y)
+        # 命中半径为pick_radius_px个像素在对应深度处的宽度
+        return self.pick_index.ray_pick(origin, direction, 0.0, self.pick_radius_px / focal)
+    
+    def select_radius(self, center, radius):
+        """选择球体内的所有模型点，可用于笔刷工具
+        
+        Args:
+            center (numpy.ndarray): 球心
+            radius (float): 半径
+            
+        Returns:
+            numpy.ndarray: 点或顶点索引数组
+        """
+        if self._ensure_pick_index() is None:
+            return np.empty(0, dtype=np.int64)
+        return self.pick_index.query_radius(center, radius)
+    
+    @tracing.traced("renderer.handle_click", "edit")
     def handle_click(self, x, y):
         """处理鼠标点击事件
         
@@ -302,46 +1148,17 @@ class Open3DRenderer(QObject):
         """
         if not self.geometry_loaded or self.current_model is None:
             return
-            
-        # 获取深度缓冲
-        depth = self.vis.capture_depth_float_buffer(do_render=True)
-        if depth is None:
-            return
-            
-        # 获取点击位置的深度值
-        depth_value = depth[y, x]
-        if depth_value == 1.0:  # 如果点击在背景上
-            return
-            
-        # 获取相机参数
-        view_control = self.vis.get_view_control()
-        camera_params = view_control.convert_to_pinhole_camera_parameters()
-        
-        # 将屏幕坐标转换为3D点
-        intrinsic = camera_params.intrinsic.intrinsic_matrix
-        extrinsic = camera_params.extrinsic
         
-        # 计算3D点坐标
-        z = depth_value
-        x_3d = (x - intrinsic[0, 2]) * z / intrinsic[0, 0]
-        y_3d = (y - intrinsic[1, 2]) * z / intrinsic[1, 1]
-        point_3d = np.array([x_3d, y_3d, z])
-        
-        # 转换到世界坐标系
-        point_3d = np.dot(extrinsic[:3, :3], point_3d) + extrinsic[:3, 3]
-        
-        # 添加新点到点云
-        self.click_points.append(point_3d)
+        # 通过空间索引做射线拾取，不读取深度缓冲
+        result = self.pick(x, y)
+        if result is None:  # 如果点击在背景上
+            return
+        index, distance = result
+        point_3d = self.pick_index.points[index].copy()
         
-        # 创建或更新点击点云
-        if self.click_point_cloud is None:
-            self.click_point_cloud = o3d.geometry.PointCloud()
-            self.click_point_cloud.points = o3d.utility.Vector3dVector(self.click_points)
-            self.click_point_cloud.paint_uniform_color([1, 0, 0])  # 红色
-            self.vis.add_geometry(self.click_point_cloud)
-        else:
-            self.click_point_cloud.points = o3d.utility.Vector3dVector(self.click_points)
-            self.vis.update_geometry(self.click_point_cloud)
+        # 添加到标注层，显示在下一次事件循环中批量更新
+        self.add_annotations(point_3d)
         
         # 发送信号通知新点已添加
+        self.point_picked.emit(index, distance)
         self.point_added.emit(point_3d)
@@ -0,0 +1,669 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+超出内存的点云模块，把大型二进制PCD/PLY转换为按八叉树分块的内存映射文件
+
+转换（只需一次，结果缓存在磁盘上）:
+    1. 直接内存映射源文件的数据区，分块扫描得到包围盒
+    2. 按八叉树叶节点的Morton编码计数，再分块把点写到输出文件中对应的位置，
+       这样每个八叉树节点（包括内部节点）的点都是输出文件中连续的一段
+    3. 自底向上为内部节点生成抽样点（按子节点点数比例抽取），作为粗糙的LOD层
+显示时按视锥剔除和屏幕尺寸从根节点开始细化，直到达到点数预算；
+只有选中的节点被读入内存，读入的数据按LRU保留在常驻内存预算以内。
+
+磁盘布局（一个目录）:
+    index.json        元数据和节点表 [层级, Morton编码, 起始行, 点数, LOD起始行, LOD点数]
+    points.npy        (N, 3) float32 坐标，按叶节点Morton编码排序
+    colors.npy        (N, 3) uint8 颜色（源文件有颜色时）
+    lod_points.npy    内部节点的抽样坐标
+    lod_colors.npy    内部节点的抽样颜色
+"""
+
+import heapq
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from renderer.colormap import apply_colormap
+
+
+FORMAT_VERSION = 1
+MAX_DEPTH = 7  # 叶节点最多 8^7 个，计数数组不超过16MB
+
+_PCD_TYPES = {("F", 4): "<f4", ("F", 8): "<f8", ("U", 1): "u1", ("U", 2): "<u2", ("U", 4): "<u4",
+              ("I", 1): "i1", ("I", 2): "<i2", ("I", 4): "<i4", ("U", 8): "<u8", ("I", 8): "<i8"}
+_PLY_TYPES = {"char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1", "short": "<i2", "int16": "<i2",
+              "ushort": "<u2", "uint16": "<u2", "int": "<i4", "int32": "<i4", "uint": "<u4", "uint32": "<u4",
+              "float": "<f4", "float32": "<f4", "double": "<f8", "float64": "<f8"}
+
+
+# ---------------------------------------------------------------------------
+# 源文件解析
+# ---------------------------------------------------------------------------
+
+def read_layout(file_path):
+    """解析二进制PCD/PLY的文件头，得到可直接内存映射的数据布局
+
+    Args:
+        file_path (str): 点云文件路径
+
+    Returns:
+        dict: offset（数据起始字节）、count（点数）、dtype（每个点的结构化类型）、
+            colors（'rgb'表示PCD打包颜色，'channels'表示独立的红绿蓝字段，None表示无颜色）；
+            不支持的格式（ASCII、压缩、大端等）返回None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(65536)
+    except OSError:
+        return None
+    if file_path.lower().endswith('.pcd'):
+        return _read_pcd_layout(head)
+    if file_path.lower().endswith('.ply'):
+        return _read_ply_layout(head)
+    return None
+
+
+def _read_pcd_layout(head):
+    header = {}
+    offset = 0
+    for raw in head.split(b"\n"):
+        offset += len(raw) + 1
+        line = raw.decode("ascii", errors="replace").strip()
+        if not line or line.startswith("#"):
+            continue
+        key, _, value = line.partition(" ")
+        header[key.upper()] = value.split()
+        if key.upper() == "DATA":
+            break
+    else:
+        return None
+    if header.get("DATA") != ["binary"]:
+        return None
+
+    names = header.get("FIELDS", [])
+    sizes = [int(s) for s in header.get("SIZE", [])]
+    types = header.get("TYPE", [])
+    counts = [int(c) for c in header.get("COUNT", ["1"] * len(names))]
+    if not (len(names) == len(sizes) == len(types) == len(counts)) or not {"x", "y", "z"} <= set(names):
+        return None
+
+    fields = []
+    for i, (name, size, kind, count) in enumerate(zip(names, sizes, types, counts)):
+        dtype = _PCD_TYPES.get((kind, size))
+        if dtype is None:
+            return None
+        name = name if name != "_" else f"_pad{i}"
+        fields.append((name, dtype, (count,)) if count > 1 else (name, dtype))
+
+    colors = None
+    if "rgb" in names or "rgba" in names:
+        colors = "rgb"
+    point_count = int(header.get("POINTS", header.get("WIDTH", ["0"]))[0])
+    return {"offset": offset, "count": point_count, "dtype": np.dtype(fields), "colors": colors}
+
+
+def _read_ply_layout(head):
+    end = head.find(b"end_header\n")
+    if end < 0:
+        return None
+    lines = head[:end].decode("ascii", errors="replace").splitlines()
+    if len(lines) < 2 or lines[0].strip() != "ply" or lines[1].split()[:2] != ["format", "binary_little_endian"]:
+        return None
+
+    fields = []
+    point_count = None
+    in_vertex = False
+    for line in lines[2:]:
+        parts = line.split()
+        if not parts or parts[0] in ("comment", "obj_info"):
+            continue
+        if parts[0] == "element":
+            if point_count is not None:
+                # 顶点之后的元素（如面）不影响顶点数据的位置
+                in_vertex = False
+                continue
+            if parts[1] != "vertex":
+                # 顶点之前还有其他元素时无法直接定位数据区
+                return None
+            in_vertex = True
+            point_count = int(parts[2])
+        elif parts[0] == "property" and in_vertex:
+            if parts[1] == "list" or parts[1] not in _PLY_TYPES:
+                return None
+            fields.append((parts[2], _PLY_TYPES[parts[1]]))
+
+    names = [name for name, _ in fields]
+    if point_count is None or not {"x", "y", "z"} <= set(names):
+        return None
+    colors = "channels" if {"red", "green", "blue"} <= set(names) else None
+    return {"offset": end + len(b"end_header\n"), "count": point_count, "dtype": np.dtype(fields), "colors": colors}
+
+
+def _chunk_arrays(records, layout):
+    """从结构化记录中取出float64坐标和uint8颜色，去除非有限的点"""
+    points = np.stack([records["x"], records["y"], records["z"]], axis=1).astype(np.float64)
+    colors = None
+    if layout["colors"] == "rgb":
+        name = "rgb" if "rgb" in records.dtype.names else "rgba"
+        packed = np.ascontiguousarray(records[name]).view(np.uint32)
+        colors = np.stack([(packed >> 16) & 255, (packed >> 8) & 255, packed & 255], axis=1).astype(np.uint8)
+    elif layout["colors"] == "channels":
+        colors = np.stack([records["red"], records["green"], records["blue"]], axis=1)
+        if colors.dtype.kind == "f":
+            colors = np.clip(colors * 255.0, 0, 255)
+        colors = colors.astype(np.uint8)
+    finite = np.all(np.isfinite(points), axis=1)
+    if not finite.all():
+        points = points[finite]
+        colors = colors[finite] if colors is not None else None
+    return points, colors
+
+
+# ---------------------------------------------------------------------------
+# Morton编码
+# ---------------------------------------------------------------------------
+
+def _part1by2(v):
+    v = v & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def _compact1by2(v):
+    v = v & 0x09249249
+    v = (v ^ (v >> 2)) & 0x030C30C3
+    v = (v ^ (v >> 4)) & 0x0300F00F
+    v = (v ^ (v >> 8)) & 0x030000FF
+    v = (v ^ (v >> 16)) & 0x000003FF
+    return v
+
+
+def morton_encode(cells):
+    """把 (N, 3) 整数格坐标编码为Morton码"""
+    cells = np.asarray(cells, dtype=np.int64)
+    return _part1by2(cells[..., 0]) | (_part1by2(cells[..., 1]) << 1) | (_part1by2(cells[..., 2]) << 2)
+
+
+def morton_decode(codes):
+    """把Morton码解码为 (..., 3) 整数格坐标"""
+    codes = np.asarray(codes, dtype=np.int64)
+    return np.stack([_compact1by2(codes), _compact1by2(codes >> 1), _compact1by2(codes >> 2)], axis=-1)
+
+
+# ---------------------------------------------------------------------------
+# 转换
+# ---------------------------------------------------------------------------
+
+def convert(file_path, out_dir, tile_points=262144, node_points=65536, chunk_points=2000000,
+            progress=None, cancel_event=None):
+    """把二进制PCD/PLY转换为八叉树分块的内存映射布局
+
+    源文件和输出都通过内存映射分块读写，内存占用与点数无关。
+
+    Args:
+        file_path (str): 源文件
+        out_dir (str): 输出目录（会被创建）
+        tile_points (int): 叶节点的目标点数
+        node_points (int): 内部节点的抽样点数
+        chunk_points (int): 每次处理的点数
+        progress (callable, optional): 进度回调，签名为progress(百分比, 阶段描述)
+        cancel_event (threading.Event, optional): 取消事件
+
+    Returns:
+        bool: 是否完成（取消或格式不支持时为False）
+    """
+    if progress is None:
+        progress = lambda percent, message: None
+    layout = read_layout(file_path)
+    if layout is None or layout["count"] == 0:
+        return False
+    source = np.memmap(file_path, dtype=layout["dtype"], mode='r',
+                       offset=layout["offset"], shape=(layout["count"],))
+    total = len(source)
+    has_colors = layout["colors"] is not None
+
+    def chunks():
+        for start in range(0, total, chunk_points):
+            if cancel_event is not None and cancel_event.is_set():
+                raise InterruptedError
+            yield start, _chunk_arrays(source[start:start + chunk_points], layout)
+
+    try:
+        # 第一遍: 包围盒和有效点数
+        low = np.full(3, np.inf)
+        high = np.full(3, -np.inf)
+        count = 0
+        for start, (points, _) in chunks():
+            progress(5 + 15 * start // total, "扫描包围盒")
+            if len(points):
+                low = np.minimum(low, points.min(axis=0))
+                high = np.maximum(high, points.max(axis=0))
+                count += len(points)
+        if count == 0:
+            return False
+
+        # 按表面点云估计深度: 叶节点数约为 4^depth
+        depth = int(np.clip(np.ceil(np.log(max(count / tile_points, 1.0)) / np.log(4)), 0, MAX_DEPTH))
+        size = float((high - low).max()) or 1.0
+        resolution = 1 << depth
+
+        def leaf_codes(points):
+            cells = np.floor((points - low) / size * resolution).astype(np.int64)
+            np.clip(cells, 0, resolution - 1, out=cells)
+            return morton_encode(cells)
+
+        # 第二遍: 每个叶节点的点数
+        leaf_counts = np.zeros(8 ** depth, dtype=np.int64)
+        for start, (points, _) in chunks():
+            progress(20 + 20 * start // total, "统计分块")
+            leaf_counts += np.bincount(leaf_codes(points), minlength=len(leaf_counts))
+        leaf_starts = np.concatenate([[0], np.cumsum(leaf_counts)[:-1]])
+
+        # 第三遍: 按叶节点顺序写出
+        os.makedirs(out_dir, exist_ok=True)
+        out_points = np.lib.format.open_memmap(os.path.join(out_dir, "points.npy"), mode='w+',
+                                               dtype=np.float32, shape=(count, 3))
+        out_colors = None
+        if has_colors:
+            out_colors = np.lib.format.open_memmap(os.path.join(out_dir, "colors.npy"), mode='w+',
+                                                   dtype=np.uint8, shape=(count, 3))
+        fill = leaf_starts.copy()
+        for start, (points, colors) in chunks():
+            progress(40 + 40 * start // total, "写入分块")
+            codes = leaf_codes(points)
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            unique, first, counts = np.unique(sorted_codes, return_index=True, return_counts=True)
+            rows = fill[sorted_codes] + (np.arange(len(order)) - np.repeat(first, counts))
+            out_points[rows] = points[order]
+            if out_colors is not None:
+                out_colors[rows] = colors[order]
+            fill[unique] += counts
+        out_points.flush()
+        if out_colors is not None:
+            out_colors.flush()
+
+        # 节点表: 每层的非空节点按Morton编码排序，节点的点在输出中连续
+        levels = []
+        for level in range(depth + 1):
+            shift = 3 * (depth - level)
+            level_counts = leaf_counts.reshape(-1, 1 << shift).sum(axis=1) if shift else leaf_counts
+            keys = np.flatnonzero(level_counts)
+            starts = leaf_starts[keys << shift]
+            levels.append((keys, starts, level_counts[keys]))
+
+        # 内部节点的抽样数预先确定，LOD数组按层从深到浅连续存放
+        lod_counts = [np.minimum(levels[level][2], node_points) for level in range(depth)]
+        lod_total = int(sum(c.sum() for c in lod_counts))
+        lod_starts = []
+        cursor = 0
+        for level in reversed(range(depth)):
+            starts = cursor + np.concatenate([[0], np.cumsum(lod_counts[level])[:-1]]).astype(np.int64)
+            lod_starts.insert(0, starts)
+            cursor += int(lod_counts[level].sum())
+        lod_starts.append(np.full(len(levels[depth][0]), -1, dtype=np.int64))
+        lod_counts.append(np.full(len(levels[depth][0]), -1, dtype=np.int64))
+
+        lod_points = lod_colors = None
+        if depth > 0:
+            lod_points = np.lib.format.open_memmap(os.path.join(out_dir, "lod_points.npy"), mode='w+',
+                                                   dtype=np.float32, shape=(lod_total, 3))
+        if depth > 0 and has_colors:
+            lod_colors = np.lib.format.open_memmap(os.path.join(out_dir, "lod_colors.npy"), mode='w+',
+                                                   dtype=np.uint8, shape=(lod_total, 3))
+        # 第四遍: 自底向上抽样，每个子节点按点数比例贡献抽样点
+        for level in reversed(range(depth)):
+            progress(80 + 15 * (depth - level) // max(depth, 1), "生成LOD")
+            keys, _, counts = levels[level]
+            child_keys, child_starts, child_counts = levels[level + 1]
+            child_parent = child_keys >> 3
+            for i, key in enumerate(keys):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InterruptedError
+                lo, hi = np.searchsorted(child_parent, [key, key + 1])
+                target = int(lod_counts[level][i])
+                parts_points = []
+                parts_colors = []
+                for c in range(lo, hi):
+                    share = max(1, int(round(target * child_counts[c] / counts[i])))
+                    if level + 1 == depth:
+                        src_points, src_colors = out_points, out_colors
+                        src_start, src_count = child_starts[c], child_counts[c]
+                    else:
+                        src_points, src_colors = lod_points, lod_colors
+                        src_start, src_count = lod_starts[level + 1][c], lod_counts[level + 1][c]
+                    rows = src_start + np.linspace(0, src_count - 1, min(share, src_count)).astype(np.int64)
+                    parts_points.append(src_points[rows])
+                    if src_colors is not None:
+                        parts_colors.append(src_colors[rows])
+                sample = np.concatenate(parts_points)
+                # 取整误差使抽样数偏离目标时，再按步长修正
+                rows = np.linspace(0, len(sample) - 1, target).astype(np.int64)
+                start = lod_starts[level][i]
+                lod_points[start:start + target] = sample[rows]
+                if lod_colors is not None:
+                    lod_colors[start:start + target] = np.concatenate(parts_colors)[rows]
+        if lod_points is not None:
+            lod_points.flush()
+        if lod_colors is not None:
+            lod_colors.flush()
+
+        nodes = []
+        for level in range(depth + 1):
+            keys, starts, counts = levels[level]
+            for i in range(len(keys)):
+                nodes.append([level, int(keys[i]), int(starts[i]), int(counts[i]),
+                              int(lod_starts[level][i]), int(lod_counts[level][i])])
+        stat = os.stat(file_path)
+        index = {
+            "version": FORMAT_VERSION,
+            "source": os.path.abspath(file_path),
+            "source_stamp": [stat.st_mtime_ns, stat.st_size],
+            "count": count,
+            "has_colors": has_colors,
+            "origin": low.tolist(),
+            "size": size,
+            "min_bound": low.tolist(),
+            "max_bound": high.tolist(),
+            "depth": depth,
+            "nodes": nodes
+        }
+        # 最后写入索引，索引存在即表示转换完整
+        with open(os.path.join(out_dir, "index.json.tmp"), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(os.path.join(out_dir, "index.json.tmp"), os.path.join(out_dir, "index.json"))
+        progress(100, "转换完成")
+        return True
+    except InterruptedError:
+        return False
+
+
+def is_converted(out_dir, file_path):
+    """输出目录中是否有与源文件当前状态一致的完整转换结果"""
+    try:
+        with open(os.path.join(out_dir, "index.json"), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return False
+    return (index.get("version") == FORMAT_VERSION
+            and index.get("source_stamp") == [stat.st_mtime_ns, stat.st_size])
+
+
+def _directory_size(directory):
+    """目录中文件的总字节数"""
+    total = 0
+    for name in os.listdir(directory):
+        try:
+            total += os.path.getsize(os.path.join(directory, name))
+        except OSError:
+            pass
+    return total
+
+
+def prune_layouts(root, max_bytes, keep):
+    """清理转换结果目录
+
+    删除与keep同一源文件的旧转换结果（源文件被修改或替换后留下的），
+    再按最近使用顺序（index.json的修改时间）删除其他结果，直到总大小不超过max_bytes。
+    未完成的转换（.tmp目录）不在此处理，同一文件再次转换时会先删除它。
+
+    Args:
+        root (str): 转换结果的根目录
+        max_bytes (int): 容量上限（字节）
+        keep (str): 当前使用的转换结果目录，不会被删除
+
+    Returns:
+        int: 删除的目录数
+    """
+    def source_of(directory):
+        try:
+            with open(os.path.join(directory, "index.json"), 'r', encoding='utf-8') as f:
+                return json.load(f).get("source")
+        except (OSError, ValueError):
+            return None
+
+    keep = os.path.abspath(keep)
+    keep_source = source_of(keep)
+    entries = []
+    for name in os.listdir(root):
+        directory = os.path.abspath(os.path.join(root, name))
+        if directory == keep or name.endswith(".tmp") or not os.path.isdir(directory):
+            continue
+        entries.append(directory)
+
+    removed = 0
+    remaining = []
+    for directory in entries:
+        if keep_source is not None and source_of(directory) == keep_source:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+        else:
+            try:
+                used = os.path.getmtime(os.path.join(directory, "index.json"))
+            except OSError:
+                used = 0.0  # 没有索引的残留目录最先删除
+            remaining.append((used, directory, _directory_size(directory)))
+
+    total = _directory_size(keep) + sum(size for _, _, size in remaining)
+    for _, directory, size in sorted(remaining):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# 按视图分页读取
+# ---------------------------------------------------------------------------
+
+class OutOfCoreCloud:
+    """内存映射的八叉树点云，按视图选择节点并在常驻内存预算内缓存
+
+    assemble可以在工作线程中调用，与close、get_stats之间互斥。
+    """
+
+    def __init__(self, directory, resident_budget=1024 * 1024 * 1024, colormap="rainbow", color_axis=2):
+        """打开转换结果
+
+        Args:
+            directory (str): convert的输出目录
+            resident_budget (int): 已读入节点数据的内存上限（字节）
+            colormap (str): 源文件无颜色时使用的颜色映射
+            color_axis (int): 颜色映射所依据的坐标轴
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "index.json"), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.count = index["count"]
+        self.depth = index["depth"]
+        self.origin = np.asarray(index["origin"])
+        self.size = index["size"]
+        self.min_bound = np.asarray(index["min_bound"])
+        self.max_bound = np.asarray(index["max_bound"])
+        self.has_colors = index["has_colors"]
+        self.colormap = colormap
+        self.color_axis = color_axis
+        self.resident_budget = resident_budget
+
+        nodes = np.asarray(index["nodes"], dtype=np.int64).reshape(-1, 6)
+        self.level, self.key, self.start, self.node_count, self.lod_start, self.lod_count = nodes.T
+        # 显示一个节点时的点数: 叶节点为全部点，内部节点为抽样点
+        self.display_count = np.where(self.level == self.depth, self.node_count, self.lod_count)
+        self._level_ranges = [np.searchsorted(self.level, [l, l + 1]) for l in range(self.depth + 1)]
+
+        self.points = np.load(os.path.join(directory, "points.npy"), mmap_mode='r')
+        self.colors = np.load(os.path.join(directory, "colors.npy"), mmap_mode='r') if self.has_colors else None
+        self.lod_points = self.lod_colors = None
+        if self.depth > 0:
+            self.lod_points = np.load(os.path.join(directory, "lod_points.npy"), mmap_mode='r')
+            if self.has_colors:
+                self.lod_colors = np.load(os.path.join(directory, "lod_colors.npy"), mmap_mode='r')
+
+        self._lock = threading.Lock()  # 保护常驻数据、统计和内存映射
+        self._resident = OrderedDict()  # 节点序号 -> (坐标, 颜色)
+        self.resident_bytes = 0
+        self.stats = {"node_loads": 0, "node_hits": 0, "evictions": 0, "bytes_loaded": 0}
+
+    def children(self, node):
+        """节点的子节点序号"""
+        level = self.level[node]
+        if level == self.depth:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = self._level_ranges[level + 1]
+        keys = self.key[lo:hi]
+        first, last = np.searchsorted(keys, [self.key[node] << 3, (self.key[node] + 1) << 3])
+        return np.arange(lo + first, lo + last)
+
+    def node_bounds(self, node):
+        """节点立方体的 (最小角点, 边长)"""
+        edge = self.size / (1 << int(self.level[node]))
+        return self.origin + morton_decode(self.key[node]) * edge, edge
+
+    def select(self, view, point_budget, min_spacing_px=1.0):
+        """为视图选择要显示的节点
+
+        从根节点开始，按屏幕尺寸从大到小细化可见节点，直到点数预算用完，
+        或节点的屏幕点间距已小于min_spacing_px。视锥外的节点不显示。
+
+        Args:
+            view (ViewState): 相机视图
+            point_budget (int): 最多显示的点数
+            min_spacing_px (float): 点间距小于该像素数时不再细化
+
+        Returns:
+            list: 选中的节点序号（升序）
+        """
+        rotation = view.extrinsic[:3, :3]
+        translation = view.extrinsic[:3, 3]
+        fx, fy = view.intrinsic[0, 0], view.intrinsic[1, 1]
+        tan_x = view.width * 0.5 / fx
+        tan_y = view.height * 0.5 / fy
+        slack_x = np.sqrt(1 + tan_x * tan_x)
+        slack_y = np.sqrt(1 + tan_y * tan_y)
+
+        def screen_size(node):
+            """节点的屏幕尺寸（像素），不可见时为None"""
+            low, edge = self.node_bounds(node)
+            center = rotation @ (low + edge * 0.5) + translation
+            radius = edge * 0.8660254  # 立方体外接球半径
+            x, y, z = center
+            if z + radius <= 0:
+                return None
+            if abs(x) > tan_x * max(z, 0) + radius * slack_x or abs(y) > tan_y * max(z, 0) + radius * slack_y:
+                return None
+            return edge * fy / max(z - radius, edge * 1e-3)
+
+        root = 0
+        root_size = screen_size(root)
+        if root_size is None:
+            return []
+        heap = [(-root_size, root)]
+        chosen = []
+        total = int(self.display_count[root])
+        while heap:
+            neg_size, node = heapq.heappop(heap)
+            if self.level[node] == self.depth:
+                chosen.append(node)
+                continue
+            # 屏幕上的点间距已经足够小时不再细化
+            if -neg_size / np.sqrt(max(self.display_count[node], 1)) < min_spacing_px:
+                chosen.append(node)
+                continue
+            visible = [(screen_size(c), c) for c in self.children(node)]
+            visible = [(s, c) for s, c in visible if s is not None]
+            extra = sum(int(self.display_count[c]) for _, c in visible) - int(self.display_count[node])
+            if total + extra > point_budget:
+                chosen.append(node)
+                continue
+            total += extra
+            for s, c in visible:
+                heapq.heappush(heap, (-s, c))
+        return sorted(int(n) for n in chosen)
+
+    def _load(self, node):
+        """读入节点数据，已读入时只更新LRU顺序"""
+        if node in self._resident:
+            self._resident.move_to_end(node)
+            self.stats["node_hits"] += 1
+            return self._resident[node]
+
+        if self.level[node] == self.depth:
+            rows = slice(self.start[node], self.start[node] + self.node_count[node])
+            points, colors = self.points, self.colors
+        else:
+            rows = slice(self.lod_start[node], self.lod_start[node] + self.lod_count[node])
+            points, colors = self.lod_points, self.lod_colors
+        data = (np.array(points[rows]), np.array(colors[rows]) if colors is not None else None)
+        nbytes = data[0].nbytes + (data[1].nbytes if data[1] is not None else 0)
+        self._resident[node] = data
+        self.resident_bytes += nbytes
+        self.stats["node_loads"] += 1
+        self.stats["bytes_loaded"] += nbytes
+        return data
+
+    def _evict(self, keep):
+        """按LRU释放节点数据直到不超过常驻预算，keep中的节点不释放"""
+        for node in list(self._resident):
+            if self.resident_bytes <= self.resident_budget:
+                break
+            if node in keep:
+                continue
+            points, colors = self._resident.pop(node)
+            self.resident_bytes -= points.nbytes + (colors.nbytes if colors is not None else 0)
+            self.stats["evictions"] += 1
+
+    def assemble(self, nodes):
+        """读入选中的节点并拼接为显示用的数组
+
+        Args:
+            nodes (list): select返回的节点序号
+
+        Returns:
+            tuple: (N, 3) float64坐标, (N, 3) float64颜色
+        """
+        with self._lock:
+            if self.points is None:
+                raise ValueError("分块点云已关闭")
+            parts = [self._load(node) for node in nodes]
+            self._evict(set(nodes))
+        if not parts:
+            return np.zeros((0, 3)), np.zeros((0, 3))
+        points = np.concatenate([p for p, _ in parts]).astype(np.float64)
+        if self.has_colors:
+            colors = np.concatenate([c for _, c in parts]).astype(np.float64) / 255.0
+        else:
+            # 按整体包围盒归一化，颜色不随选中的节点变化
+            colors = apply_colormap(points[:, self.color_axis], self.colormap,
+                                    self.min_bound[self.color_axis], self.max_bound[self.color_axis])
+        return points, colors
+
+    def get_stats(self):
+        """获取分页统计
+
+        Returns:
+            dict: 总点数、节点数、常驻字节数、读入/命中/释放次数
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update(count=self.count, nodes=len(self.level), depth=self.depth,
+                         resident_bytes=self.resident_bytes, resident_nodes=len(self._resident))
+        return stats
+
+    def close(self):
+        """释放读入的数据和内存映射，正在进行的assemble完成后才会释放"""
+        with self._lock:
+            self._resident.clear()
+            self.resident_bytes = 0
+            self.points = self.colors = self.lod_points = self.lod_colors = None
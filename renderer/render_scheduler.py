@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+渲染调度模块，按需（场景变脏时）触发渲染，并限制最大帧率
+"""
+
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class RenderScheduler(QObject):
+    """脏标记渲染调度器
+
+    场景发生变化时调用 mark_dirty()，调度器在不超过最大帧率的前提下
+    尽快发出一次 frame_requested 信号；场景未变化时不产生任何帧。
+    同一帧间隔内的多次 mark_dirty() 会合并为一帧，被合并的请求计入跳过帧数。
+    """
+
+    # 信号定义
+    frame_requested = Signal()  # 需要渲染新的一帧时发出
+
+    def __init__(self, max_fps=30, parent=None):
+        """初始化渲染调度器
+
+        Args:
+            max_fps (float): 最大帧率
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.dirty = False
+        self.frames_rendered = 0  # 实际产生的帧数
+        self.frames_skipped = 0  # 被合并而未单独渲染的请求数
+        self._last_frame_time = 0.0
+        self._min_interval = 0.0
+        self.set_max_fps(max_fps)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+
+    def set_max_fps(self, max_fps):
+        """设置最大帧率
+
+        Args:
+            max_fps (float): 最大帧率，小于等于0表示不限制
+        """
+        self.max_fps = max_fps
+        self._min_interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+
+    def mark_dirty(self):
+        """标记场景已变化，安排下一帧渲染"""
+        if self.dirty:
+            # 已有待渲染的帧，本次请求被合并
+            self.frames_skipped += 1
+            return
+
+        self.dirty = True
+        if not self.timer.isActive():
+            elapsed = time.perf_counter() - self._last_frame_time
+            delay = max(0.0, self._min_interval - elapsed)
+            self.timer.start(int(delay * 1000))
+
+    def _on_timeout(self):
+        """定时器回调，产生一帧"""
+        if not self.dirty:
+            return
+        # 先清除脏标记，渲染过程中产生的新变化会安排下一帧
+        self.dirty = False
+        self._last_frame_time = time.perf_counter()
+        self.frames_rendered += 1
+        self.frame_requested.emit()
+
+    def get_stats(self):
+        """获取调度统计
+
+        Returns:
+            dict: 已渲染帧数、跳过帧数和最大帧率
+        """
+        return {
+            "frames_rendered": self.frames_rendered,
+            "frames_skipped": self.frames_skipped,
+            "max_fps": self.max_fps
+        }
+
+    def reset_stats(self):
+        """重置统计计数"""
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+    def stop(self):
+        """停止调度"""
+        self.timer.stop()
+        self.dirty = False
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+空间索引模块，基于体素哈希实现射线拾取和半径邻域查询
+
+点按体素编号排序存储，每个体素对应排序数组中的一段连续区间，
+查询时只访问射线或球体经过的体素，不需要读取深度缓冲。
+"""
+
+import numpy as np
+
+
+class VoxelHashIndex:
+    """体素哈希空间索引"""
+
+    def __init__(self, points, voxel_size=None, target_per_voxel=8):
+        """初始化并构建索引
+
+        Args:
+            points (numpy.ndarray): (N, 3) 点坐标
+            voxel_size (float, optional): 体素大小，默认按平均每个体素target_per_voxel个点估计
+            target_per_voxel (int): 估计体素大小时的目标平均点数
+        """
+        self.target_per_voxel = target_per_voxel
+        self.build(points, voxel_size)
+
+    def build(self, points, voxel_size=None):
+        """构建索引
+
+        Args:
+            points (numpy.ndarray): (N, 3) 点坐标
+            voxel_size (float, optional): 体素大小
+        """
+        # 总是复制，索引持有自己的坐标。传入的可能是Open3D缓冲区的视图，
+        # 模型被原地修改后update()需要用旧坐标判断点是否跨越了体素
+        self.points = np.array(points, dtype=np.float64, order="C", copy=True)
+        if len(self.points) == 0:
+            self.min_bound = np.zeros(3)
+            self.max_bound = np.zeros(3)
+        else:
+            self.min_bound = self.points.min(axis=0)
+            self.max_bound = self.points.max(axis=0)
+        self.voxel_size = voxel_size or self._estimate_voxel_size()
+        self.dims = np.maximum(
+            np.floor((self.max_bound - self.min_bound) / self.voxel_size).astype(np.int64) + 1, 1)
+
+        keys = self._keys(self._cells(self.points))
+        self.order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self.order]
+        self.voxel_keys, self.voxel_starts, self.voxel_counts = np.unique(
+            sorted_keys, return_index=True, return_counts=True)
+
+    def update(self, points, changed_rows=None):
+        """模型编辑后更新索引
+
+        点数不变、仍在原包围盒内且变化的点没有跨越体素时只更新坐标，
+        否则重新构建。
+
+        Args:
+            points (numpy.ndarray): (N, 3) 新的点坐标
+            changed_rows (numpy.ndarray, optional): 变化的行索引，None表示未知
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if changed_rows is None or len(points) != len(self.points):
+            self.build(points, self.voxel_size)
+            return
+
+        changed_rows = np.asarray(changed_rows, dtype=np.int64)
+        new = points[changed_rows]
+        inside = np.all((new >= self.min_bound) & (new <= self.max_bound))
+        if inside and np.array_equal(self._keys(self._cells(new)),
+                                     self._keys(self._cells(self.points[changed_rows]))):
+            self.points[changed_rows] = new
+        else:
+            self.build(points, self.voxel_size)
+
+    def memory_usage(self):
+        """计算索引数组的内存占用
+
+        Returns:
+            int: 字节数
+        """
+        return sum(array.nbytes for array in (self.points, self.order, self.voxel_keys,
+                                              self.voxel_starts, self.voxel_counts))
+
+    def _estimate_voxel_size(self):
+        """按包围盒体积和点数估计体素大小"""
+        extent = self.max_bound - self.min_bound
+        count = max(len(self.points), 1)
+        # 忽略退化的轴（平面点云），按有效维度估计
+        valid = extent[extent > 0]
+        if valid.size == 0:
+            return 1.0
+        cells = max(count / self.target_per_voxel, 1.0)
+        return float(np.prod(valid) / cells) ** (1.0 / valid.size)
+
+    def _cells(self, points):
+        """计算点所在的体素坐标"""
+        cells = np.floor((points - self.min_bound) / self.voxel_size).astype(np.int64)
+        return np.clip(cells, 0, self.dims - 1)
+
+    def _keys(self, cells):
+        """把体素坐标编码为一维键"""
+        return cells[..., 0] + self.dims[0] * (cells[..., 1] + self.dims[1] * cells[..., 2])
+
+    def _gather(self, cells):
+        """收集一组体素中的所有点索引"""
+        cells = cells[np.all((cells >= 0) & (cells < self.dims), axis=1)]
+        if len(cells) == 0:
+            return np.empty(0, dtype=np.int64)
+        keys = np.unique(self._keys(cells))
+        pos = np.searchsorted(self.voxel_keys, keys)
+        valid = pos < len(self.voxel_keys)
+        pos, keys = pos[valid], keys[valid]
+        pos = pos[self.voxel_keys[pos] == keys]
+        if len(pos) == 0:
+            return np.empty(0, dtype=np.int64)
+        starts = self.voxel_starts[pos]
+        counts = self.voxel_counts[pos]
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return self.order[np.arange(counts.sum()) + offsets]
+
+    @staticmethod
+    def _dilate(cells, rings=1):
+        """把体素集合向外扩展若干圈"""
+        r = np.arange(-rings, rings + 1)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+        return (cells[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+
+    def query_radius(self, center, radius):
+        """查询球体内的所有点
+
+        Args:
+            center (numpy.ndarray): 球心
+            radius (float): 半径
+
+        Returns:
+            numpy.ndarray: 点索引数组
+        """
+        center = np.asarray(center, dtype=np.float64)
+        low = np.floor((center - radius - self.min_bound) / self.voxel_size).astype(np.int64)
+        high = np.floor((center + radius - self.min_bound) / self.voxel_size).astype(np.int64)
+        low = np.maximum(low, 0)
+        high = np.minimum(high, self.dims - 1)
+        if np.any(high < low):
+            return np.empty(0, dtype=np.int64)
+        axes = [np.arange(low[i], high[i] + 1) for i in range(3)]
+        cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+        candidates = self._gather(cells)
+        d2 = np.sum((self.points[candidates] - center) ** 2, axis=1)
+        return candidates[d2 <= radius * radius]
+
+    def _ray_samples(self, origin, direction, t_near, t_far, tolerance, tolerance_per_depth):
+        """生成射线上的采样点及每个采样点需要扩展的体素圈数
+
+        Returns:
+            tuple: ((M, 3) 采样点, (M,) 扩展圈数)
+        """
+        half = self.voxel_size * 0.5
+        depths = []
+        reach = []
+        t = t_near
+        while True:
+            step = max(half, tolerance + tolerance_per_depth * t)
+            # 下一步的步长更大，按它的一半估计采样点覆盖的深度范围
+            next_half = max(half, tolerance + tolerance_per_depth * (t + step)) * 0.5
+            depths.append(t)
+            reach.append(tolerance + tolerance_per_depth * (t + next_half) + next_half)
+            if t > t_far:
+                break
+            t += step
+        depths = np.asarray(depths)
+        rings = np.maximum(np.ceil(np.asarray(reach) / self.voxel_size).astype(np.int64), 1)
+        return origin + depths[:, None] * direction, rings
+
+    def ray_pick(self, origin, direction, tolerance, tolerance_per_depth=0.0):
+        """沿射线拾取离相机最近的点
+
+        点到射线的垂直距离不超过 tolerance + tolerance_per_depth * 深度 时视为命中，
+        命中点中取沿射线方向最靠前的一个。
+
+        Args:
+            origin (numpy.ndarray): 射线起点（相机中心）
+            direction (numpy.ndarray): 射线方向
+            tolerance (float): 固定的命中距离
+            tolerance_per_depth (float): 随深度增加的命中距离（透视投影下的像素宽度）
+
+        Returns:
+            tuple: (点索引, 到射线的距离)，未命中时为None
+        """
+        if len(self.points) == 0:
+            return None
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        direction = direction / np.linalg.norm(direction)
+
+        # 命中点到射线的投影可能在包围盒外，按最大命中距离扩大包围盒
+        corners = np.stack([self.min_bound, self.max_bound])
+        farthest = np.linalg.norm(np.abs(corners - origin).max(axis=0))
+        pad = self.voxel_size + tolerance + tolerance_per_depth * farthest
+
+        # 射线与包围盒求交（slab方法）
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1.0 / direction
+            t0 = (self.min_bound - pad - origin) * inv
+            t1 = (self.max_bound + pad - origin) * inv
+        t_near = np.nanmax(np.minimum(t0, t1))
+        t_far = np.nanmin(np.maximum(t0, t1))
+        t_near = max(t_near, 0.0)
+        if t_far < t_near:
+            return None
+
+        # 沿射线采样，步长取半个体素和该深度命中距离中的较大者。
+        # 深度在采样点前后半步内的命中点离采样点不超过 命中距离 + 半步，
+        # 每个采样点按这个距离决定向外扩展的圈数
+        samples, rings = self._ray_samples(origin, direction, t_near, t_far, tolerance, tolerance_per_depth)
+        cells = np.floor((samples - self.min_bound) / self.voxel_size).astype(np.int64)
+        keep = np.ones(len(cells), dtype=bool)
+        keep[1:] = np.any(cells[1:] != cells[:-1], axis=1) | (rings[1:] != rings[:-1])
+        cells, rings = cells[keep], rings[keep]
+        candidates = self._gather(np.concatenate([
+            self._dilate(cells[rings == ring], int(ring)) for ring in np.unique(rings)]))
+        if len(candidates) == 0:
+            return None
+
+        offsets = self.points[candidates] - origin
+        depth = offsets @ direction
+        perpendicular = np.linalg.norm(offsets - depth[:, None] * direction, axis=1)
+        hit = (depth > 0) & (perpendicular <= tolerance + tolerance_per_depth * depth)
+        if not np.any(hit):
+            return None
+
+        hit_idx = np.flatnonzero(hit)
+        best = hit_idx[np.argmin(depth[hit_idx])]
+        return int(candidates[best]), float(perpendicular[best])
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缩略图渲染模块，在隐藏窗口中批量渲染模型的环绕视图并保存为PNG
+
+与Open3DRenderer使用相同的隐藏窗口方式，但不依赖Qt和渲染调度器，
+同一个实例可以依次渲染多个模型，每个模型只替换几何体而不重新创建窗口。
+"""
+
+import os
+
+import numpy as np
+import open3d as o3d
+
+
+def orbit_fronts(front, up, views, elevation_deg=20.0):
+    """计算绕上方向环绕一周的相机朝向
+
+    Args:
+        front (array-like): 第一个视图的朝向
+        up (array-like): 上方向
+        views (int): 视图数量
+        elevation_deg (float): 仰角（度）
+
+    Returns:
+        numpy.ndarray: (views, 3) 单位朝向向量
+    """
+    up = np.asarray(up, dtype=np.float64)
+    up = up / np.linalg.norm(up)
+    base = np.asarray(front, dtype=np.float64)
+    base = base - np.dot(base, up) * up
+    if np.linalg.norm(base) < 1e-9:
+        # 朝向与上方向平行时任取一个垂直方向
+        base = np.cross(up, [1.0, 0.0, 0.0])
+        if np.linalg.norm(base) < 1e-9:
+            base = np.cross(up, [0.0, 1.0, 0.0])
+    base = base / np.linalg.norm(base)
+    side = np.cross(up, base)
+
+    angles = 2 * np.pi * np.arange(views) / views
+    horizontal = np.cos(angles)[:, None] * base + np.sin(angles)[:, None] * side
+    elevation = np.radians(elevation_deg)
+    return np.cos(elevation) * horizontal + np.sin(elevation) * up
+
+
+class ThumbnailRenderer:
+    """复用同一个隐藏窗口的缩略图渲染器"""
+
+    def __init__(self, config=None, width=256, height=256):
+        """初始化缩略图渲染器
+
+        Args:
+            config: 配置对象，可选
+            width (int): 图像宽度
+            height (int): 图像高度
+        """
+        self.width = width
+        self.height = height
+        background_color = [1, 1, 1]
+        point_size = 2.0
+        self.zoom = 0.8
+        self.front = [0, 0, -1]
+        self.up = [0, 1, 0]
+        if config:
+            background_color = config.get_value("renderer", "background_color", [1, 1, 1])
+            point_size = config.get_value("renderer", "point_size", 2.0)
+            self.zoom = config.get_value("view", "zoom", 0.8)
+            self.front = config.get_value("view", "front", [0, 0, -1])
+            self.up = config.get_value("view", "up", [0, 1, 0])
+
+        self.vis = o3d.visualization.Visualizer()
+        self.vis.create_window(visible=False, width=width, height=height)
+        opt = self.vis.get_render_option()
+        opt.background_color = np.asarray(background_color, dtype=np.float64)
+        opt.point_size = point_size
+
+        self.models_rendered = 0
+        self.images_rendered = 0
+
+    def render(self, geometry, output_prefix, views=8, elevation_deg=20.0):
+        """渲染一个模型的环绕视图
+
+        Args:
+            geometry: 点云或网格
+            output_prefix (str): 输出路径前缀，图像保存为 <前缀>_<序号>.png
+            views (int): 视图数量
+            elevation_deg (float): 仰角（度），只有一个视图时使用配置中的朝向
+
+        Returns:
+            list: 保存的图像路径
+        """
+        self.vis.clear_geometries()
+        self.vis.add_geometry(geometry)
+        lookat = geometry.get_axis_aligned_bounding_box().get_center()
+
+        if views == 1:
+            fronts = [np.asarray(self.front, dtype=np.float64)]
+        else:
+            fronts = orbit_fronts(self.front, self.up, views, elevation_deg)
+
+        os.makedirs(os.path.dirname(output_prefix) or ".", exist_ok=True)
+        ctr = self.vis.get_view_control()
+        paths = []
+        for i, front in enumerate(fronts):
+            ctr.set_lookat(lookat)
+            ctr.set_front(front)
+            ctr.set_up(self.up)
+            ctr.set_zoom(self.zoom)
+            self.vis.poll_events()
+            self.vis.update_renderer()
+            path = f"{output_prefix}_{i:02d}.png"
+            self.vis.capture_screen_image(path, do_render=True)
+            paths.append(path)
+
+        # 释放几何体，下一个模型到来之前不占用显存
+        self.vis.clear_geometries()
+        self.models_rendered += 1
+        self.images_rendered += len(paths)
+        return paths
+
+    def close(self):
+        """销毁隐藏窗口"""
+        self.vis.destroy_window()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+视图状态模块，保存/恢复相机参数并在两个视图之间做动画过渡
+
+视图状态只包含针孔相机的内参和外参，不涉及几何体，
+因此保存、恢复和重置视图的开销与模型大小无关。
+"""
+
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+def _matrix_to_quaternion(rotation):
+    """旋转矩阵转单位四元数 (w, x, y, z)"""
+    m = rotation
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+    if trace > 0:
+        s = 2.0 * np.sqrt(trace + 1.0)
+        q = [0.25 * s, (m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s]
+    elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2])
+        q = [(m[2, 1] - m[1, 2]) / s, 0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s]
+    elif m[1, 1] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2])
+        q = [(m[0, 2] - m[2, 0]) / s, (m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s]
+    else:
+        s = 2.0 * np.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1])
+        q = [(m[1, 0] - m[0, 1]) / s, (m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s]
+    q = np.array(q)
+    return q / np.linalg.norm(q)
+
+
+def _quaternion_to_matrix(q):
+    """单位四元数 (w, x, y, z) 转旋转矩阵"""
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]
+    ])
+
+
+def _slerp(q0, q1, t):
+    """四元数球面线性插值"""
+    dot = float(np.dot(q0, q1))
+    if dot < 0:
+        # 取较短的旋转路径
+        q1 = -q1
+        dot = -dot
+    if dot > 0.9995:
+        q = q0 + t * (q1 - q0)
+        return q / np.linalg.norm(q)
+    theta = np.arccos(dot)
+    return (np.sin((1 - t) * theta) * q0 + np.sin(t * theta) * q1) / np.sin(theta)
+
+
+class ViewState:
+    """相机视图状态（针孔相机内参和外参）"""
+
+    def __init__(self, intrinsic, extrinsic, width, height):
+        """初始化视图状态
+
+        Args:
+            intrinsic (numpy.ndarray): 3x3 内参矩阵
+            extrinsic (numpy.ndarray): 4x4 外参矩阵（世界到相机）
+            width (int): 图像宽度
+            height (int): 图像高度
+        """
+        self.intrinsic = np.array(intrinsic, dtype=np.float64)
+        self.extrinsic = np.array(extrinsic, dtype=np.float64)
+        self.width = int(width)
+        self.height = int(height)
+
+    @classmethod
+    def from_camera_parameters(cls, params):
+        """由open3d.camera.PinholeCameraParameters创建"""
+        return cls(params.intrinsic.intrinsic_matrix, params.extrinsic,
+                   params.intrinsic.width, params.intrinsic.height)
+
+    def apply_to(self, params):
+        """把视图状态写入open3d.camera.PinholeCameraParameters
+
+        Args:
+            params: 从ViewControl取得的相机参数，会被原地修改
+
+        Returns:
+            修改后的相机参数
+        """
+        params.intrinsic.set_intrinsics(
+            self.width, self.height,
+            self.intrinsic[0, 0], self.intrinsic[1, 1],
+            self.intrinsic[0, 2], self.intrinsic[1, 2]
+        )
+        params.extrinsic = self.extrinsic
+        return params
+
+    @property
+    def center(self):
+        """相机中心（世界坐标）"""
+        rotation = self.extrinsic[:3, :3]
+        return -rotation.T @ self.extrinsic[:3, 3]
+
+    def fitted(self, center, radius):
+        """保持朝向和内参，使以center为球心、radius为半径的球恰好位于视野内
+
+        Args:
+            center (array-like): 球心（世界坐标）
+            radius (float): 半径
+
+        Returns:
+            ViewState: 适配后的视图
+        """
+        rotation = self.extrinsic[:3, :3]
+        forward = rotation.T @ np.array([0.0, 0.0, 1.0])  # 相机坐标系中沿+z观察
+        # 取水平和垂直视场中较小的一个
+        tan_half = min(self.width * 0.5 / self.intrinsic[0, 0], self.height * 0.5 / self.intrinsic[1, 1])
+        distance = max(radius, 1e-9) / np.sin(np.arctan(tan_half))
+        camera = np.asarray(center, dtype=np.float64) - forward * distance
+
+        extrinsic = np.eye(4)
+        extrinsic[:3, :3] = rotation
+        extrinsic[:3, 3] = -rotation @ camera
+        return ViewState(self.intrinsic, extrinsic, self.width, self.height)
+
+    def resized(self, width, height):
+        """换算到新的图像尺寸，保持外参和垂直视场，主点位于图像中心
+
+        Args:
+            width (int): 新的图像宽度
+            height (int): 新的图像高度
+
+        Returns:
+            ViewState: 换算后的视图
+        """
+        focal = self.intrinsic[1, 1] * height / self.height
+        intrinsic = np.array([[focal, 0.0, width / 2.0 - 0.5],
+                              [0.0, focal, height / 2.0 - 0.5],
+                              [0.0, 0.0, 1.0]])
+        return ViewState(intrinsic, self.extrinsic, width, height)
+
+    def interpolate(self, other, t):
+        """在两个视图之间插值
+
+        旋转按四元数球面插值，相机中心和内参按线性插值。
+
+        Args:
+            other (ViewState): 目标视图
+            t (float): 插值参数，0为自身，1为目标
+
+        Returns:
+            ViewState: 插值后的视图
+        """
+        q = _slerp(_matrix_to_quaternion(self.extrinsic[:3, :3]),
+                   _matrix_to_quaternion(other.extrinsic[:3, :3]), t)
+        rotation = _quaternion_to_matrix(q)
+        center = (1 - t) * self.center + t * other.center
+
+        extrinsic = np.eye(4)
+        extrinsic[:3, :3] = rotation
+        extrinsic[:3, 3] = -rotation @ center
+        intrinsic = (1 - t) * self.intrinsic + t * other.intrinsic
+        return ViewState(intrinsic, extrinsic, other.width, other.height)
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典"""
+        return {
+            "intrinsic": self.intrinsic.tolist(),
+            "extrinsic": self.extrinsic.tolist(),
+            "width": self.width,
+            "height": self.height
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """由to_dict的结果创建"""
+        return cls(data["intrinsic"], data["extrinsic"], data["width"], data["height"])
+
+
+class ViewAnimator(QObject):
+    """视图过渡动画，按固定帧间隔发出插值后的视图状态"""
+
+    # 信号定义
+    frame = Signal(object)  # 参数: ViewState
+    finished = Signal()
+
+    def __init__(self, fps=60, parent=None):
+        """初始化视图动画
+
+        Args:
+            fps (int): 动画帧率
+            parent (QObject, optional): 父对象
+        """
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / fps)))
+        self._timer.timeout.connect(self._tick)
+        self._start = None
+        self._target = None
+        self._duration = 0.0
+        self._started_at = 0.0
+
+    def start(self, start, target, duration_ms):
+        """开始过渡动画，正在进行的动画会被替换
+
+        Args:
+            start (ViewState): 起始视图
+            target (ViewState): 目标视图
+            duration_ms (int): 动画时长（毫秒），不大于0时直接跳到目标
+        """
+        self._start = start
+        self._target = target
+        self._duration = duration_ms / 1000.0
+        self._started_at = time.perf_counter()
+        if duration_ms <= 0:
+            self._timer.stop()
+            self._finish()
+            return
+        self._timer.start()
+
+    def stop(self):
+        """停止动画，视图停留在当前位置"""
+        self._timer.stop()
+        self._start = None
+        self._target = None
+
+    def is_running(self):
+        """动画是否正在进行"""
+        return self._timer.isActive()
+
+    def _tick(self):
+        """计算当前帧的视图"""
+        t = (time.perf_counter() - self._started_at) / self._duration
+        if t >= 1.0:
+            self._timer.stop()
+            self._finish()
+            return
+        # smoothstep缓动，起止处速度为0
+        eased = t * t * (3 - 2 * t)
+        self.frame.emit(self._start.interpolate(self._target, eased))
+
+    def _finish(self):
+        """发出最终视图并结束"""
+        target = self._target
+        self._start = None
+        self._target = None
+        self.frame.emit(target)
+        self.finished.emit()
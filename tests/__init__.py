@@ -0,0 +1,3 @@
+"""
+单元测试，在项目根目录下以 python -m pytest 运行
+"""
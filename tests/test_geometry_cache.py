@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何缓存测试：通过GeometryIO.load走完整的写入和命中路径
+
+运行:
+    python -m pytest tests/test_geometry_cache.py
+"""
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import open3d as o3d
+except ImportError:
+    o3d = None
+
+if o3d is not None:
+    from renderer.geometry_cache import GeometryCache
+    from renderer.geometry_io import GeometryIO
+
+
+@unittest.skipIf(o3d is None, "需要open3d")
+class GeometryCacheTest(unittest.TestCase):
+    """GeometryIO在几何缓存命中、损坏时的行为"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+        rng = np.random.default_rng(0)
+
+        # 无颜色点云，加载时按高度着色
+        self.pcd_path = os.path.join(self.work_dir, "model.pcd")
+        o3d.io.write_point_cloud(self.pcd_path, o3d.geometry.PointCloud(
+            o3d.utility.Vector3dVector(rng.random((2000, 3)))))
+        self.mesh_path = os.path.join(self.work_dir, "model.ply")
+        o3d.io.write_triangle_mesh(self.mesh_path, o3d.geometry.TriangleMesh.create_sphere(resolution=10))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def _io(self):
+        io = GeometryIO(use_cache=False)
+        io.geometry_cache = GeometryCache(self.cache_dir)
+        return io
+
+    def test_point_cloud_warm_hit(self):
+        io = self._io()
+        cold, model_type, _ = io.load(self.pcd_path)
+        warm, warm_type, message = io.load(self.pcd_path)
+
+        self.assertEqual((model_type, warm_type), ('pcd', 'pcd'))
+        self.assertIn("缓存", message)
+        self.assertEqual(io.get_cache_stats()["hits"], 1)
+        np.testing.assert_array_equal(np.asarray(warm.points), np.asarray(cold.points))
+        np.testing.assert_array_equal(np.asarray(warm.colors), np.asarray(cold.colors))
+
+        # 命中得到的几何体可以编辑，且编辑不会写回缓存
+        np.asarray(warm.colors)[:] = 0.0
+        again, _, _ = io.load(self.pcd_path)
+        np.testing.assert_array_equal(np.asarray(again.colors), np.asarray(cold.colors))
+
+    def test_mesh_warm_hit(self):
+        io = self._io()
+        cold, _, _ = io.load(self.mesh_path)
+        warm, model_type, message = io.load(self.mesh_path)
+
+        self.assertEqual(model_type, 'mesh')
+        self.assertIn("缓存", message)
+        np.testing.assert_array_equal(np.asarray(warm.vertices), np.asarray(cold.vertices))
+        np.testing.assert_array_equal(np.asarray(warm.triangles), np.asarray(cold.triangles))
+        np.testing.assert_array_equal(np.asarray(warm.triangle_normals), np.asarray(cold.triangle_normals))
+
+    def test_corrupt_entry_falls_back_to_parse(self):
+        io = self._io()
+        cold, _, _ = io.load(self.pcd_path)
+        for path in glob.glob(os.path.join(self.cache_dir, "*.points.npy")):
+            with open(path, "wb") as f:
+                f.write(b"not a npy file")
+
+        geometry, model_type, message = io.load(self.pcd_path)
+        self.assertEqual(model_type, 'pcd')
+        self.assertNotIn("缓存", message)
+        np.testing.assert_array_equal(np.asarray(geometry.points), np.asarray(cold.points))
+
+        # 损坏的条目被删除，重新解析后写入的新条目可以命中
+        _, _, message = io.load(self.pcd_path)
+        self.assertIn("缓存", message)
+
+    def test_incompatible_entry_falls_back_to_parse(self):
+        io = self._io()
+        io.load(self.pcd_path)
+        # 形状不符合Vector3dVector要求的数组
+        for path in glob.glob(os.path.join(self.cache_dir, "*.points.npy")):
+            np.save(path, np.zeros((10, 2)))
+
+        geometry, _, message = io.load(self.pcd_path)
+        self.assertNotIn("缓存", message)
+        self.assertEqual(len(geometry.points), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
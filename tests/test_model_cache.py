@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模型缓存测试：临时文件路径和同一模型的并发获取
+
+运行:
+    python -m pytest tests/test_model_cache.py
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.model_cache import ModelCache
+
+
+class ModelCacheTest(unittest.TestCase):
+    """ModelCache的临时路径与下载互斥"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.cache = ModelCache(os.path.join(self.work_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_partial_path_stays_in_cache_directory(self):
+        partial_dir = os.path.realpath(self.cache.partial_dir)
+        for model_id in ("../../escape", "a/b/c", "/etc/passwd", "..", "模型 1", 42):
+            path = os.path.realpath(self.cache.partial_path(model_id))
+            self.assertEqual(os.path.dirname(path), partial_dir)
+
+    def test_partial_path_is_stable_per_id(self):
+        # 中断的下载需要在下次获取时找到同一个文件续传
+        self.assertEqual(self.cache.partial_path("m1"), self.cache.partial_path("m1"))
+        self.assertNotEqual(self.cache.partial_path("m1"), self.cache.partial_path("m2"))
+
+    def test_fetching_same_id_is_serialized(self):
+        active = []
+        overlaps = []
+
+        def fetch(model_id):
+            with self.cache.fetching(model_id) as partial_path:
+                overlaps.append(partial_path in active)
+                active.append(partial_path)
+                time.sleep(0.05)
+                active.remove(partial_path)
+
+        threads = [threading.Thread(target=fetch, args=("m1",)) for _ in range(4)]
+        threads.append(threading.Thread(target=fetch, args=("m2",)))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [False] * 5)
+        # 不同模型的获取不互相等待
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(self.cache._fetch_locks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
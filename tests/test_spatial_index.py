@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+体素哈希空间索引测试，结果与暴力搜索对比
+
+运行:
+    python -m pytest tests/test_spatial_index.py
+"""
+
+import unittest
+
+import numpy as np
+
+from renderer.spatial_index import VoxelHashIndex
+
+
+def _brute_force_pick(points, origin, direction, tolerance, tolerance_per_depth):
+    """逐点计算的射线拾取，作为参考结果"""
+    direction = direction / np.linalg.norm(direction)
+    offsets = points - origin
+    depth = offsets @ direction
+    perpendicular = np.linalg.norm(offsets - depth[:, None] * direction, axis=1)
+    hit = np.flatnonzero((depth > 0) & (perpendicular <= tolerance + tolerance_per_depth * depth))
+    if len(hit) == 0:
+        return None
+    return hit[np.argmin(depth[hit])]
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """射线拾取和半径查询"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # 稠密的团块加上稀疏的背景点，体素大小由平均密度决定，团块处每个体素点数远多于平均
+        clusters = rng.normal(scale=0.05, size=(40, 2000, 3)) + rng.uniform(-1, 1, size=(40, 1, 3))
+        self.points = np.concatenate([clusters.reshape(-1, 3), rng.uniform(-1, 1, size=(20000, 3))])
+        self.index = VoxelHashIndex(self.points)
+        self.rng = rng
+
+    def _random_rays(self, count, distance):
+        """从距离中心distance处指向模型内随机点的射线"""
+        origins = self.rng.normal(size=(count, 3))
+        origins *= distance / np.linalg.norm(origins, axis=1, keepdims=True)
+        targets = self.points[self.rng.integers(0, len(self.points), count)]
+        targets += self.rng.normal(scale=0.01, size=targets.shape)
+        return origins, targets - origins
+
+    def _assert_matches_brute_force(self, tolerance, tolerance_per_depth, distance, count=100):
+        origins, directions = self._random_rays(count, distance)
+        for origin, direction in zip(origins, directions):
+            expected = _brute_force_pick(self.points, origin, direction, tolerance, tolerance_per_depth)
+            result = self.index.ray_pick(origin, direction, tolerance, tolerance_per_depth)
+            if expected is None:
+                self.assertIsNone(result)
+                continue
+            self.assertIsNotNone(result)
+            unit = direction / np.linalg.norm(direction)
+            # 同深度的点可能不止一个，比较深度而不是索引
+            self.assertAlmostEqual((self.points[result[0]] - origin) @ unit,
+                                   (self.points[expected] - origin) @ unit, places=12)
+
+    def test_ray_pick_tolerance_below_voxel(self):
+        self._assert_matches_brute_force(0.0, 0.1 * self.index.voxel_size / 3.0, distance=3.0)
+
+    def test_ray_pick_tolerance_above_voxel(self):
+        # 拾取半径对应的宽度在模型处超过体素大小
+        self._assert_matches_brute_force(0.0, 3.0 * self.index.voxel_size / 3.0, distance=3.0)
+
+    def test_ray_pick_constant_tolerance(self):
+        self._assert_matches_brute_force(2.5 * self.index.voxel_size, 0.0, distance=3.0)
+
+    def test_ray_pick_from_inside(self):
+        self._assert_matches_brute_force(0.0, 2.0 * self.index.voxel_size, distance=0.2)
+
+    def test_query_radius(self):
+        for center in self.points[self.rng.integers(0, len(self.points), 20)]:
+            radius = 3.0 * self.index.voxel_size
+            expected = np.flatnonzero(np.sum((self.points - center) ** 2, axis=1) <= radius * radius)
+            np.testing.assert_array_equal(np.sort(self.index.query_radius(center, radius)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分块传输测试，使用本地 http.server 作为后端替身
+
+运行:
+    python -m pytest tests/test_transfer.py
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils.transfer import CHECKSUM_HEADER, ChunkedTransfer, TransferError
+
+
+class _Backend:
+    """替身服务器的状态，测试用例通过修改这些属性控制服务器行为"""
+
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"v1"'
+        self.checksum = hashlib.sha256(content).hexdigest()
+        self.drop_after = None  # 第一次完整响应只发送这么多字节后断开连接
+        self.partial_drops = 0  # 前几次206响应也只发送drop_after字节后断开
+        self.ignore_range = False  # 忽略Range，总是返回200和完整内容
+        self.requests = []  # (方法, 路径, 请求头)
+        self.uploaded = bytearray()
+        self.put_failures = 0  # 前几次PUT返回503
+        self.puts = 0
+
+
+def _make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            backend.requests.append(("GET", self.path, dict(self.headers)))
+            if self.path.startswith("/uploads/"):
+                self._send(200, json.dumps({"received": len(backend.uploaded)}).encode(),
+                           {"Content-Type": "application/json"})
+                return
+
+            content = backend.content
+            headers = {"ETag": backend.etag}
+            if backend.checksum:
+                headers[CHECKSUM_HEADER] = backend.checksum
+            range_header = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if range_header and not backend.ignore_range and (if_range is None or if_range == backend.etag):
+                start = int(range_header.split("=")[1].rstrip("-"))
+                if start >= len(content):
+                    self._send(416, headers={"Content-Range": f"bytes */{len(content)}"})
+                    return
+                headers["Content-Range"] = f"bytes {start}-{len(content) - 1}/{len(content)}"
+                if backend.partial_drops > 0:
+                    backend.partial_drops -= 1
+                    self._send_truncated(206, content[start:], backend.drop_after, headers)
+                    return
+                self._send(206, content[start:], headers)
+                return
+
+            if backend.drop_after is not None:
+                drop_after = backend.drop_after
+                if not backend.partial_drops:
+                    backend.drop_after = None
+                self._send_truncated(200, content, drop_after, headers)
+                return
+            self._send(200, content, headers)
+
+        def _send_truncated(self, status, body, limit, headers):
+            # 声明完整长度，只发送一部分后断开，模拟传输中途掉线
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:limit])
+            self.wfile.flush()
+            self.close_connection = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            backend.requests.append(("POST", self.path, dict(self.headers)))
+            self._send(201, json.dumps({"upload_id": "u1", "received": 0}).encode(),
+                       {"Content-Type": "application/json"})
+
+        def do_PUT(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            backend.requests.append(("PUT", self.path, dict(self.headers)))
+            backend.puts += 1
+            if backend.puts <= backend.put_failures:
+                self._send(503)
+                return
+            start = int(self.headers["Content-Range"].split()[1].split("-")[0])
+            if start != len(backend.uploaded):
+                self._send(409)
+                return
+            backend.uploaded.extend(body)
+            self._send(204)
+
+    return Handler
+
+
+class TransferTest(unittest.TestCase):
+    """ChunkedTransfer的下载续传、校验和上传重试"""
+
+    def setUp(self):
+        self.content = os.urandom(256 * 1024 + 123)
+        self.backend = _Backend(self.content)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self.backend))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.work_dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.work_dir, "model.pcd")
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.work_dir)
+
+    def _transfer(self, **kwargs):
+        kwargs.setdefault("chunk_size", 16 * 1024)
+        return ChunkedTransfer(self.session, timeout=5, retry_delay=0, **kwargs)
+
+    def _gets(self):
+        return [headers for method, path, headers in self.backend.requests if method == "GET"]
+
+    def test_download_resumes_after_disconnect(self):
+        self.backend.drop_after = 100 * 1024
+        self._transfer().download(f"{self.base_url}/model", self.dest)
+
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        gets = self._gets()
+        self.assertEqual(len(gets), 2)
+        # 第二次请求从已写入的位置续传（断开时未读完的块被丢弃），并用ETag防止拼接不同版本
+        offset = int(gets[1]["Range"].split("=")[1].rstrip("-"))
+        self.assertTrue(0 < offset <= 100 * 1024)
+        self.assertEqual(gets[1]["If-Range"], self.backend.etag)
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+        self.assertFalse(os.path.exists(self.dest + ".part.json"))
+
+    def test_download_retry_count_resets_after_progress(self):
+        # 每次都有进展的断开次数多于max_retries，下载仍应完成
+        self.backend.drop_after = 40 * 1024
+        self.backend.partial_drops = 4
+        self._transfer(max_retries=1).download(f"{self.base_url}/model", self.dest)
+
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(len(self._gets()), 6)
+
+    def test_download_restarts_when_server_ignores_range(self):
+        self.backend.drop_after = 100 * 1024
+        self.backend.ignore_range = True
+        self._transfer().download(f"{self.base_url}/model", self.dest)
+
+        # 服务器返回200时不能把完整内容追加到残留的部分文件后面
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertIn("Range", self._gets()[1])
+
+    def test_download_rejects_checksum_mismatch(self):
+        self.backend.checksum = "0" * 64
+        with self.assertRaises(TransferError):
+            self._transfer().download(f"{self.base_url}/model", self.dest)
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_download_restarts_on_416_with_different_size(self):
+        # 残留的部分文件比服务器上（已变化的）文件还长
+        with open(self.dest + ".part", "wb") as f:
+            f.write(os.urandom(len(self.content) + 10))
+        with open(self.dest + ".part.json", "w", encoding="utf-8") as f:
+            json.dump({"validator": self.backend.etag}, f)
+        self.backend.checksum = None
+
+        self._transfer().download(f"{self.base_url}/model", self.dest)
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertNotIn("Range", self._gets()[1])
+
+    def test_download_accepts_416_when_already_complete(self):
+        with open(self.dest + ".part", "wb") as f:
+            f.write(self.content)
+        with open(self.dest + ".part.json", "w", encoding="utf-8") as f:
+            json.dump({"validator": self.backend.etag}, f)
+
+        self._transfer().download(f"{self.base_url}/model", self.dest)
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(len(self._gets()), 1)
+
+    def test_upload_retries_after_server_error(self):
+        source = os.path.join(self.work_dir, "upload.pcd")
+        with open(source, "wb") as f:
+            f.write(self.content)
+        self.backend.put_failures = 2
+        progress = []
+
+        upload_id = self._transfer(max_retries=3, progress=lambda done, total: progress.append(done)).upload(
+            self.base_url, source)
+
+        self.assertEqual(upload_id, "u1")
+        self.assertEqual(bytes(self.backend.uploaded), self.content)
+        # 503之后先查询已接收的字节数再重发
+        methods = [method for method, _, _ in self.backend.requests]
+        self.assertEqual(methods[:3], ["POST", "PUT", "GET"])
+        self.assertEqual(progress[-1], len(self.content))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缩略图批量渲染入口，为模型库中的每个模型渲染若干环绕视图PNG
+
+每个工作进程只创建一个隐藏窗口并在所有模型之间复用，多个进程并行渲染。
+所有视图图像都比输入文件新时跳过该模型。
+
+用法:
+    python thumbnails.py models/ -o previews/ --views 8 --size 256 -j 4
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch import collect_inputs
+
+
+# 工作进程内的全局对象，由_init_worker创建
+_worker = {}
+
+
+def _init_worker(size, use_cache):
+    """工作进程初始化，创建读写器和复用的缩略图渲染器"""
+    from utils.config_manager import ConfigManager
+    from renderer.geometry_io import GeometryIO
+    from renderer.thumbnails import ThumbnailRenderer
+
+    config = ConfigManager()
+    config.load_config()
+    renderer = ThumbnailRenderer(config, width=size, height=size)
+    atexit.register(renderer.close)
+    _worker.update(io=GeometryIO(config, use_cache=use_cache), renderer=renderer)
+
+
+def render_file(input_path, output_prefix, views, elevation):
+    """渲染单个模型，在工作进程中执行
+
+    Args:
+        input_path (str): 输入文件
+        output_prefix (str): 输出路径前缀
+        views (int): 视图数量
+        elevation (float): 仰角（度）
+
+    Returns:
+        dict: 渲染结果
+    """
+    start = time.perf_counter()
+    result = {"input": input_path, "ok": False, "images": 0, "message": ""}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            geometry, _, message = _worker["io"].load(input_path)
+        if geometry is None:
+            result["message"] = message
+            return result
+        load_time = time.perf_counter() - start
+        paths = _worker["renderer"].render(geometry, output_prefix, views, elevation)
+        result.update(ok=True, images=len(paths), load_seconds=load_time)
+        return result
+    except Exception as e:
+        result["message"] = str(e)
+        return result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def _up_to_date(input_path, output_prefix, views):
+    """所有视图图像都存在且比输入文件新"""
+    input_mtime = os.path.getmtime(input_path)
+    for i in range(views):
+        path = f"{output_prefix}_{i:02d}.png"
+        if not os.path.exists(path) or os.path.getmtime(path) < input_mtime:
+            return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hair Ezclick 缩略图批量渲染")
+    parser.add_argument("inputs", nargs="+", help="输入目录、文件或glob模式")
+    parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    parser.add_argument("--views", type=int, default=8, help="每个模型的视图数量")
+    parser.add_argument("--elevation", type=float, default=20.0, help="环绕视图的仰角（度）")
+    parser.add_argument("--size", type=int, default=256, help="图像边长（像素）")
+    parser.add_argument("-j", "--jobs", type=int, default=min(4, os.cpu_count() or 1), help="并行进程数")
+    parser.add_argument("--force", action="store_true", help="重新渲染已是最新的模型")
+    parser.add_argument("--use-cache", action="store_true", help="读取时使用几何缓存")
+    args = parser.parse_args(argv)
+
+    tasks = []
+    skipped = 0
+    for input_path, relative in collect_inputs(args.inputs):
+        output_prefix = os.path.join(args.output_dir, os.path.splitext(relative)[0])
+        if not args.force and _up_to_date(input_path, output_prefix, args.views):
+            skipped += 1
+            continue
+        tasks.append((input_path, output_prefix))
+
+    print(f"共 {len(tasks) + skipped} 个模型，{skipped} 个已是最新，待渲染 {len(tasks)} 个，"
+          f"每个 {args.views} 个视图，进程数 {args.jobs}")
+    if not tasks:
+        return 0
+
+    start = time.perf_counter()
+    images = failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                             initargs=(args.size, args.use_cache)) as executor:
+        futures = [
+            executor.submit(render_file, input_path, output_prefix, args.views, args.elevation)
+            for input_path, output_prefix in tasks
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result["ok"]:
+                images += result["images"]
+                print(f"[完成] {result['input']}  {result['images']} 张  "
+                      f"读取 {result['load_seconds']:.2f} s  总计 {result['seconds']:.2f} s")
+            else:
+                failed += 1
+                print(f"[失败] {result['input']}  {result['message']}")
+
+    elapsed = time.perf_counter() - start
+    print(f"渲染 {images} 张图像，失败 {failed} 个模型，跳过 {skipped} 个，总耗时 {elapsed:.2f} s")
+    if images:
+        print(f"吞吐量: {images / elapsed:.2f} 张/秒")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,7 +29,21 @@ class ConfigManager:
                 "width": 800,
                 "height": 600,
                 "background_color": [1, 1, 1],  # 白色背景
-                "point_size": 2.0
+                "point_size": 2.0,
+                "colormap": "rainbow",  # 无颜色点云的高度颜色映射
+                "color_axis": 2,  # 颜色映射依据的坐标轴，0/1/2对应X/Y/Z
+                "max_fps": 30,  # 最大帧率，场景无变化时不渲染
+                "lod_enabled": True,  # 是否为大点云构建LOD金字塔
+                "lod_min_points": 1000000,  # 点数超过该值才构建LOD
+                "lod_interactive_points": 300000,  # 拖动视图时显示的最大点数
+                "lod_idle_ms": 300,  # 停止拖动多久后恢复全分辨率
+                "pick_radius_px": 5,  # 点击拾取的命中半径（像素）
+                "view_transition_ms": 300,  # 重置视图/跳转书签的过渡动画时长，0表示立即跳转
+                "annotation_color": [1, 0, 0],  # 点击标注的默认颜色
+                "annotation_size": 0.003,  # 点击标注的默认大小（相对模型包围盒对角线）
+                "zoom_speed": 1.0,  # 每个滚轮刻度的缩放步数
+                "follow_widget_size": True,  # 渲染分辨率跟随显示控件的物理像素尺寸（width/height只作为初始值）
+                "interactive_scale": 0.5  # 拖动视图时输出帧的分辨率比例，1表示不降低
             },
             "view": {
                 "zoom": 0.8,
@@ -43,12 +57,49 @@ class ConfigManager:
             },
             "backend": {
                 "url": "http://localhost:5000/api",
-                "timeout": 30
+                "timeout": 30,
+                "chunk_size_kb": 1024,  # 分块上传/下载的块大小
+                "max_retries": 3,  # 每个块或每次续传的最大重试次数
+                "max_concurrent_requests": 4  # 同时进行的后台请求数上限
+            },
+            "cache": {
+                "model_cache_mb": 2048,  # 后端模型本地缓存（paths.temp/model_cache）的容量上限
+                "geometry_cache_enabled": True,  # 缓存解析后的几何数组，再次打开文件时跳过解析
+                "geometry_cache_mb": 2048  # 几何缓存（paths.temp/geometry_cache）的容量上限
             },
             "editor": {
                 "brush_size": 10,
                 "default_density": "中",
-                "default_align": "选项1"
+                "default_align": "选项1",
+                "density_targets": {"低": 0.1, "中": 0.25, "高": 0.5},  # 密度级别对应的目标点数比例（相对加载时点数）
+                "density_tolerance": 0.05  # 目标点数的允许相对误差
+            },
+            "history": {
+                "memory_budget_mb": 512,  # 撤销/重做历史的内存预算
+                "keyframe_interval": 8,  # 两个完整关键帧之间最多的增量记录数
+                "spill_to_disk": False  # 超出预算时把旧记录写入paths.temp而不是丢弃
+            },
+            "pipeline": {
+                "workers": 0,  # 处理流水线的进程数，0表示使用CPU核数
+                "tile_points": 500000,  # 分块并行时每块的目标点数
+                "min_parallel_points": 1000000  # 点数不少于该值时才分块并行
+            },
+            "out_of_core": {
+                "enabled": True,  # 大型二进制PCD/PLY是否以分块模式打开
+                "min_file_mb": 2048,  # 文件不小于该大小时使用分块模式
+                "resident_budget_mb": 1024,  # 已读入分块数据的内存预算
+                "point_budget": 3000000,  # 最多显示的点数
+                "tile_points": 262144,  # 八叉树叶节点的目标点数
+                "cache_mb": 20480,  # 转换结果（paths.temp/out_of_core）的容量上限
+                "refresh_ms": 200  # 相机停止多久后按新视图重新选择分块
+            },
+            "tracing": {
+                "enabled": False,  # 启动时是否记录跟踪区间（也可设置环境变量HAIR_EZCLICK_TRACE）
+                "buffer_size": 100000  # 环形缓冲区保留的最近事件数
+            },
+            "performance_panel": {
+                "enabled": False,  # 启动时是否在属性面板中显示性能面板
+                "refresh_ms": 1000  # 性能面板的刷新间隔
             }
         }
     
@@ -6,18 +6,33 @@
 """
 
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from PySide6.QtCore import QObject, Signal
 
+from utils.model_cache import ModelCache
+from utils.transfer import ChunkedTransfer, TransferError, UploadNotSupported
+from utils import tracing
+
 
 class DataInterface(QObject):
-    """数据接口类，处理与后端服务的通信"""
+    """数据接口类，处理与后端服务的通信
+    
+    每个请求方法都有同步版本和以 _async 结尾的异步版本。异步版本在线程池中
+    执行同步版本并立即返回请求ID，结果仍通过原有信号报告（信号以队列方式
+    投递到GUI线程）。被取消的请求不再发出任何结果信号。
+    """
     
     # 信号定义
     data_received = Signal(dict)
     model_received = Signal(str)  # 接收到模型后发出的信号，参数为临时文件路径
     connection_error = Signal(str)
     processing_complete = Signal(dict)
+    transfer_progress = Signal(str, object, object)  # 传输进度，参数: 'upload'或'download', 已传输字节, 总字节（object避免超过2 GiB时32位int溢出）
+    connection_checked = Signal(bool, str)  # 异步连接测试结果，参数: 是否成功, 信息
+    requests_in_flight_changed = Signal(int)  # 进行中的异步请求数变化
     
     def __init__(self, config=None):
         """初始化数据接口"""
@@ -25,12 +40,181 @@ class DataInterface(QObject):
         self.config = config
         self.base_url = config.get_value("backend", "url", "http://localhost:5000/api") if config else "http://localhost:5000/api"
         self.timeout = config.get_value("backend", "timeout", 30) if config else 30
+        self.chunk_size = (config.get_value("backend", "chunk_size_kb", 1024) if config else 1024) * 1024
+        self.max_retries = config.get_value("backend", "max_retries", 3) if config else 3
+        self.max_concurrent = config.get_value("backend", "max_concurrent_requests", 4) if config else 4
         self.session = requests.Session()
+        
+        # 本地模型缓存，位于 paths.temp/model_cache
+        temp_dir = config.get_value("paths", "temp", "temp/") if config else "temp/"
+        cache_mb = config.get_value("cache", "model_cache_mb", 2048) if config else 2048
+        self.model_cache = ModelCache(
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), temp_dir, "model_cache"),
+            max_bytes=cache_mb * 1024 * 1024
+        )
+        
+        # 异步请求线程池，限制同时进行的请求数
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="DataInterface")
+        self._local = threading.local()  # 工作线程各自的会话和取消标记
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._pending = {}  # 请求ID -> (Future, 取消标记)
+    
+    def _session(self):
+        """获取当前线程使用的HTTP会话，requests.Session不能跨线程共享"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+    
+    def _cancel_event(self):
+        """获取当前线程正在执行的请求的取消标记"""
+        return getattr(self._local, "cancel_event", None)
+    
+    def _emit(self, signal, *args):
+        """发出结果信号，请求已被取消时不发出"""
+        cancel_event = self._cancel_event()
+        if cancel_event is None or not cancel_event.is_set():
+            signal.emit(*args)
+    
+    def _submit(self, func, *args):
+        """在线程池中执行请求
+        
+        Args:
+            func (callable): 同步请求方法
+            *args: 请求参数
+            
+        Returns:
+            int: 请求ID，可用于cancel()
+        """
+        cancel_event = threading.Event()
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+        
+        def run():
+            self._local.cancel_event = cancel_event
+            try:
+                return func(*args)
+            finally:
+                self._local.cancel_event = None
+                self._finish(request_id)
+        
+        with self._lock:
+            future = self.executor.submit(run)
+            self._pending[request_id] = (future, cancel_event)
+            count = len(self._pending)
+        self.requests_in_flight_changed.emit(count)
+        return request_id
+    
+    def _finish(self, request_id):
+        """请求结束后移除记录"""
+        with self._lock:
+            if self._pending.pop(request_id, None) is None:
+                return
+            count = len(self._pending)
+        self.requests_in_flight_changed.emit(count)
+    
+    def requests_in_flight(self):
+        """获取进行中（含排队）的异步请求数
+        
+        Returns:
+            int: 请求数
+        """
+        with self._lock:
+            return len(self._pending)
+    
+    def cancel(self, request_id):
+        """取消异步请求
+        
+        排队中的请求不会执行；正在执行的请求在下一个数据块处中止，
+        无法中止的单次HTTP请求完成后丢弃结果。
+        
+        Args:
+            request_id (int): 请求ID
+        """
+        with self._lock:
+            entry = self._pending.get(request_id)
+        if entry is None:
+            return
+        future, cancel_event = entry
+        cancel_event.set()
+        if future.cancel():
+            self._finish(request_id)
+    
+    def cancel_all(self):
+        """取消所有异步请求"""
+        with self._lock:
+            request_ids = list(self._pending)
+        for request_id in request_ids:
+            self.cancel(request_id)
     
+    def shutdown(self):
+        """取消所有请求并关闭线程池"""
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
+    
+    def connect_to_backend_async(self):
+        """异步测试与后端的连接，结果通过connection_checked信号报告
+        
+        Returns:
+            int: 请求ID
+        """
+        def check():
+            success, message = self.connect_to_backend()
+            self._emit(self.connection_checked, success, message)
+        return self._submit(check)
+    
+    def send_model_to_backend_async(self, file_path, params=None):
+        """异步发送模型，结果通过processing_complete或connection_error信号报告
+        
+        Returns:
+            int: 请求ID
+        """
+        return self._submit(self.send_model_to_backend, file_path, params)
+    
+    def get_model_from_backend_async(self, model_id):
+        """异步获取模型，结果通过model_received或connection_error信号报告
+        
+        Returns:
+            int: 请求ID
+        """
+        return self._submit(self.get_model_from_backend, model_id)
+    
+    def send_edit_request_async(self, model_id, edit_data):
+        """异步发送编辑请求，结果通过data_received或connection_error信号报告
+        
+        Returns:
+            int: 请求ID
+        """
+        return self._submit(self.send_edit_request, model_id, edit_data)
+    
+    def _create_transfer(self, direction):
+        """创建分块传输器，进度通过transfer_progress信号报告
+        
+        Args:
+            direction (str): 'upload'或'download'
+            
+        Returns:
+            ChunkedTransfer: 分块传输器
+        """
+        return ChunkedTransfer(
+            self._session(),
+            timeout=self.timeout,
+            chunk_size=self.chunk_size,
+            max_retries=self.max_retries,
+            progress=lambda done, total: self._emit(self.transfer_progress, direction, done, total),
+            cancel_event=self._cancel_event()
+        )
+    
+    @tracing.traced("backend.connect", "network")
     def connect_to_backend(self):
         """测试与后端的连接"""
         try:
-            response = self.session.get(f"{self.base_url}/status", timeout=self.timeout)
+            response = self._session().get(f"{self.base_url}/status", timeout=self.timeout)
             if response.status_code == 200:
                 return True, "连接成功"
             else:
@@ -38,6 +222,7 @@ class DataInterface(QObject):
         except requests.RequestException as e:
             return False, f"连接错误: {str(e)}"
     
+    @tracing.traced("backend.send_model", "network")
     def send_model_to_backend(self, file_path, params=None):
         """
         将模型文件发送到后端进行处理
@@ -53,25 +238,32 @@ class DataInterface(QObject):
         try:
             url = f"{self.base_url}/process_model"
             
-            with open(file_path, 'rb') as f:
-                files = {'model': f}
-                
-                data = {}
-                if params:
-                    data = params
-                
-                response = self.session.post(url, files=files, data=data, timeout=self.timeout)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    self.processing_complete.emit(result)
-                    return True, "处理成功"
-                else:
-                    return False, f"处理失败: HTTP {response.status_code}"
+            data = {}
+            if params:
+                data = dict(params)
+            
+            try:
+                # 分块上传，失败的块单独重试，然后按上传ID请求处理
+                data['upload_id'] = self._create_transfer('upload').upload(self.base_url, file_path)
+                response = self._session().post(url, data=data, timeout=self.timeout)
+            except UploadNotSupported:
+                # 后端不支持分块上传，退回整文件上传
+                data.pop('upload_id', None)
+                with open(file_path, 'rb') as f:
+                    files = {'model': f}
+                    response = self._session().post(url, files=files, data=data, timeout=self.timeout)
+            
+            if response.status_code == 200:
+                result = response.json()
+                self._emit(self.processing_complete, result)
+                return True, "处理成功"
+            else:
+                return False, f"处理失败: HTTP {response.status_code}"
         except Exception as e:
-            self.connection_error.emit(str(e))
+            self._emit(self.connection_error, str(e))
             return False, f"发送错误: {str(e)}"
     
+    @tracing.traced("backend.get_model", "network")
     def get_model_from_backend(self, model_id):
         """
         从后端获取处理后的模型
@@ -81,35 +273,51 @@ class DataInterface(QObject):
             
         Returns:
             bool: 是否成功
-            str: 成功则返回临时文件路径，失败则返回错误信息
+            str: 成功则返回缓存文件路径，失败则返回错误信息
         """
-        import tempfile
-        import os
-        
         try:
             url = f"{self.base_url}/get_model/{model_id}"
-            response = self.session.get(url, timeout=self.timeout, stream=True)
             
-            if response.status_code == 200:
-                # 创建临时文件保存模型
-                temp_dir = tempfile.gettempdir()
-                file_path = os.path.join(temp_dir, f"temp_model_{model_id}.pcd")
+            # 下载到缓存的临时目录，中断后再次获取会从已下载部分续传；
+            # 同一模型的并发获取依次进行，后一个通常直接命中前一个存入的条目
+            with self.model_cache.fetching(model_id) as partial_path:
+                # 已缓存时带上ETag发送条件请求，模型未变化则直接使用本地文件
+                headers = {}
+                cached = self.model_cache.lookup(model_id)
+                if cached is not None and cached[0]:
+                    headers['If-None-Match'] = cached[0]
                 
-                with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                response_headers = self._create_transfer('download').download(url, partial_path, headers=headers)
                 
-                self.model_received.emit(file_path)
-                return True, file_path
-            else:
-                error_msg = f"获取模型失败: HTTP {response.status_code}"
-                self.connection_error.emit(error_msg)
-                return False, error_msg
+                file_path = None
+                if response_headers is None:
+                    file_path = self.model_cache.record_hit(model_id)
+                if file_path is None:
+                    if response_headers is None:
+                        # 缓存条目在请求期间被淘汰，重新完整下载
+                        response_headers = self._create_transfer('download').download(url, partial_path)
+                    file_path = self.model_cache.store(model_id, response_headers.get('ETag'), partial_path)
+            
+            self._emit(self.model_received, file_path)
+            return True, file_path
+        except TransferError as e:
+            error_msg = f"获取模型失败: {str(e)}"
+            self._emit(self.connection_error, error_msg)
+            return False, error_msg
         except Exception as e:
             error_msg = f"获取模型错误: {str(e)}"
-            self.connection_error.emit(error_msg)
+            self._emit(self.connection_error, error_msg)
             return False, error_msg
     
+    def get_cache_stats(self):
+        """获取模型缓存统计
+        
+        Returns:
+            dict: 命中/未命中次数、流量和容量信息
+        """
+        return self.model_cache.get_stats()
+    
+    @tracing.traced("backend.send_edit", "network")
     def send_edit_request(self, model_id, edit_data):
         """
         发送编辑请求到后端
@@ -126,7 +334,7 @@ class DataInterface(QObject):
             url = f"{self.base_url}/edit_model/{model_id}"
             headers = {'Content-Type': 'application/json'}
             
-            response = self.session.post(
+            response = self._session().post(
                 url, 
                 data=json.dumps(edit_data), 
                 headers=headers, 
@@ -135,13 +343,13 @@ class DataInterface(QObject):
             
             if response.status_code == 200:
                 result = response.json()
-                self.data_received.emit(result)
+                self._emit(self.data_received, result)
                 return True, "编辑请求已发送"
             else:
                 error_msg = f"编辑请求失败: HTTP {response.status_code}"
-                self.connection_error.emit(error_msg)
+                self._emit(self.connection_error, error_msg)
                 return False, error_msg
         except Exception as e:
             error_msg = f"发送编辑请求错误: {str(e)}"
-            self.connection_error.emit(error_msg)
+            self._emit(self.connection_error, error_msg)
             return False, error_msg
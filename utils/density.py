@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点云密度模块，根据目标点数自动选择体素降采样的体素大小
+
+体素大小不再使用固定的绝对值，而是:
+    1. 由抽样最近邻间距估计点间距，按表面点云的面积关系给出初值
+    2. 按与Open3D voxel_down_sample相同的体素划分统计非空体素数（即降采样后的点数）
+    3. 在对数空间中二分，直到点数落在目标的容差范围内
+已知若干体素大小的降采样点数时（如LOD金字塔各层），直接用它们确定二分区间。
+因此模型单位是毫米还是米都不影响结果。
+"""
+
+import numpy as np
+import open3d as o3d
+
+
+def estimate_spacing(points, samples=100000, seed=0):
+    """估计点云的平均最近邻间距
+
+    在随机抽取的子集上计算最近邻距离，再按表面点云的密度关系
+    (间距与点数的平方根成反比) 换算回完整点云。
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        samples (int): 抽样点数
+        seed (int): 随机种子
+
+    Returns:
+        float: 平均最近邻间距，无法估计时为0
+    """
+    n = len(points)
+    if n < 2:
+        return 0.0
+    m = min(samples, n)
+    if m < n:
+        rng = np.random.default_rng(seed)
+        subset = points[rng.choice(n, m, replace=False)]
+    else:
+        subset = points
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(np.ascontiguousarray(subset)))
+    distances = np.asarray(pcd.compute_nearest_neighbor_distance())
+    distances = distances[distances > 0]
+    if len(distances) == 0:
+        return 0.0
+    return float(np.median(distances)) * np.sqrt(m / n)
+
+
+def count_voxels(points, voxel_size):
+    """统计非空体素数，与voxel_down_sample的输出点数一致
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        voxel_size (float): 体素大小
+
+    Returns:
+        int: 非空体素数
+    """
+    if len(points) == 0:
+        return 0
+    # 与Open3D相同: 体素网格从 最小边界 - 半个体素 开始
+    origin = points.min(axis=0) - voxel_size * 0.5
+    cells = np.floor((points - origin) / voxel_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = cells[:, 0] + dims[0] * (cells[:, 1] + dims[1] * cells[:, 2])
+    keys.sort()
+    return int(1 + np.count_nonzero(keys[1:] != keys[:-1]))
+
+
+def initial_voxel_size(points, target_count, spacing=None):
+    """按点间距估计达到目标点数所需的体素大小
+
+    表面点云中每个点约占间距平方的面积，目标点数对应的体素边长约为
+    sqrt(总面积 / 目标点数)。
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        target_count (int): 目标点数
+        spacing (float, optional): 点间距，默认由estimate_spacing估计
+
+    Returns:
+        float: 体素大小初值
+    """
+    extent = points.max(axis=0) - points.min(axis=0)
+    diagonal = float(np.linalg.norm(extent)) or 1.0
+    if spacing is None:
+        spacing = estimate_spacing(points)
+    if spacing <= 0:
+        spacing = diagonal / np.sqrt(len(points))
+    voxel_size = spacing * np.sqrt(len(points) / max(target_count, 1))
+    return float(np.clip(voxel_size, diagonal * 1e-6, diagonal))
+
+
+def target_for_area_density(points, points_per_area, spacing=None):
+    """把单位面积点数换算为目标点数
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        points_per_area (float): 每单位面积（模型单位的平方）的点数
+        spacing (float, optional): 点间距
+
+    Returns:
+        int: 目标点数
+    """
+    if spacing is None:
+        spacing = estimate_spacing(points)
+    area = len(points) * spacing * spacing
+    return max(int(round(area * points_per_area)), 1)
+
+
+def find_voxel_size(points, target_count, tolerance=0.05, max_iterations=24, spacing=None, known=None):
+    """二分搜索使降采样点数接近目标的体素大小
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        target_count (int): 目标点数
+        tolerance (float): 允许的相对误差
+        max_iterations (int): 最大迭代次数
+        spacing (float, optional): 点间距，默认自动估计
+        known (list, optional): 已知的 [(体素大小, 降采样后点数)]，必须是对同一组点统计的结果。
+            有满足容差的直接返回，否则用其中离目标最近的两个作为初始区间
+
+    Returns:
+        dict: voxel_size（体素大小）、count（降采样后点数）、iterations（统计次数，直接使用已知结果时为0）
+    """
+    points = np.asarray(points, dtype=np.float64)
+
+    # 体素越大点数越少
+    low = high = None  # low: 点数偏多的体素大小, high: 点数偏少的体素大小
+    best = None
+    for known_size, known_count in known or ():
+        error = abs(known_count - target_count)
+        if best is None or error < best[0]:
+            best = (error, known_size, known_count)
+        if known_count > target_count and (low is None or known_size > low):
+            low = known_size
+        elif known_count < target_count and (high is None or known_size < high):
+            high = known_size
+    if best is not None and best[0] <= tolerance * target_count:
+        return {"voxel_size": float(best[1]), "count": best[2], "iterations": 0}
+
+    if low is not None and high is not None:
+        voxel_size = np.sqrt(low * high)
+    else:
+        voxel_size = initial_voxel_size(points, target_count, spacing)
+        # 初值落在已知结果之外时移到区间内
+        if low is not None and voxel_size <= low:
+            voxel_size = low * 2
+        if high is not None and voxel_size >= high:
+            voxel_size = high / 2
+    count = count_voxels(points, voxel_size)
+    iterations = 1
+    if best is None or abs(count - target_count) < best[0]:
+        best = (abs(count - target_count), voxel_size, count)
+
+    # 没有已知区间时先按2倍扩展得到包含目标的区间
+    while iterations < max_iterations and abs(count - target_count) > tolerance * target_count:
+        if count > target_count:
+            low = voxel_size
+            voxel_size = voxel_size * 2 if high is None else np.sqrt(low * high)
+        else:
+            high = voxel_size
+            voxel_size = voxel_size / 2 if low is None else np.sqrt(low * high)
+        count = count_voxels(points, voxel_size)
+        iterations += 1
+        if abs(count - target_count) < best[0]:
+            best = (abs(count - target_count), voxel_size, count)
+
+    return {"voxel_size": float(best[1]), "count": best[2], "iterations": iterations}
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+几何变化描述模块，编辑操作用它告诉渲染器哪些属性、哪些行发生了变化
+"""
+
+import numpy as np
+
+
+# 渲染器使用的属性名，网格的顶点/顶点颜色分别对应points/colors
+ATTRIBUTES = ("points", "colors", "normals", "triangles")
+
+
+class GeometryChange:
+    """一次或一批编辑造成的几何变化"""
+
+    def __init__(self, attributes=ATTRIBUTES, rows=None, resized=False):
+        """初始化几何变化描述
+
+        Args:
+            attributes (iterable): 变化的属性名，取自ATTRIBUTES
+            rows (numpy.ndarray, optional): 变化的行索引，None表示全部行
+            resized (bool): 点数或面数是否变化
+        """
+        self.attributes = set(attributes)
+        self.rows = None if rows is None else np.unique(np.asarray(rows, dtype=np.int64))
+        self.resized = resized
+        self.merged = 1  # 合并进来的编辑次数
+
+    @classmethod
+    def full(cls):
+        """所有属性都可能变化（未知变化）"""
+        return cls(ATTRIBUTES, None, True)
+
+    def is_empty(self):
+        """是否没有任何变化"""
+        return not self.attributes or (self.rows is not None and len(self.rows) == 0)
+
+    @property
+    def points_changed(self):
+        """点坐标（或网格顶点）是否变化"""
+        return "points" in self.attributes or self.resized
+
+    def merge(self, other):
+        """合并另一次变化，得到两次编辑的总变化
+
+        Args:
+            other (GeometryChange): 之后发生的变化
+
+        Returns:
+            GeometryChange: 合并后的变化（新对象）
+        """
+        if other.is_empty():
+            merged = GeometryChange(self.attributes, self.rows, self.resized)
+        elif self.is_empty():
+            merged = GeometryChange(other.attributes, other.rows, other.resized)
+        else:
+            resized = self.resized or other.resized
+            rows = None
+            if not resized and self.rows is not None and other.rows is not None:
+                rows = np.union1d(self.rows, other.rows)
+            merged = GeometryChange(self.attributes | other.attributes, rows, resized)
+        merged.merged = self.merged + other.merged
+        return merged
+
+    def __repr__(self):
+        rows = "all" if self.rows is None else len(self.rows)
+        return (f"GeometryChange(attributes={sorted(self.attributes)}, rows={rows}, "
+                f"resized={self.resized})")
+
+
+def diff_arrays(old, new):
+    """比较同一属性修改前后的数组
+
+    Args:
+        old (numpy.ndarray): 修改前的数组，可为None
+        new (numpy.ndarray): 修改后的数组，可为None
+
+    Returns:
+        tuple: (是否变化, 变化的行索引或None, 行数是否变化)
+    """
+    if old is None and new is None:
+        return False, None, False
+    if old is None or new is None or old.shape != new.shape:
+        return True, None, True
+    if old.ndim == 1:
+        rows = np.flatnonzero(old != new)
+    else:
+        rows = np.flatnonzero(np.any(old != new, axis=1))
+    return len(rows) > 0, rows, False
+
+
+def diff_states(old, new):
+    """比较修改前后的属性字典，生成几何变化描述
+
+    Args:
+        old (dict): 属性名 -> 修改前的数组（或None）
+        new (dict): 属性名 -> 修改后的数组（或None）
+
+    Returns:
+        GeometryChange: 变化描述
+    """
+    attributes = set()
+    rows = []
+    resized = False
+    all_rows = False
+    for name in set(old) | set(new):
+        changed, changed_rows, attr_resized = diff_arrays(old.get(name), new.get(name))
+        if not changed:
+            continue
+        attributes.add(name)
+        resized = resized or attr_resized
+        if changed_rows is None:
+            all_rows = True
+        elif name != "triangles":
+            rows.append(changed_rows)
+        else:
+            # 面的索引与顶点行不对应，只能视为全部变化
+            all_rows = True
+
+    if all_rows or not rows:
+        return GeometryChange(attributes, None, resized)
+    return GeometryChange(attributes, np.concatenate(rows), resized)
@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+历史记录存储模块，以增量方式保存模型的撤销/重做历史
+
+每条历史记录按属性（points、colors等）保存相对于上一条记录的变化:
+    - 未变化的属性直接共享上一条记录的数组
+    - 部分点变化时只保存变化的索引区间及其新值
+    - 整体刚体/仿射变换时只保存4x4变换矩阵
+    - 其余情况（如点数变化）保存完整数组作为关键帧
+任何状态都可以从最近的关键帧开始逐条重放得到，结果与原始数组逐位一致。
+历史总内存受预算限制，超出时把较旧的数据写入磁盘或丢弃最旧的记录。
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+
+
+# 记录类型
+_NONE = "none"  # 属性不存在
+_FULL = "full"  # 完整数组（关键帧）
+_SAME = "same"  # 与上一条记录相同
+_RANGES = "ranges"  # 变化的索引区间
+_TRANSFORM = "transform"  # 4x4变换矩阵
+
+# 变化行超过该比例时直接保存完整数组
+_FULL_RATIO = 0.5
+
+
+def apply_transform(points, matrix):
+    """对点坐标应用4x4变换矩阵
+
+    逐元素计算而不使用BLAS，保证同样的输入总能得到逐位相同的结果，
+    使历史重放可以精确复现变换后的坐标。
+
+    Args:
+        points (numpy.ndarray): (N, 3) 点坐标
+        matrix (numpy.ndarray): 4x4变换矩阵
+
+    Returns:
+        numpy.ndarray: (N, 3) 变换后的点坐标
+    """
+    points = np.asarray(points, dtype=np.float64)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    result = np.empty_like(points)
+    for row in range(3):
+        result[:, row] = (points[:, 0] * matrix[row, 0]
+                          + points[:, 1] * matrix[row, 1]
+                          + points[:, 2] * matrix[row, 2]
+                          + matrix[row, 3])
+    return result
+
+
+def _bit_view(array):
+    """把数组视为同宽度无符号整数，用于逐位比较（NaN也能正确比较）"""
+    array = np.ascontiguousarray(array)
+    return array.view(f"u{array.dtype.itemsize}")
+
+
+def _changed_ranges(old, new):
+    """计算两个同形状数组之间变化行的区间
+
+    Returns:
+        tuple: (starts, stops)，均为int64数组
+    """
+    changed = _bit_view(old) != _bit_view(new)
+    if changed.ndim > 1:
+        changed = changed.reshape(len(changed), -1).any(axis=1)
+    idx = np.flatnonzero(changed)
+    if idx.size == 0:
+        return idx, idx
+    breaks = np.flatnonzero(np.diff(idx) > 1)
+    starts = idx[np.r_[0, breaks + 1]]
+    stops = idx[np.r_[breaks, idx.size - 1]] + 1
+    return starts, stops
+
+
+def _expand_ranges(starts, stops):
+    """把区间展开为行索引"""
+    lengths = stops - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(lengths.sum()) + offsets
+
+
+class _Spilled:
+    """已写入磁盘的数组"""
+
+    def __init__(self, path, nbytes):
+        self.path = path
+        self.nbytes = nbytes
+
+    def load(self):
+        return np.load(self.path, mmap_mode="r")
+
+
+class HistoryStore:
+    """增量历史记录存储
+
+    外部按索引访问完整状态，内部只保存增量。
+    """
+
+    def __init__(self, memory_budget=512 * 1024 * 1024, spill_dir=None, keyframe_interval=8):
+        """初始化历史记录存储
+
+        Args:
+            memory_budget (int): 内存预算（字节），至少保留最新一条记录
+            spill_dir (str, optional): 溢出目录，提供时较旧的数据写入磁盘而不是丢弃
+            keyframe_interval (int): 两个关键帧之间最多的增量记录数，限制重放长度
+        """
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.keyframe_interval = keyframe_interval
+        self._entries = []
+        self._tip = None  # 最新一条记录的完整状态
+        self._cache = None  # (索引, 状态) 最近一次重建的状态
+        self._session_dir = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """清除所有历史记录并删除溢出文件"""
+        self._entries = []
+        self._tip = None
+        self._cache = None
+        if self._session_dir and os.path.isdir(self._session_dir):
+            shutil.rmtree(self._session_dir, ignore_errors=True)
+        self._session_dir = None
+
+    def get_description(self, index):
+        """获取历史记录描述
+
+        Args:
+            index (int): 历史记录索引
+
+        Returns:
+            str: 操作描述
+        """
+        return self._entries[index]["description"]
+
+    def truncate(self, length):
+        """删除指定长度之后的记录（撤销后执行新操作时丢弃重做分支）
+
+        Args:
+            length (int): 保留的记录数
+        """
+        if length >= len(self._entries):
+            return
+        tip = self.get_state(length - 1) if length > 0 else None
+        for entry in self._entries[length:]:
+            self._remove_files(entry)
+        del self._entries[length:]
+        self._tip = tip
+        self._cache = None
+
+    def push(self, description, arrays, transforms=None):
+        """添加一条历史记录
+
+        Args:
+            description (str): 操作描述
+            arrays (dict): 属性名 -> 数组或None，数组会被复制
+            transforms (dict, optional): 属性名 -> 4x4矩阵，提示该属性由上一状态
+                经过apply_transform得到；校验不一致时自动退化为其他记录方式
+
+        Returns:
+            int: 因超出内存预算而丢弃的最旧记录数
+        """
+        transforms = transforms or {}
+        state = {}
+        records = {}
+        keyframe = self._deltas_since_keyframe() >= self.keyframe_interval
+
+        for name, array in arrays.items():
+            if array is None:
+                state[name] = None
+                records[name] = (_NONE,)
+                continue
+
+            array = np.array(array, copy=True, order="C")
+            previous = self._tip.get(name) if self._tip else None
+            record = None
+            if previous is not None:
+                record, array = self._make_delta(previous, array, transforms.get(name))
+            if record is None or (keyframe and record[0] != _FULL):
+                # 关键帧保存完整数组，未变化的数组仍与上一状态共享
+                record = (_FULL, array)
+            state[name] = array
+            records[name] = record
+
+        self._entries.append({"description": description, "attrs": records})
+        self._tip = state
+        self._cache = (len(self._entries) - 1, state)
+        return self._enforce_budget()
+
+    def get_state(self, index):
+        """重建指定记录的完整状态
+
+        Args:
+            index (int): 历史记录索引
+
+        Returns:
+            dict: 属性名 -> 数组或None
+        """
+        if index < 0:
+            index += len(self._entries)
+        if index == len(self._entries) - 1 and self._tip is not None:
+            return self._tip
+        if self._cache is not None and self._cache[0] == index:
+            return self._cache[1]
+
+        names = self._entries[index]["attrs"].keys()
+        state = {name: self._resolve(index, name) for name in names}
+        self._cache = (index, state)
+        return state
+
+    def memory_usage(self, include_tip=True):
+        """计算内存中的历史数据大小（共享数组只计一次）
+
+        Args:
+            include_tip (bool): 是否计入最新状态本身的数组
+
+        Returns:
+            int: 字节数
+        """
+        tip_ids = set()
+        if not include_tip and self._tip:
+            tip_ids = {id(array) for array in self._tip.values() if array is not None}
+
+        seen = {}
+        for array in self._iter_arrays():
+            if (isinstance(array, np.ndarray) and not isinstance(array, np.memmap)
+                    and id(array) not in tip_ids):
+                seen[id(array)] = array.nbytes
+        return sum(seen.values())
+
+    def disk_usage(self):
+        """计算已写入磁盘的历史数据大小
+
+        Returns:
+            int: 字节数
+        """
+        return sum(array.nbytes for array in self._iter_arrays() if isinstance(array, _Spilled))
+
+    def get_stats(self):
+        """获取存储统计
+
+        Returns:
+            dict: 记录数、关键帧数、内存和磁盘占用
+        """
+        keyframes = sum(
+            1 for entry in self._entries
+            if any(record[0] == _FULL for record in entry["attrs"].values())
+        )
+        return {
+            "entries": len(self._entries),
+            "keyframes": keyframes,
+            "memory_bytes": self.memory_usage(),
+            "disk_bytes": self.disk_usage(),
+            "memory_budget": self.memory_budget
+        }
+
+    def _make_delta(self, previous, array, transform):
+        """计算相对上一状态的增量
+
+        Returns:
+            tuple: (记录或None, 用于状态的数组)，未变化时状态直接共享上一数组
+        """
+        if previous.shape != array.shape or previous.dtype != array.dtype:
+            return None, array
+
+        if transform is not None:
+            transform = np.array(transform, dtype=np.float64)
+            if np.array_equal(_bit_view(apply_transform(previous, transform)), _bit_view(array)):
+                return (_TRANSFORM, transform), array
+
+        starts, stops = _changed_ranges(previous, array)
+        if starts.size == 0:
+            return (_SAME,), previous
+
+        rows = _expand_ranges(starts, stops)
+        if rows.size > len(array) * _FULL_RATIO:
+            return None, array
+        return (_RANGES, starts, stops, array[rows]), array
+
+    def _deltas_since_keyframe(self):
+        """最新记录距离最近关键帧的增量条数"""
+        count = 0
+        for entry in reversed(self._entries):
+            kinds = [record[0] for record in entry["attrs"].values()]
+            if all(kind in (_FULL, _NONE) for kind in kinds):
+                break
+            count += 1
+        return count
+
+    def _resolve(self, index, name):
+        """从最近的关键帧重放得到指定记录的属性数组"""
+        start = index
+        while True:
+            record = self._entries[start]["attrs"].get(name, (_NONE,))
+            if record[0] in (_FULL, _NONE):
+                break
+            start -= 1
+
+        array = self._load(record[1]) if record[0] == _FULL else None
+        for i in range(start + 1, index + 1):
+            record = self._entries[i]["attrs"].get(name, (_NONE,))
+            kind = record[0]
+            if kind == _NONE:
+                array = None
+            elif kind == _FULL:
+                array = self._load(record[1])
+            elif kind == _TRANSFORM:
+                array = apply_transform(array, record[1])
+            elif kind == _RANGES:
+                rows = _expand_ranges(record[1], record[2])
+                array = np.array(array, copy=True)
+                array[rows] = self._load(record[3])
+        return array
+
+    def _load(self, payload):
+        """读取可能已写入磁盘的数组"""
+        if isinstance(payload, _Spilled):
+            return payload.load()
+        return payload
+
+    def _iter_arrays(self):
+        """遍历所有保存的数组（包括最新状态）"""
+        for entry in self._entries:
+            for record in entry["attrs"].values():
+                if record[0] == _FULL:
+                    yield record[1]
+                elif record[0] == _RANGES:
+                    yield record[3]
+        if self._tip:
+            for array in self._tip.values():
+                if array is not None:
+                    yield array
+
+    def _enforce_budget(self):
+        """超出内存预算时溢出到磁盘或丢弃最旧记录
+
+        预算只约束最新状态以外的历史数据，最新状态本身总是保留在内存中。
+
+        Returns:
+            int: 丢弃的记录数
+        """
+        if self.memory_budget is None or self.memory_budget <= 0:
+            return 0
+
+        if self.spill_dir:
+            for entry in self._entries[:-1]:
+                if self.memory_usage(include_tip=False) <= self.memory_budget:
+                    return 0
+                self._spill(entry)
+
+        dropped = 0
+        while len(self._entries) > 1 and self.memory_usage(include_tip=False) > self.memory_budget:
+            self._drop_oldest()
+            dropped += 1
+        return dropped
+
+    def _drop_oldest(self):
+        """丢弃最旧的记录，并把下一条记录转换为关键帧"""
+        state = self.get_state(1)
+        first = self._entries[0]["attrs"]
+        second = self._entries[1]["attrs"]
+        for name, array in state.items():
+            kind = second[name][0]
+            if kind == _SAME and first[name][0] == _FULL:
+                # 直接接管上一关键帧（可能已写入磁盘），不复制数据
+                second[name] = first[name]
+                first[name] = (_NONE,)
+            elif kind not in (_FULL, _NONE):
+                second[name] = (_FULL, array)
+        self._remove_files(self._entries[0])
+        del self._entries[0]
+        self._cache = None
+
+    def _spill(self, entry):
+        """把记录中的数组写入磁盘"""
+        if self._session_dir is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._session_dir = tempfile.mkdtemp(prefix="history_", dir=self.spill_dir)
+
+        attrs = entry["attrs"]
+        for name, record in attrs.items():
+            slot = {_FULL: 1, _RANGES: 3}.get(record[0])
+            if slot is None or isinstance(record[slot], _Spilled):
+                continue
+            array = record[slot]
+            if self._tip and any(array is tip for tip in self._tip.values()):
+                # 最新状态仍在内存中使用，写盘不能节省内存
+                continue
+            path = os.path.join(self._session_dir, f"{uuid.uuid4().hex}.npy")
+            np.save(path, array)
+            attrs[name] = record[:slot] + (_Spilled(path, array.nbytes),) + record[slot + 1:]
+        self._cache = None
+
+    def _remove_files(self, entry):
+        """删除记录对应的溢出文件"""
+        for record in entry["attrs"].values():
+            for payload in record[1:]:
+                if isinstance(payload, _Spilled) and os.path.exists(payload.path):
+                    os.remove(payload.path)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模型缓存模块，在本地磁盘缓存从后端获取的模型文件
+
+缓存目录结构:
+    index.json           模型ID -> {etag, sha256, size, last_used}
+    objects/<sha256>.pcd 按内容哈希命名的模型文件，内容相同的模型共享一个文件
+    partial/<ID哈希>.pcd  正在下载（可续传）的文件，按模型ID的哈希命名
+超出容量上限时按最近最少使用的顺序淘汰。
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils.transfer import file_checksum
+
+
+class ModelCache:
+    """内容寻址的模型磁盘缓存，线程安全"""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024):
+        """初始化模型缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int): 容量上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.partial_dir = os.path.join(cache_dir, "partial")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._fetch_locks = {}  # 模型ID -> [锁, 使用者数]，同一模型同时只有一个下载
+        self.stats = {
+            "hits": 0,  # 服务器返回304，直接使用本地文件
+            "misses": 0,  # 需要下载
+            "evictions": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0  # 命中时省去的下载字节数
+        }
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        """读取索引，丢弃文件已不存在的条目"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            model_id: entry for model_id, entry in index.items()
+            if os.path.exists(self._object_path(entry["sha256"]))
+        }
+
+    def _save_index(self):
+        """原子地写入索引"""
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _object_path(self, sha256):
+        return os.path.join(self.objects_dir, f"{sha256}.pcd")
+
+    def partial_path(self, model_id):
+        """获取模型下载过程中使用的临时路径
+
+        文件名是模型ID的哈希，ID中的路径分隔符或".."不会使路径离开缓存目录；
+        同一ID总是得到同一路径，中断的下载可以续传。
+
+        Args:
+            model_id (str): 模型ID
+
+        Returns:
+            str: 临时文件路径
+        """
+        name = hashlib.sha256(str(model_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.partial_dir, f"{name}.pcd")
+
+    @contextlib.contextmanager
+    def fetching(self, model_id):
+        """获取同一模型的下载权，返回下载使用的临时路径
+
+        同一模型的并发获取依次进行，不会写入同一个临时文件；
+        后进入的获取可以直接使用前一个存入的缓存条目。
+
+        用法:
+            with cache.fetching(model_id) as partial_path:
+                ...
+
+        Args:
+            model_id (str): 模型ID
+        """
+        key = str(model_id)
+        with self._lock:
+            entry = self._fetch_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield self.partial_path(model_id)
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._fetch_locks[key]
+
+    def lookup(self, model_id):
+        """查找缓存条目
+
+        Args:
+            model_id (str): 模型ID
+
+        Returns:
+            tuple: (ETag, 文件路径)，未缓存时为None
+        """
+        with self._lock:
+            entry = self._index.get(str(model_id))
+            if entry is None:
+                return None
+            return entry.get("etag"), self._object_path(entry["sha256"])
+
+    def record_hit(self, model_id):
+        """记录一次命中（服务器确认未变化），返回缓存文件路径
+
+        Args:
+            model_id (str): 模型ID
+
+        Returns:
+            str: 缓存文件路径，条目已被淘汰时为None
+        """
+        with self._lock:
+            entry = self._index.get(str(model_id))
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            self._save_index()
+            return self._object_path(entry["sha256"])
+
+    def store(self, model_id, etag, file_path):
+        """把下载完成的文件放入缓存
+
+        Args:
+            model_id (str): 模型ID
+            etag (str): 服务器返回的ETag，可为None
+            file_path (str): 下载完成的文件，会被移动到缓存目录
+
+        Returns:
+            str: 缓存文件路径
+        """
+        sha256 = file_checksum(file_path)
+        size = os.path.getsize(file_path)
+        object_path = self._object_path(sha256)
+
+        with self._lock:
+            if os.path.exists(object_path):
+                # 内容相同的文件已存在，直接共享
+                os.remove(file_path)
+            else:
+                os.replace(file_path, object_path)
+
+            self._index[str(model_id)] = {
+                "etag": etag,
+                "sha256": sha256,
+                "size": size,
+                "last_used": time.time()
+            }
+            self.stats["misses"] += 1
+            self.stats["bytes_downloaded"] += size
+            self._evict(keep=str(model_id))
+            self._save_index()
+        return object_path
+
+    def _total_bytes(self):
+        """计算缓存对象的总大小（共享文件只计一次）"""
+        sizes = {entry["sha256"]: entry["size"] for entry in self._index.values()}
+        return sum(sizes.values())
+
+    def _evict(self, keep=None):
+        """按LRU淘汰条目直到不超过容量上限"""
+        by_age = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+        for model_id, entry in by_age:
+            if self._total_bytes() <= self.max_bytes:
+                break
+            if model_id == keep:
+                continue
+            del self._index[model_id]
+            self.stats["evictions"] += 1
+            if not any(e["sha256"] == entry["sha256"] for e in self._index.values()):
+                path = self._object_path(entry["sha256"])
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for entry in self._index.values():
+                path = self._object_path(entry["sha256"])
+                if os.path.exists(path):
+                    os.remove(path)
+            self._index = {}
+            self._save_index()
+
+    def get_stats(self):
+        """获取缓存统计
+
+        Returns:
+            dict: 命中/未命中次数、流量和容量信息
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._index)
+            stats["total_bytes"] = self._total_bytes()
+            stats["max_bytes"] = self.max_bytes
+        return stats
@@ -10,12 +10,20 @@ import numpy as np
 import open3d as o3d
 from PySide6.QtCore import QObject, Signal
 
+from utils.history_store import HistoryStore, apply_transform
+from utils.geometry_change import GeometryChange, diff_states
+from utils.density import find_voxel_size, estimate_spacing, target_for_area_density
+from utils.pipeline import Pipeline
+from utils.model_stats import ModelStats
+from utils import tracing
+
 
 class ModelManager(QObject):
     """模型管理类，处理3D模型的编辑和处理功能push"""
     
     # 信号定义
     model_updated = Signal()  # 模型更新后发出的信号
+    geometry_changed = Signal(object)  # 模型数据变化，参数为GeometryChange，在model_updated之前发出
     edit_applied = Signal(str)  # 编辑应用后发出的信号，参数为操作描述
     operation_error = Signal(str)  # 操作错误时发出的信号，参数为错误信息
     
@@ -29,66 +37,182 @@ class ModelManager(QObject):
         self.config = config
         self.current_model = None
         self.model_type = None  # 'pcd'表示点云，'mesh'表示网格
-        self.history = []  # 操作历史，用于撤销/重做
         self.history_index = -1  # 历史索引
-        self.max_history = 20  # 最大历史记录数
+        self.lod_pyramid = None  # 渲染器为当前点云构建的LOD金字塔，各层用作密度调整的搜索区间
+        self.read_only = False  # 分块模式打开的超出内存的点云只能查看，不记录历史
+        self.stats = ModelStats()  # 当前模型的统计缓存，随编辑增量更新
+        self.source_point_count = 0  # 加载时的点数，密度级别按它的比例换算目标点数
+        self.last_density_result = None  # 最近一次密度调整的体素搜索结果
+        
+        # 密度级别 -> 目标点数占加载时点数的比例
+        self.density_targets = {"低": 0.1, "中": 0.25, "高": 0.5}
+        self.density_tolerance = 0.05  # 目标点数的允许相对误差
+        
+        # 处理流水线的并行设置
+        self.pipeline_workers = 0  # 进程数，0表示使用CPU核数
+        self.pipeline_tile_points = 500000  # 每块的目标点数
+        self.pipeline_min_parallel_points = 1000000  # 点数不少于该值时分块并行
+        self.last_pipeline_stats = []  # 最近一次流水线每个阶段的耗时和点数
+        
+        # 操作历史，用于撤销/重做，以增量方式存储并受内存预算限制
+        memory_budget_mb = 512
+        keyframe_interval = 8
+        spill_dir = None
+        if config:
+            self.density_targets = config.get_value("editor", "density_targets", self.density_targets)
+            self.density_tolerance = config.get_value("editor", "density_tolerance", 0.05)
+            self.pipeline_workers = config.get_value("pipeline", "workers", 0)
+            self.pipeline_tile_points = config.get_value("pipeline", "tile_points", 500000)
+            self.pipeline_min_parallel_points = config.get_value("pipeline", "min_parallel_points", 1000000)
+            memory_budget_mb = config.get_value("history", "memory_budget_mb", 512)
+            keyframe_interval = config.get_value("history", "keyframe_interval", 8)
+            if config.get_value("history", "spill_to_disk", False):
+                temp_dir = config.get_value("paths", "temp", "temp/")
+                spill_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), temp_dir, "history")
+        self.history = HistoryStore(
+            memory_budget=int(memory_budget_mb * 1024 * 1024),
+            spill_dir=spill_dir,
+            keyframe_interval=keyframe_interval
+        )
     
-    def set_model(self, model, model_type):
+    @tracing.traced("model.set_model", "load")
+    def set_model(self, model, model_type, stats=None, read_only=False):
         """设置当前模型
         
         Args:
             model: 模型对象
             model_type (str): 模型类型，'pcd'或'mesh'
+            stats (ModelStats, optional): 已为该模型创建的统计缓存（如渲染器的），
+                传入后与之共享，由模型管理器负责随编辑更新
+            read_only (bool): 是否只读。只读模型不能编辑，也不复制到历史记录中
         """
         self.current_model = model
         self.model_type = model_type
+        self.read_only = read_only
+        if self.lod_pyramid is not None and self.lod_pyramid.model is not model:
+            self.lod_pyramid = None
+        if stats is not None and stats.model is model:
+            self.stats = stats
+        else:
+            self.stats = ModelStats(model, model_type)
+        if model_type == 'pcd':
+            self.source_point_count = len(model.points)
+        elif model_type == 'mesh':
+            self.source_point_count = len(model.vertices)
         self.clear_history()
-        self.add_to_history("加载模型")
+        if not read_only:
+            self.add_to_history("加载模型")
+    
+    def set_lod_pyramid(self, pyramid):
+        """设置渲染器为当前点云构建完成的LOD金字塔
+        
+        金字塔属于其他模型时忽略。模型发生任何变化后金字塔失效，
+        渲染器会在变化后重新构建并再次设置。
+        
+        Args:
+            pyramid (LODPyramid): LOD金字塔
+        """
+        if pyramid.model is self.current_model:
+            self.lod_pyramid = pyramid
+    
+    def _lod_levels(self):
+        """当前点云LOD金字塔各层的体素大小和点数
+        
+        Returns:
+            list: [(体素大小, 点数)]，金字塔不可用时为空
+        """
+        pyramid = self.lod_pyramid
+        if pyramid is None or pyramid.model is not self.current_model \
+                or pyramid.source_points != len(self.current_model.points):
+            return []
+        return pyramid.get_stats()
     
     def clear_history(self):
         """清除历史记录"""
-        self.history = []
+        self.history.clear()
         self.history_index = -1
     
-    def add_to_history(self, description):
+    def add_to_history(self, description, transforms=None):
         """添加操作到历史记录
         
+        历史存储只保存相对上一状态的增量，未变化的属性与上一状态共享。
+        
         Args:
             description (str): 操作描述
+            transforms (dict, optional): 属性名 -> 4x4变换矩阵，
+                表示该属性由上一状态经过apply_transform得到，此时只记录矩阵
         """
         # 如果当前不在历史的最后，则删除后面的记录
         if self.history_index < len(self.history) - 1:
-            self.history = self.history[:self.history_index + 1]
+            self.history.truncate(self.history_index + 1)
         
-        # 添加新的状态
+        # 添加新的状态，历史存储会复制数组
         if self.model_type == 'pcd':
-            # 对于点云，复制点和颜色
-            points = np.asarray(self.current_model.points).copy()
-            colors = np.asarray(self.current_model.colors).copy() if self.current_model.has_colors() else None
-            self.history.append({
-                'description': description,
-                'points': points,
-                'colors': colors
-            })
+            # 对于点云，记录点、颜色和法线
+            arrays = {
+                'points': np.asarray(self.current_model.points),
+                'colors': np.asarray(self.current_model.colors) if self.current_model.has_colors() else None,
+                'normals': np.asarray(self.current_model.normals) if self.current_model.has_normals() else None
+            }
         elif self.model_type == 'mesh':
-            # 对于网格，复制顶点、面和颜色
-            vertices = np.asarray(self.current_model.vertices).copy()
-            triangles = np.asarray(self.current_model.triangles).copy()
-            vertex_colors = np.asarray(self.current_model.vertex_colors).copy() if self.current_model.has_vertex_colors() else None
-            self.history.append({
-                'description': description,
-                'vertices': vertices,
-                'triangles': triangles,
-                'vertex_colors': vertex_colors
-            })
+            # 对于网格，记录顶点、面和颜色
+            arrays = {
+                'vertices': np.asarray(self.current_model.vertices),
+                'triangles': np.asarray(self.current_model.triangles),
+                'vertex_colors': np.asarray(self.current_model.vertex_colors) if self.current_model.has_vertex_colors() else None
+            }
+        else:
+            return
+        
+        # 超出内存预算时，最旧的记录会被丢弃
+        self.history.push(description, arrays, transforms)
         
         # 更新历史索引
         self.history_index = len(self.history) - 1
+    
+    def _check_editable(self):
+        """检查当前模型是否可以编辑，只读时发出错误信号
+        
+        Returns:
+            bool: 是否可以编辑
+        """
+        if self.read_only:
+            self.operation_error.emit("以分块模式打开的模型为只读，不能编辑")
+            return False
+        return True
+    
+    def _notify_changed(self, change, matrix=None):
+        """更新统计缓存并通知模型已变化
+        
+        Args:
+            change (GeometryChange): 变化描述
+            matrix (numpy.ndarray, optional): 坐标由该4x4矩阵变换得到时传入，用于增量更新统计
+        """
+        self.stats.apply_change(change, matrix)
+        # 金字塔是变化前的数据，渲染器收到变化后会重新构建
+        self.lod_pyramid = None
+        self.geometry_changed.emit(change)
+        self.model_updated.emit()
+    
+    def get_history_stats(self):
+        """获取历史记录存储统计
         
-        # 限制历史记录数量
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-            self.history_index -= 1
+        Returns:
+            dict: 记录数、关键帧数、内存和磁盘占用
+        """
+        return self.history.get_stats()
+    
+    def get_memory_usage(self):
+        """获取模型和历史记录的内存占用
+        
+        Returns:
+            dict: 当前模型、内存中的历史记录和已写入磁盘的历史记录的字节数
+        """
+        return {
+            "model": self.stats.nbytes,
+            "history": self.history.memory_usage(),
+            "history_disk": self.history.disk_usage()
+        }
     
     def can_undo(self):
         """检查是否可以撤销
@@ -106,6 +230,7 @@ class ModelManager(QObject):
         """
         return self.history_index < len(self.history) - 1
     
+    @tracing.traced("model.undo", "edit")
     def undo(self):
         """撤销操作
         
@@ -117,9 +242,10 @@ class ModelManager(QObject):
         
         self.history_index -= 1
         self._restore_state(self.history_index)
-        self.edit_applied.emit(f"撤销: {self.history[self.history_index]['description']}")
+        self.edit_applied.emit(f"撤销: {self.history.get_description(self.history_index)}")
         return True
     
+    @tracing.traced("model.redo", "edit")
     def redo(self):
         """重做操作
         
@@ -131,7 +257,7 @@ class ModelManager(QObject):
         
         self.history_index += 1
         self._restore_state(self.history_index)
-        self.edit_applied.emit(f"重做: {self.history[self.history_index]['description']}")
+        self.edit_applied.emit(f"重做: {self.history.get_description(self.history_index)}")
         return True
     
     def _restore_state(self, index):
@@ -140,13 +266,39 @@ class ModelManager(QObject):
         Args:
             index (int): 历史记录索引
         """
-        state = self.history[index]
+        state = self.history.get_state(index)
+        
+        # 在覆盖数据之前与当前数据比较，得到变化的属性和行
+        if self.model_type == 'pcd':
+            current = {
+                'points': np.asarray(self.current_model.points),
+                'colors': np.asarray(self.current_model.colors) if self.current_model.has_colors() else None,
+                'normals': np.asarray(self.current_model.normals) if self.current_model.has_normals() else None
+            }
+            restored = {'points': state['points'], 'colors': state['colors'], 'normals': state.get('normals')}
+        else:
+            current = {
+                'points': np.asarray(self.current_model.vertices),
+                'triangles': np.asarray(self.current_model.triangles),
+                'colors': np.asarray(self.current_model.vertex_colors) if self.current_model.has_vertex_colors() else None
+            }
+            restored = {'points': state['vertices'], 'triangles': state['triangles'],
+                        'colors': state['vertex_colors']}
+        if restored['colors'] is None:
+            # 历史中没有颜色时保留当前颜色
+            restored['colors'] = current['colors']
+        change = diff_states(current, restored)
         
         if self.model_type == 'pcd':
             # 恢复点云状态
             self.current_model.points = o3d.utility.Vector3dVector(state['points'])
             if state['colors'] is not None:
                 self.current_model.colors = o3d.utility.Vector3dVector(state['colors'])
+            # 法线与点一一对应，历史中没有法线时清除，避免与点数不一致
+            if state.get('normals') is not None:
+                self.current_model.normals = o3d.utility.Vector3dVector(state['normals'])
+            else:
+                self.current_model.normals = o3d.utility.Vector3dVector()
         elif self.model_type == 'mesh':
             # 恢复网格状态
             self.current_model.vertices = o3d.utility.Vector3dVector(state['vertices'])
@@ -155,13 +307,20 @@ class ModelManager(QObject):
                 self.current_model.vertex_colors = o3d.utility.Vector3dVector(state['vertex_colors'])
         
         # 通知视图更新
-        self.model_updated.emit()
+        self._notify_changed(change)
     
-    def apply_density(self, density_level):
+    @tracing.traced("model.apply_density", "edit")
+    def apply_density(self, density_level=None, target_points=None, points_per_area=None):
         """应用密度设置
         
+        按目标点数自动搜索体素大小，结果与模型的单位无关。三个参数任选其一，
+        优先级为 target_points > points_per_area > density_level。
+        
         Args:
-            density_level (str): 密度级别，'低'、'中'或'高'
+            density_level (str, optional): 密度级别，'低'、'中'或'高'，
+                目标点数为加载时点数乘以density_targets中的比例
+            target_points (int, optional): 目标点数
+            points_per_area (float, optional): 每单位面积（模型单位的平方）的目标点数
             
         Returns:
             bool: 是否成功应用
@@ -169,36 +328,169 @@ class ModelManager(QObject):
         if not self.current_model or self.model_type != 'pcd':
             self.operation_error.emit("只能对点云应用密度设置")
             return False
+        if not self._check_editable():
+            return False
         
         try:
-            # 复制当前模型，以防操作失败
             pcd = self.current_model
+            points = np.asarray(pcd.points)
+            spacing = estimate_spacing(points)
+            
+            # 确定目标点数
+            if target_points is not None:
+                label = f"{int(target_points)} 点"
+            elif points_per_area is not None:
+                target_points = target_for_area_density(points, points_per_area, spacing)
+                label = f"{points_per_area} 点/单位面积"
+            else:
+                if density_level not in self.density_targets:
+                    self.operation_error.emit(f"未知的密度级别: {density_level}")
+                    return False
+                target_points = int(self.source_point_count * self.density_targets[density_level])
+                label = density_level
             
-            # 根据密度级别设置体素大小
-            voxel_size = 0.02  # 默认中等密度
-            if density_level == "低":
-                voxel_size = 0.04
-            elif density_level == "高":
-                voxel_size = 0.01
+            if target_points >= len(points) * (1 - self.density_tolerance):
+                self.operation_error.emit(f"当前点数 {len(points)} 已不高于目标 {target_points}")
+                return False
             
-            # 应用体素下采样
-            downsampled_pcd = pcd.voxel_down_sample(voxel_size)
+            # 搜索满足目标点数的体素大小，LOD金字塔各层的点数是同一点云的精确统计，用作初始区间
+            levels = self._lod_levels()
+            result = find_voxel_size(points, target_points, self.density_tolerance, spacing=spacing,
+                                     known=levels)
+            result["target"] = target_points
+            result["spacing"] = spacing
+            self.last_density_result = result
+            voxel_size = result["voxel_size"]
+            
+            # 应用体素下采样，搜索结果正好是金字塔的一层时直接复用该层
+            if result["iterations"] == 0 and levels:
+                downsampled_pcd = self.lod_pyramid.level(voxel_size)
+            else:
+                downsampled_pcd = pcd.voxel_down_sample(voxel_size)
             
             # 更新当前模型
             self.current_model.points = downsampled_pcd.points
             self.current_model.colors = downsampled_pcd.colors
             
             # 添加到历史记录
-            self.add_to_history(f"应用密度: {density_level}")
+            self.add_to_history(f"应用密度: {label}")
             
-            # 通知视图更新
-            self.model_updated.emit()
-            self.edit_applied.emit(f"已应用密度: {density_level}")
+            # 通知视图更新，点数已变化
+            self._notify_changed(GeometryChange(("points", "colors"), resized=True))
+            self.edit_applied.emit(
+                f"已应用密度: {label}，点数 {len(points)} -> {len(pcd.points)}，体素大小 {voxel_size:.4g}")
             return True
         except Exception as e:
             self.operation_error.emit(f"应用密度时出错: {str(e)}")
             return False
     
+    @tracing.traced("model.run_pipeline", "edit")
+    def run_pipeline(self, stages, description=None):
+        """对当前点云依次执行处理阶段
+        
+        整个阶段链作为一条历史记录，撤销时一次恢复到执行前的状态。
+        点数较多时按空间分块在进程池中并行处理。
+        
+        Args:
+            stages (list): PipelineStage列表，见utils.pipeline
+            description (str, optional): 操作描述，默认由阶段名组成
+            
+        Returns:
+            bool: 是否成功应用
+        """
+        if not self.current_model or self.model_type != 'pcd':
+            self.operation_error.emit("只能对点云执行处理流水线")
+            return False
+        if not self._check_editable():
+            return False
+        if not stages:
+            self.operation_error.emit("处理流水线没有阶段")
+            return False
+        
+        try:
+            pcd = self.current_model
+            pipeline = Pipeline(
+                stages,
+                workers=self.pipeline_workers,
+                tile_points=self.pipeline_tile_points,
+                min_parallel_points=self.pipeline_min_parallel_points
+            )
+            result, stats = pipeline.run(
+                np.asarray(pcd.points),
+                np.asarray(pcd.colors) if pcd.has_colors() else None,
+                np.asarray(pcd.normals) if pcd.has_normals() else None
+            )
+            self.last_pipeline_stats = stats
+            
+            for stat in stats:
+                print(f"流水线阶段 {stat['stage']}: {stat['points_in']} -> {stat['points_out']} 点，"
+                      f"{stat['tiles']} 块，{stat['seconds'] * 1000:.1f} ms")
+            
+            # 更新当前模型
+            pcd.points = o3d.utility.Vector3dVector(result['points'])
+            if result['colors'] is not None:
+                pcd.colors = o3d.utility.Vector3dVector(result['colors'])
+            if result['normals'] is not None:
+                pcd.normals = o3d.utility.Vector3dVector(result['normals'])
+            
+            # 整个阶段链只添加一条历史记录
+            if description is None:
+                description = " → ".join(stage.name for stage in stages)
+            self.add_to_history(f"处理流水线: {description}")
+            
+            # 通知视图更新，点数可能已变化
+            self._notify_changed(GeometryChange(("points", "colors", "normals"), resized=True))
+            total = sum(stat['seconds'] for stat in stats)
+            self.edit_applied.emit(
+                f"已执行处理流水线: {description}，点数 {stats[0]['points_in']} -> {len(pcd.points)}，"
+                f"耗时 {total:.2f} s")
+            return True
+        except Exception as e:
+            self.operation_error.emit(f"执行处理流水线时出错: {str(e)}")
+            return False
+    
+    @tracing.traced("model.apply_transform", "edit")
+    def apply_transform(self, matrix, description="应用变换"):
+        """对当前模型应用4x4变换矩阵
+        
+        历史中只记录变换矩阵，而不是变换后的完整坐标。
+        
+        Args:
+            matrix (numpy.ndarray): 4x4变换矩阵
+            description (str): 操作描述
+            
+        Returns:
+            bool: 是否成功应用
+        """
+        if not self.current_model:
+            self.operation_error.emit("没有加载模型")
+            return False
+        if not self._check_editable():
+            return False
+        
+        try:
+            matrix = np.asarray(matrix, dtype=np.float64)
+            if self.model_type == 'pcd':
+                name = 'points'
+                points = apply_transform(np.asarray(self.current_model.points), matrix)
+                self.current_model.points = o3d.utility.Vector3dVector(points)
+            else:
+                name = 'vertices'
+                vertices = apply_transform(np.asarray(self.current_model.vertices), matrix)
+                self.current_model.vertices = o3d.utility.Vector3dVector(vertices)
+            
+            # 添加到历史记录
+            self.add_to_history(description, transforms={name: matrix})
+            
+            # 通知视图更新，只有坐标变化
+            self._notify_changed(GeometryChange(("points",)), matrix)
+            self.edit_applied.emit(f"已{description}")
+            return True
+        except Exception as e:
+            self.operation_error.emit(f"应用变换时出错: {str(e)}")
+            return False
+    
+    @tracing.traced("model.apply_aesthetic_alignment", "edit")
     def apply_aesthetic_alignment(self, alignment_option):
         """应用美学对齐
         
@@ -211,6 +503,8 @@ class ModelManager(QObject):
         if not self.current_model:
             self.operation_error.emit("没有加载模型")
             return False
+        if not self._check_editable():
+            return False
         
         try:
             # 这里可以实现不同的美学对齐算法
@@ -219,14 +513,15 @@ class ModelManager(QObject):
             # 添加到历史记录
             self.add_to_history(f"应用美学对齐: {alignment_option}")
             
-            # 通知视图更新
-            self.model_updated.emit()
+            # 通知视图更新，目前不修改几何数据
+            self._notify_changed(GeometryChange(()))
             self.edit_applied.emit(f"已应用美学对齐: {alignment_option}")
             return True
         except Exception as e:
             self.operation_error.emit(f"应用美学对齐时出错: {str(e)}")
             return False
     
+    @tracing.traced("model.apply_edit", "edit")
     def apply_edit(self, edit_type, edit_data):
         """应用编辑操作
         
@@ -240,6 +535,8 @@ class ModelManager(QObject):
         if not self.current_model:
             self.operation_error.emit("没有加载模型")
             return False
+        if not self._check_editable():
+            return False
         
         try:
             # 根据不同的编辑类型实现不同的编辑操作
@@ -248,17 +545,27 @@ class ModelManager(QObject):
             # 添加到历史记录
             self.add_to_history(f"应用编辑: {edit_type}")
             
-            # 通知视图更新
-            self.model_updated.emit()
+            # 通知视图更新，编辑数据可以通过edit_data['change']描述变化范围
+            self._notify_changed((edit_data or {}).get('change') or GeometryChange.full())
             self.edit_applied.emit(f"已应用编辑: {edit_type}")
             return True
         except Exception as e:
             self.operation_error.emit(f"应用编辑时出错: {str(e)}")
             return False
     
+    def get_model_stats(self):
+        """获取当前模型的统计缓存
+        
+        Returns:
+            ModelStats: 统计缓存，未加载模型时为None
+        """
+        return self.stats if self.current_model else None
+    
     def get_model_info(self):
         """获取当前模型信息
         
+        数量和包围盒取自统计缓存，模型未变化时不遍历数据。
+        
         Returns:
             dict: 模型信息
         """
@@ -267,33 +574,26 @@ class ModelManager(QObject):
                 "status": "未加载模型"
             }
         
+        stats = self.stats
         info = {
             "type": self.model_type
         }
         
         if self.model_type == 'pcd':
             # 点云信息
-            info["points_count"] = len(self.current_model.points)
-            info["has_colors"] = self.current_model.has_colors()
-            info["has_normals"] = self.current_model.has_normals()
-            
-            # 计算点云的边界框
-            points = np.asarray(self.current_model.points)
-            min_bound = points.min(axis=0)
-            max_bound = points.max(axis=0)
-            info["dimensions"] = max_bound - min_bound
-            
+            info["points_count"] = stats.point_count
+            info["has_colors"] = stats.has_colors
+            info["has_normals"] = stats.has_normals
         elif self.model_type == 'mesh':
             # 网格信息
-            info["vertices_count"] = len(self.current_model.vertices)
-            info["triangles_count"] = len(self.current_model.triangles)
-            info["has_vertex_colors"] = self.current_model.has_vertex_colors()
-            info["has_triangle_normals"] = self.current_model.has_triangle_normals()
-            
-            # 计算网格的边界框
-            vertices = np.asarray(self.current_model.vertices)
-            min_bound = vertices.min(axis=0)
-            max_bound = vertices.max(axis=0)
-            info["dimensions"] = max_bound - min_bound
+            info["vertices_count"] = stats.point_count
+            info["triangles_count"] = stats.triangle_count
+            info["has_vertex_colors"] = stats.has_colors
+            info["has_triangle_normals"] = stats.has_normals
+        
+        if stats.point_count > 0:
+            info["dimensions"] = stats.dimensions
+            info["center"] = stats.center
+            info["centroid"] = stats.centroid
         
         return info
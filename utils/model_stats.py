@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+模型统计缓存模块，缓存包围盒、质心、数量和属性等统计信息
+
+统计在第一次读取时计算，之后随编辑增量更新:
+    只改颜色/法线/面的编辑     只刷新数量和属性标志，O(1)
+    仿射变换                   质心按矩阵变换，O(1)；轴对齐的变换（平移、缩放、翻转）
+                               包围盒也按矩阵变换，其他旋转在下次读取时重新计算
+    其他修改坐标的编辑         失效，下次读取时重新计算一次
+因此属性面板在每次model_updated时刷新的开销与模型大小无关。
+统计由修改几何数据的一方（ModelManager）负责更新，渲染器可共享同一个对象用于相机适配。
+"""
+
+import numpy as np
+
+
+class ModelStats:
+    """点云或网格的统计缓存"""
+
+    def __init__(self, model=None, model_type=None):
+        """初始化统计缓存
+
+        Args:
+            model: 点云或网格，可选
+            model_type (str): 模型类型，'pcd'或'mesh'
+        """
+        self.full_computations = 0  # 完整计算的次数
+        self.incremental_updates = 0  # 增量更新的次数
+        self.reset(model, model_type)
+
+    def reset(self, model, model_type):
+        """切换到新的模型，所有统计失效
+
+        Args:
+            model: 点云或网格
+            model_type (str): 模型类型，'pcd'或'mesh'
+        """
+        self.model = model
+        self.model_type = model_type
+        self._bounds = None  # (min_bound, max_bound)
+        self._sum = None  # 坐标之和，用于质心
+        self._histograms = {}  # (bins, resolution) -> 密度直方图
+        self._refresh_counts()
+
+    def _points(self):
+        if self.model_type == 'pcd':
+            return np.asarray(self.model.points)
+        return np.asarray(self.model.vertices)
+
+    def _refresh_counts(self):
+        """刷新数量和属性标志，只读取长度，O(1)"""
+        model = self.model
+        self.point_count = 0
+        self.triangle_count = 0
+        self.has_colors = False
+        self.has_normals = False
+        if model is None:
+            return
+        if self.model_type == 'pcd':
+            self.point_count = len(model.points)
+            self.has_colors = model.has_colors()
+            self.has_normals = model.has_normals()
+        else:
+            self.point_count = len(model.vertices)
+            self.triangle_count = len(model.triangles)
+            self.has_colors = model.has_vertex_colors()
+            self.has_normals = model.has_triangle_normals()
+
+    @property
+    def nbytes(self):
+        """几何数据占用的内存字节数，由数量和属性标志推算，O(1)"""
+        per_point = 24 * (1 + self.has_colors + (self.has_normals and self.model_type == 'pcd'))
+        per_triangle = 12 + 24 * self.has_normals if self.model_type == 'mesh' else 0
+        return self.point_count * per_point + self.triangle_count * per_triangle
+
+    def _ensure(self):
+        """计算缺失的统计"""
+        if self._bounds is not None and self._sum is not None:
+            return
+        points = self._points()
+        if len(points) == 0:
+            self._bounds = (np.zeros(3), np.zeros(3))
+            self._sum = np.zeros(3)
+            return
+        if self._bounds is None:
+            self._bounds = (points.min(axis=0), points.max(axis=0))
+        if self._sum is None:
+            self._sum = points.sum(axis=0)
+        self.full_computations += 1
+
+    @property
+    def is_valid(self):
+        """包围盒和质心是否已缓存"""
+        return self._bounds is not None and self._sum is not None
+
+    @property
+    def min_bound(self):
+        self._ensure()
+        return self._bounds[0]
+
+    @property
+    def max_bound(self):
+        self._ensure()
+        return self._bounds[1]
+
+    @property
+    def dimensions(self):
+        """包围盒尺寸"""
+        self._ensure()
+        return self._bounds[1] - self._bounds[0]
+
+    @property
+    def center(self):
+        """包围盒中心"""
+        self._ensure()
+        return (self._bounds[0] + self._bounds[1]) * 0.5
+
+    @property
+    def centroid(self):
+        """所有点的平均位置"""
+        self._ensure()
+        return self._sum / max(self.point_count, 1)
+
+    @property
+    def diagonal(self):
+        """包围盒对角线长度"""
+        return float(np.linalg.norm(self.dimensions))
+
+    @property
+    def radius(self):
+        """包围盒外接球半径，用于相机适配"""
+        return self.diagonal * 0.5
+
+    def apply_change(self, change, matrix=None):
+        """按几何变化更新统计
+
+        Args:
+            change (GeometryChange): 变化描述
+            matrix (numpy.ndarray, optional): 4x4变换矩阵，表示坐标由该矩阵变换得到
+        """
+        self._refresh_counts()
+        if "points" not in change.attributes:
+            return
+
+        self._histograms = {}
+        if matrix is None or change.resized or self._sum is None:
+            self._bounds = None
+            self._sum = None
+            return
+
+        linear = np.asarray(matrix, dtype=np.float64)[:3, :3]
+        translation = np.asarray(matrix, dtype=np.float64)[:3, 3]
+        self._sum = linear @ self._sum + self.point_count * translation
+        if self._bounds is not None and np.all(np.count_nonzero(linear, axis=1) <= 1):
+            # 每个输出轴只依赖一个输入轴时，包围盒的角点仍是变换后的角点
+            corners = np.stack([self._bounds[0], self._bounds[1]]) @ linear.T + translation
+            self._bounds = (corners.min(axis=0), corners.max(axis=0))
+        else:
+            self._bounds = None
+        self.incremental_updates += 1
+
+    def density_histogram(self, bins=32, resolution=64):
+        """局部密度直方图
+
+        以包围盒最长边的1/resolution为体素边长，统计每个非空体素中的点数分布。
+        结果缓存到坐标下一次变化为止。
+
+        Args:
+            bins (int): 直方图区间数
+            resolution (int): 最长边上的体素数
+
+        Returns:
+            tuple: (counts, edges)，与numpy.histogram相同
+        """
+        key = (bins, resolution)
+        if key not in self._histograms:
+            points = self._points()
+            if len(points) == 0:
+                self._histograms[key] = (np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1))
+            else:
+                voxel = float(self.dimensions.max()) / resolution or 1.0
+                cells = np.floor((points - self.min_bound) / voxel).astype(np.int64)
+                dims = cells.max(axis=0) + 1
+                keys = cells[:, 0] + dims[0] * (cells[:, 1] + dims[1] * cells[:, 2])
+                _, occupancy = np.unique(keys, return_counts=True)
+                self._histograms[key] = np.histogram(occupancy, bins=bins)
+        return self._histograms[key]
+
+    def get_info(self):
+        """统计信息字典
+
+        Returns:
+            dict: 数量、属性标志、包围盒、质心等
+        """
+        info = {
+            "points_count": self.point_count,
+            "has_colors": self.has_colors,
+            "has_normals": self.has_normals
+        }
+        if self.model_type == 'mesh':
+            info["triangles_count"] = self.triangle_count
+        if self.point_count > 0:
+            info.update({
+                "min_bound": self.min_bound,
+                "max_bound": self.max_bound,
+                "dimensions": self.dimensions,
+                "center": self.center,
+                "centroid": self.centroid,
+                "diagonal": self.diagonal
+            })
+        return info
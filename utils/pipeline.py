@@ -0,0 +1,445 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点云处理流水线模块，把降采样、离群点去除和法线估计串联成多个阶段
+
+大点云按空间分块，在进程池中并行处理后合并。各阶段对块边界的处理:
+    体素降采样       块边长取体素大小的整数倍并与全局体素网格对齐，每个体素完整落在一个块内
+    半径离群点去除   每块附带宽度为搜索半径的边界区域，邻域查询结果与整体计算一致
+    法线估计         同上，边界宽度为法线搜索半径
+    统计离群点去除   每块附带估计的边界区域，第k近邻距离超出块边界余量的点扩大边界重算；
+                     平均距离的均值和标准差在所有块合并后全局计算
+点数较少时不分块，直接在当前进程中处理。
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import open3d as o3d
+
+from utils.density import estimate_spacing
+
+
+# ---------------------------------------------------------------------------
+# 工作进程中执行的函数（必须位于模块顶层以便序列化）
+# ---------------------------------------------------------------------------
+
+def _knn_mean_distance(dataset, queries, k, low, high):
+    """计算查询点到k个最近邻（含自身）的平均距离
+
+    Args:
+        dataset (numpy.ndarray): 邻域点（块及其边界区域）
+        queries (numpy.ndarray): 查询点
+        k (int): 近邻数
+        low (numpy.ndarray): 邻域包围盒下界，整体边界以外为-inf
+        high (numpy.ndarray): 邻域包围盒上界，整体边界以外为inf
+
+    Returns:
+        tuple: (平均距离, 结果是否精确)
+    """
+    count = min(k, len(dataset))
+    nns = o3d.core.nns.NearestNeighborSearch(o3d.core.Tensor(dataset))
+    nns.knn_index()
+    _, distances = nns.knn_search(o3d.core.Tensor(queries), count)
+    distances = np.sqrt(distances.numpy())
+    means = distances.mean(axis=1)
+
+    # 第k近邻距离不超过到邻域边界的距离时，邻域外不可能有更近的点
+    margin = np.minimum(queries - low, high - queries).min(axis=1)
+    exact = distances[:, -1] <= margin
+    if count < k:
+        exact &= np.isinf(margin)
+    return means, exact
+
+
+def _radius_count(dataset, queries, radius):
+    """统计查询点半径内的点数（含自身）"""
+    nns = o3d.core.nns.NearestNeighborSearch(o3d.core.Tensor(dataset))
+    nns.fixed_radius_index(radius)
+    _, _, splits = nns.fixed_radius_search(o3d.core.Tensor(queries), radius)
+    return np.diff(splits.numpy())
+
+
+def _estimate_normals(dataset, n_core, radius, max_nn):
+    """估计邻域点的法线，返回前n_core个（块内点）的结果"""
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(dataset))
+    pcd.estimate_normals(o3d.geometry.KDTreeSearchParamHybrid(radius=radius, max_nn=max_nn))
+    return np.asarray(pcd.normals)[:n_core].copy()
+
+
+def _voxel_average(points, colors, normals, voxel_size, origin):
+    """体素平均降采样，体素网格以origin为原点
+
+    Returns:
+        tuple: (点, 颜色或None, 法线或None)，按体素编号排序
+    """
+    cells = np.floor((points - origin) / voxel_size).astype(np.int64)
+    low = cells.min(axis=0)
+    cells -= low
+    dims = cells.max(axis=0) + 1
+    keys = cells[:, 0] + dims[0] * (cells[:, 1] + dims[1] * cells[:, 2])
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])[:, None]
+
+    def average(values):
+        return np.add.reduceat(values[order], starts, axis=0) / counts
+
+    out_points = average(points)
+    out_colors = average(colors) if colors is not None else None
+    out_normals = None
+    if normals is not None:
+        out_normals = average(normals)
+        length = np.linalg.norm(out_normals, axis=1, keepdims=True)
+        out_normals = np.divide(out_normals, length, out=np.zeros_like(out_normals), where=length > 0)
+    return out_points, out_colors, out_normals
+
+
+# ---------------------------------------------------------------------------
+# 空间分块
+# ---------------------------------------------------------------------------
+
+class TileGrid:
+    """把点按规则网格分块，支持查询块的带边界邻域"""
+
+    def __init__(self, points, tile_size, origin):
+        """初始化分块
+
+        Args:
+            points (numpy.ndarray): (N, 3) 点坐标
+            tile_size (float): 块边长
+            origin (numpy.ndarray): 网格原点（不大于所有点的坐标）
+        """
+        self.points = points
+        self.tile_size = float(tile_size)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.min_bound = points.min(axis=0)
+        self.max_bound = points.max(axis=0)
+
+        cells = np.floor((points - self.origin) / self.tile_size).astype(np.int64)
+        self.dims = cells.max(axis=0) + 1
+        keys = self._encode(cells)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys, self.starts, self.counts = np.unique(
+            keys[self.order], return_index=True, return_counts=True)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _encode(self, cells):
+        return cells[..., 0] + self.dims[0] * (cells[..., 1] + self.dims[1] * cells[..., 2])
+
+    def _decode(self, key):
+        x = key % self.dims[0]
+        y = (key // self.dims[0]) % self.dims[1]
+        z = key // (self.dims[0] * self.dims[1])
+        return np.array([x, y, z])
+
+    def core(self, i):
+        """第i块内的点索引"""
+        return self.order[self.starts[i]:self.starts[i] + self.counts[i]]
+
+    def box(self, i, halo):
+        """第i块扩展halo后的包围盒，超出整体包围盒的一侧为无穷"""
+        low = self.origin + self._decode(self.keys[i]) * self.tile_size - halo
+        high = low + self.tile_size + 2 * halo
+        low = np.where(low <= self.min_bound, -np.inf, low)
+        high = np.where(high >= self.max_bound, np.inf, high)
+        return low, high
+
+    def neighborhood(self, i, halo):
+        """第i块及其边界区域内的点索引，块内的点排在前面
+
+        Args:
+            i (int): 块序号
+            halo (float): 边界宽度
+
+        Returns:
+            numpy.ndarray: 点索引
+        """
+        core = self.core(i)
+        rings = int(math.ceil(halo / self.tile_size))
+        if rings == 0:
+            return core
+        center = self._decode(self.keys[i])
+        r = np.arange(-rings, rings + 1)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = center + offsets
+        cells = cells[np.all((cells >= 0) & (cells < self.dims), axis=1)]
+        keys = self._encode(cells)
+        keys = keys[keys != self.keys[i]]
+        pos = np.searchsorted(self.keys, keys)
+        pos = pos[(pos < len(self.keys))]
+        pos = pos[np.isin(self.keys[pos], keys)]
+        if len(pos) == 0:
+            return core
+
+        others = np.concatenate([self.core(p) for p in pos])
+        low, high = self.box(i, halo)
+        inside = np.all((self.points[others] >= low) & (self.points[others] <= high), axis=1)
+        return np.concatenate([core, others[inside]])
+
+
+def tile_size_for(points, tile_points):
+    """按每块目标点数估计块边长"""
+    extent = points.max(axis=0) - points.min(axis=0)
+    valid = extent[extent > 0]
+    if valid.size == 0:
+        return 1.0
+    tiles = max(len(points) / tile_points, 1.0)
+    return float(np.prod(valid) / tiles) ** (1.0 / valid.size)
+
+
+# ---------------------------------------------------------------------------
+# 流水线阶段
+# ---------------------------------------------------------------------------
+
+class PipelineStage:
+    """流水线阶段基类
+
+    子类实现 process(data, context)，data为包含points/colors/normals的字典
+    （颜色和法线可以为None），返回处理后的新字典。
+    """
+
+    name = "阶段"
+
+    def process(self, data, context):
+        raise NotImplementedError
+
+    def describe(self):
+        """阶段的参数描述"""
+        return self.name
+
+
+def _select(data, mask):
+    """按布尔掩码或索引选取所有属性"""
+    return {key: (value[mask] if value is not None else None) for key, value in data.items()}
+
+
+class VoxelDownsampleStage(PipelineStage):
+    """体素降采样，体素内的点、颜色和法线取平均"""
+
+    name = "体素降采样"
+
+    def __init__(self, voxel_size):
+        self.voxel_size = float(voxel_size)
+
+    def describe(self):
+        return f"{self.name}(体素={self.voxel_size:.4g})"
+
+    def process(self, data, context):
+        points = data["points"]
+        v = self.voxel_size
+        # 与Open3D相同，体素网格从 最小边界 - 半个体素 开始
+        origin = points.min(axis=0) - v * 0.5
+        # 块边长取体素大小的整数倍，每个体素完整落在一个块中，不需要边界区域
+        tile = max(1, math.ceil(context.tile_size(points) / v)) * v
+        grid = TileGrid(points, tile, origin)
+
+        tasks = []
+        for i in range(len(grid)):
+            idx = grid.core(i)
+            tasks.append((points[idx],
+                          data["colors"][idx] if data["colors"] is not None else None,
+                          data["normals"][idx] if data["normals"] is not None else None,
+                          v, origin))
+        results = context.map(_voxel_average, tasks)
+        context.tiles = len(grid)
+        return {
+            "points": np.concatenate([r[0] for r in results]),
+            "colors": np.concatenate([r[1] for r in results]) if data["colors"] is not None else None,
+            "normals": np.concatenate([r[2] for r in results]) if data["normals"] is not None else None
+        }
+
+
+class StatisticalOutlierStage(PipelineStage):
+    """统计离群点去除: 到k近邻的平均距离超过 全局均值 + std_ratio * 标准差 的点被去除"""
+
+    name = "统计离群点去除"
+
+    def __init__(self, nb_neighbors=20, std_ratio=2.0):
+        self.nb_neighbors = int(nb_neighbors)
+        self.std_ratio = float(std_ratio)
+
+    def describe(self):
+        return f"{self.name}(k={self.nb_neighbors}, std={self.std_ratio})"
+
+    def process(self, data, context):
+        points = data["points"]
+        grid = TileGrid(points, context.tile_size(points), points.min(axis=0))
+        # 初始边界宽度按点间距估计，k近邻大约落在 sqrt(k) 个间距以内
+        halo = 3.0 * math.sqrt(self.nb_neighbors) * max(estimate_spacing(points), 1e-12)
+
+        means = np.empty(len(points))
+        pending = [(i, grid.core(i)) for i in range(len(grid))]
+        diagonal = float(np.linalg.norm(grid.max_bound - grid.min_bound))
+        while pending:
+            tasks = []
+            for i, queries in pending:
+                low, high = grid.box(i, halo)
+                dataset = points[grid.neighborhood(i, halo)]
+                tasks.append((dataset, points[queries], self.nb_neighbors, low, high))
+            results = context.map(_knn_mean_distance, tasks)
+
+            retry = []
+            for (i, queries), (tile_means, exact) in zip(pending, results):
+                means[queries] = tile_means
+                if halo < diagonal and not np.all(exact):
+                    retry.append((i, queries[~exact]))
+            pending = retry
+            halo *= 2  # 不精确的点扩大边界重算，边界超过整体对角线时必然精确
+        context.tiles = len(grid)
+
+        threshold = means.mean() + self.std_ratio * means.std(ddof=1 if len(means) > 1 else 0)
+        return _select(data, means < threshold)
+
+
+class RadiusOutlierStage(PipelineStage):
+    """半径离群点去除: 半径内（含自身）点数不超过nb_points的点被去除
+
+    即只保留除自身外至少有nb_points个近邻的点，与Open3D的remove_radius_outlier一致。
+    """
+
+    name = "半径离群点去除"
+
+    def __init__(self, nb_points=16, radius=0.05):
+        self.nb_points = int(nb_points)
+        self.radius = float(radius)
+
+    def describe(self):
+        return f"{self.name}(n={self.nb_points}, r={self.radius:.4g})"
+
+    def process(self, data, context):
+        points = data["points"]
+        grid = TileGrid(points, max(context.tile_size(points), self.radius), points.min(axis=0))
+        tasks = []
+        cores = []
+        for i in range(len(grid)):
+            core = grid.core(i)
+            cores.append(core)
+            tasks.append((points[grid.neighborhood(i, self.radius)], points[core], self.radius))
+        counts = np.empty(len(points), dtype=np.int64)
+        for core, tile_counts in zip(cores, context.map(_radius_count, tasks)):
+            counts[core] = tile_counts
+        context.tiles = len(grid)
+        return _select(data, counts > self.nb_points)
+
+
+class NormalEstimationStage(PipelineStage):
+    """法线估计（半径内最多max_nn个近邻）"""
+
+    name = "法线估计"
+
+    def __init__(self, radius=0.05, max_nn=30):
+        self.radius = float(radius)
+        self.max_nn = int(max_nn)
+
+    def describe(self):
+        return f"{self.name}(r={self.radius:.4g}, max_nn={self.max_nn})"
+
+    def process(self, data, context):
+        points = data["points"]
+        grid = TileGrid(points, max(context.tile_size(points), self.radius), points.min(axis=0))
+        tasks = []
+        cores = []
+        for i in range(len(grid)):
+            core = grid.core(i)
+            cores.append(core)
+            tasks.append((points[grid.neighborhood(i, self.radius)], len(core), self.radius, self.max_nn))
+        normals = np.empty_like(points)
+        for core, tile_normals in zip(cores, context.map(_estimate_normals, tasks)):
+            normals[core] = tile_normals
+        context.tiles = len(grid)
+        result = dict(data)
+        result["normals"] = normals
+        return result
+
+
+# ---------------------------------------------------------------------------
+# 流水线
+# ---------------------------------------------------------------------------
+
+class _RunContext:
+    """一次流水线运行的执行环境"""
+
+    def __init__(self, executor, tile_points, parallel):
+        self.executor = executor
+        self.tile_points = tile_points
+        self.parallel = parallel
+        self.tiles = 1
+
+    def tile_size(self, points):
+        """块边长，不并行时整块处理"""
+        if not self.parallel:
+            extent = points.max(axis=0) - points.min(axis=0)
+            return float(extent.max()) * 2 + 1.0
+        return tile_size_for(points, self.tile_points)
+
+    def map(self, func, tasks):
+        """执行任务列表，保持顺序"""
+        if self.executor is None or len(tasks) <= 1:
+            return [func(*task) for task in tasks]
+        futures = [self.executor.submit(func, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+class Pipeline:
+    """按顺序执行的处理阶段链"""
+
+    def __init__(self, stages, workers=0, tile_points=500000, min_parallel_points=1000000):
+        """初始化流水线
+
+        Args:
+            stages (list): PipelineStage列表
+            workers (int): 进程数，0表示使用CPU核数
+            tile_points (int): 并行时每块的目标点数
+            min_parallel_points (int): 点数不少于该值时才分块并行
+        """
+        self.stages = list(stages)
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_points = tile_points
+        self.min_parallel_points = min_parallel_points
+
+    def run(self, points, colors=None, normals=None):
+        """执行流水线
+
+        Args:
+            points (numpy.ndarray): (N, 3) 点坐标
+            colors (numpy.ndarray, optional): (N, 3) 颜色
+            normals (numpy.ndarray, optional): (N, 3) 法线
+
+        Returns:
+            dict: 处理结果，包含points/colors/normals
+            list: 每个阶段的统计 {stage, seconds, points_in, points_out, tiles}
+        """
+        data = {
+            "points": np.asarray(points, dtype=np.float64),
+            "colors": None if colors is None else np.asarray(colors, dtype=np.float64),
+            "normals": None if normals is None else np.asarray(normals, dtype=np.float64)
+        }
+        parallel = len(data["points"]) >= self.min_parallel_points and self.workers > 1
+        executor = ProcessPoolExecutor(max_workers=self.workers) if parallel else None
+        stats = []
+        try:
+            for stage in self.stages:
+                context = _RunContext(executor, self.tile_points, parallel)
+                points_in = len(data["points"])
+                start = time.perf_counter()
+                if points_in > 0:
+                    data = stage.process(data, context)
+                stats.append({
+                    "stage": stage.describe(),
+                    "seconds": time.perf_counter() - start,
+                    "points_in": points_in,
+                    "points_out": len(data["points"]),
+                    "tiles": context.tiles
+                })
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return data, stats
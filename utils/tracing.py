@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+跟踪模块，记录加载、编辑、渲染等阶段的耗时并导出为Chrome跟踪格式
+
+用法:
+    with tracing.span("渲染.捕获"):
+        ...
+
+    @tracing.traced("模型.应用密度", "edit")
+    def apply_density(...):
+        ...
+
+未启用时span返回共享的空上下文、traced装饰的函数直接调用原函数，开销只有一次标志判断。
+启用后每个span在结束时向环形缓冲区追加一条记录，缓冲区满后丢弃最旧的记录。
+导出的JSON可在 chrome://tracing 或 https://ui.perfetto.dev 中打开。
+
+设置环境变量 HAIR_EZCLICK_TRACE=<文件路径> 时在启动时启用跟踪，并在退出时导出到该文件。
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+TRACE_ENV = "HAIR_EZCLICK_TRACE"
+
+_enabled = False
+_events = deque(maxlen=100000)  # (名称, 类别, 开始微秒, 持续微秒, 线程ID, 参数)
+_thread_names = {}  # 线程ID -> 线程名称
+_origin_ns = time.perf_counter_ns()
+
+
+class _NullSpan:
+    """未启用跟踪时使用的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """记录一段代码耗时的上下文"""
+
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        thread = threading.current_thread()
+        if thread.ident not in _thread_names:
+            _thread_names[thread.ident] = thread.name
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        _events.append((self.name, self.category, (self.start - _origin_ns) // 1000,
+                        (end - self.start) // 1000, thread.ident, self.args))
+        return False
+
+
+def span(name, category="app", **args):
+    """创建一个跟踪区间
+
+    Args:
+        name (str): 区间名称
+        category (str): 类别，在跟踪查看器中可按类别过滤
+        **args: 附加参数，显示在区间详情中
+
+    Returns:
+        上下文管理器
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args or None)
+
+
+def traced(name=None, category="app"):
+    """函数装饰器，把每次调用记录为一个跟踪区间
+
+    Args:
+        name (str, optional): 区间名称，默认为函数的限定名
+        category (str): 类别
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, category, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instant(name, category="app", **args):
+    """记录一个瞬时事件（持续时间为0）"""
+    if _enabled:
+        with _Span(name, category, args or None):
+            pass
+
+
+def enable(buffer_size=None):
+    """启用跟踪
+
+    Args:
+        buffer_size (int, optional): 环形缓冲区容量（事件数），改变容量会清空已有记录
+    """
+    global _enabled, _events
+    if buffer_size is not None and buffer_size != _events.maxlen:
+        _events = deque(maxlen=int(buffer_size))
+    _enabled = True
+
+
+def disable():
+    """停止跟踪，已记录的事件保留到clear或下一次导出"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """是否正在跟踪"""
+    return _enabled
+
+
+def clear():
+    """清空已记录的事件"""
+    _events.clear()
+
+
+def get_stats():
+    """获取跟踪统计
+
+    Returns:
+        dict: 是否启用、缓冲区中的事件数和容量
+    """
+    return {"enabled": _enabled, "events": len(_events), "capacity": _events.maxlen}
+
+
+def summarize():
+    """按区间名称汇总耗时
+
+    Returns:
+        dict: 名称 -> {count, total_ms, max_ms}
+    """
+    summary = {}
+    for name, _, _, duration, _, _ in list(_events):
+        entry = summary.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += duration / 1000.0
+        entry["max_ms"] = max(entry["max_ms"], duration / 1000.0)
+    return summary
+
+
+def export_chrome_trace(file_path):
+    """把缓冲区中的事件导出为Chrome跟踪JSON
+
+    Args:
+        file_path (str): 输出文件路径
+
+    Returns:
+        int: 导出的事件数
+    """
+    pid = os.getpid()
+    events = list(_events)
+    trace = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "Hair Ezclick"}}]
+    for tid, thread_name in list(_thread_names.items()):
+        trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    for name, category, start, duration, tid, args in events:
+        event = {"name": name, "cat": category, "ph": "X", "ts": start, "dur": duration, "pid": pid, "tid": tid}
+        if args:
+            event["args"] = {key: value if isinstance(value, (int, float, str, bool)) else str(value)
+                             for key, value in args.items()}
+        trace.append(event)
+
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(events)
+
+
+def _export_at_exit(file_path):
+    try:
+        count = export_chrome_trace(file_path)
+        print(f"已导出 {count} 个跟踪事件到 {file_path}")
+    except OSError as e:
+        print(f"导出跟踪失败: {str(e)}")
+
+
+# 通过环境变量在启动时启用，退出时导出
+if os.environ.get(TRACE_ENV):
+    enable()
+    atexit.register(_export_at_exit, os.environ[TRACE_ENV])
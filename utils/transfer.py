@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文件传输模块，提供分块上传和基于HTTP Range的可续传下载
+
+下载:
+    数据先写入 <目标>.part，同时在 <目标>.part.json 中记录服务器的ETag/Last-Modified。
+    中断后重试时带 Range 和 If-Range 请求剩余部分；服务器文件已变化时从头下载。
+    完成后校验 X-Checksum-SHA256 响应头（或调用方给出的校验和）再改名为目标文件。
+    调用方可以传入 If-None-Match 请求头，服务器返回304时不下载任何内容。
+
+上传:
+    1. POST {base}/uploads            JSON {filename, size, sha256}  -> {upload_id}
+    2. PUT  {base}/uploads/{id}       Content-Range: bytes s-e/total，按块发送
+    3. GET  {base}/uploads/{id}       -> {received}，失败重试前查询已接收的字节数
+    服务器不支持分块上传（1返回404/405）时由调用方退回到整文件上传。
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+
+# 服务器返回文件校验和的响应头
+CHECKSUM_HEADER = "X-Checksum-SHA256"
+
+
+class TransferError(Exception):
+    """传输失败（重试用尽、校验和不一致或被取消）"""
+
+
+class UploadNotSupported(TransferError):
+    """服务器不支持分块上传协议"""
+
+
+def file_checksum(file_path, chunk_size=1024 * 1024):
+    """计算文件的SHA-256校验和
+
+    Args:
+        file_path (str): 文件路径
+        chunk_size (int): 读取块大小
+
+    Returns:
+        str: 十六进制校验和
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ChunkedTransfer:
+    """分块传输器"""
+
+    def __init__(self, session, timeout=30, chunk_size=1024 * 1024, max_retries=3,
+                 retry_delay=1.0, progress=None, cancel_event=None):
+        """初始化分块传输器
+
+        Args:
+            session (requests.Session): HTTP会话
+            timeout (float): 单次请求超时（秒）
+            chunk_size (int): 块大小（字节）
+            max_retries (int): 每个块/每次续传的最大重试次数
+            retry_delay (float): 首次重试前的等待时间，之后按2倍递增
+            progress (callable, optional): 进度回调，签名为progress(已传输字节, 总字节)
+            cancel_event (threading.Event, optional): 置位时中止传输
+        """
+        self.session = session
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.progress = progress or (lambda done, total: None)
+        self.cancel_event = cancel_event
+
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise TransferError("传输已取消")
+
+    def _retry(self, attempt, error):
+        """等待后重试，重试次数用尽时抛出TransferError"""
+        if attempt >= self.max_retries:
+            raise TransferError(f"重试{self.max_retries}次后仍失败: {error}")
+        self._check_cancelled()
+        time.sleep(self.retry_delay * (2 ** attempt))
+
+    def download(self, url, dest_path, expected_checksum=None, headers=None):
+        """可续传下载
+
+        Args:
+            url (str): 下载地址
+            dest_path (str): 目标文件路径
+            expected_checksum (str, optional): 期望的SHA-256，默认取响应头
+            headers (dict, optional): 附加请求头
+
+        Returns:
+            requests.structures.CaseInsensitiveDict: 最后一次响应的响应头，
+                服务器返回304（未修改）时为None
+        """
+        part_path = dest_path + '.part'
+        meta_path = part_path + '.json'
+        validator = self._read_meta(meta_path)
+        if validator is None and os.path.exists(part_path):
+            # 没有校验信息的残留文件无法安全续传
+            os.remove(part_path)
+
+        attempt = 0
+        while True:
+            self._check_cancelled()
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            received = 0  # 本次请求写入的字节数
+            request_headers = dict(headers or {})
+            if offset > 0:
+                request_headers['Range'] = f'bytes={offset}-'
+                if validator:
+                    request_headers['If-Range'] = validator
+            try:
+                response = self.session.get(url, headers=request_headers,
+                                            timeout=self.timeout, stream=True)
+                with response:
+                    if response.status_code == 304:
+                        # 条件请求命中，本地副本仍然有效
+                        self._cleanup(part_path, meta_path)
+                        return None
+                    if response.status_code == 416 and offset > 0:
+                        if self._unsatisfied_total(response) == offset:
+                            # 已经下载完整
+                            response_headers = response.headers
+                            break
+                        # 残留文件与服务器文件大小不符（远端文件已变化），从头下载
+                        self._cleanup(part_path, meta_path)
+                        validator = None
+                        continue
+                    if response.status_code >= 500:
+                        # 服务器临时错误，重试
+                        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                    if response.status_code not in (200, 206):
+                        raise TransferError(f"HTTP {response.status_code}")
+                    if response.status_code == 200:
+                        # 服务器忽略了Range或文件已变化，从头下载
+                        offset = 0
+                    response_headers = response.headers
+                    validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                    self._write_meta(meta_path, validator)
+                    total = self._total_size(response, offset)
+                    expected_checksum = expected_checksum or response.headers.get(CHECKSUM_HEADER)
+
+                    with open(part_path, 'ab' if offset > 0 else 'wb') as f:
+                        done = offset
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            self._check_cancelled()
+                            f.write(chunk)
+                            received += len(chunk)
+                            done += len(chunk)
+                            self.progress(done, total)
+                    if total and done < total:
+                        raise requests.exceptions.ChunkedEncodingError("连接提前关闭")
+                break
+            except requests.RequestException as e:
+                # 网络错误: 保留已下载部分，等待后续传。与上传一样，有进展的请求之后重新计数，
+                # 连接不稳定但每次都有进展的长时间下载不会因累计断开次数而失败
+                if received > 0:
+                    attempt = 0
+                self._retry(attempt, e)
+                attempt += 1
+
+        if expected_checksum:
+            actual = file_checksum(part_path)
+            if actual.lower() != expected_checksum.lower():
+                self._cleanup(part_path, meta_path)
+                raise TransferError(f"校验和不一致: 期望 {expected_checksum}，实际 {actual}")
+
+        os.replace(part_path, dest_path)
+        self._cleanup(meta_path)
+        return response_headers
+
+    def upload(self, base_url, file_path):
+        """分块上传文件
+
+        Args:
+            base_url (str): 后端地址
+            file_path (str): 本地文件路径
+
+        Returns:
+            str: 上传ID，可在后续处理请求中引用
+        """
+        total = os.path.getsize(file_path)
+        checksum = file_checksum(file_path)
+        response = self.session.post(
+            f"{base_url}/uploads",
+            json={"filename": os.path.basename(file_path), "size": total, "sha256": checksum},
+            timeout=self.timeout
+        )
+        if response.status_code in (404, 405):
+            raise UploadNotSupported(f"HTTP {response.status_code}")
+        if response.status_code not in (200, 201):
+            raise TransferError(f"创建上传失败: HTTP {response.status_code}")
+        upload_id = response.json()["upload_id"]
+        upload_url = f"{base_url}/uploads/{upload_id}"
+
+        offset = int(response.json().get("received", 0))
+        attempt = 0
+        with open(file_path, 'rb') as f:
+            while offset < total:
+                self._check_cancelled()
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                end = offset + len(chunk) - 1
+                try:
+                    response = self.session.put(
+                        upload_url,
+                        data=chunk,
+                        headers={
+                            'Content-Type': 'application/octet-stream',
+                            'Content-Range': f'bytes {offset}-{end}/{total}'
+                        },
+                        timeout=self.timeout
+                    )
+                    if response.status_code >= 400 and response.status_code < 500:
+                        raise TransferError(f"上传块失败: HTTP {response.status_code}")
+                    if response.status_code not in (200, 201, 204):
+                        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                except requests.RequestException as e:
+                    self._retry(attempt, e)
+                    attempt += 1
+                    # 查询服务器已接收的字节数，从该位置继续
+                    offset = self._query_received(upload_url, offset)
+                    continue
+
+                attempt = 0
+                offset = end + 1
+                self.progress(offset, total)
+        return upload_id
+
+    def _query_received(self, upload_url, fallback):
+        """查询服务器已接收的字节数"""
+        try:
+            response = self.session.get(upload_url, timeout=self.timeout)
+            if response.status_code == 200:
+                return int(response.json().get("received", fallback))
+        except (requests.RequestException, ValueError):
+            pass
+        return fallback
+
+    @staticmethod
+    def _total_size(response, offset):
+        """根据响应头计算文件总大小，未知时返回0"""
+        content_range = response.headers.get('Content-Range')
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            return offset + int(length)
+        return 0
+
+    @staticmethod
+    def _unsatisfied_total(response):
+        """解析416响应的 Content-Range: bytes */N，返回N，缺失或无法解析时返回None"""
+        content_range = response.headers.get('Content-Range', '')
+        if content_range.startswith('bytes */'):
+            total = content_range[len('bytes */'):].strip()
+            if total.isdigit():
+                return int(total)
+        return None
+
+    @staticmethod
+    def _read_meta(meta_path):
+        """读取续传校验信息"""
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("validator")
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_meta(meta_path, validator):
+        """保存续传校验信息"""
+        if validator:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"validator": validator}, f)
+
+    @staticmethod
+    def _cleanup(*paths):
+        """删除临时文件"""
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)